@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py — Benchmark every clean_data.py step on synthetic raw data.
+
+Generates raw inputs with synth_raw.py at each --scale (a multiple of the
+real data volume), then times each STEPS function plus the fetch_raw.py
+parsing paths in a fresh subprocess so peak memory is per step. Network
+access is disabled in the children (the weather fetch is skipped).
+
+Every run appends one record per (step, scale) to data/bench/results.jsonl
+with the commit, wall time, rows/sec and peak RSS, then compares against
+the most recent record from a different commit (or --baseline). The run
+exits non-zero when wall time or peak memory regresses by more than
+--threshold. A failed --prepare run (the inputs a step depends on)
+aborts the benchmark.
+
+Synthetic inputs are cached under data/bench/raw_<scale>/; 100× needs
+tens of GB of disk and RAM for the CSB and crime steps.
+
+Usage:
+  cd python/
+  uv run python scripts/bench_pipeline.py                          # 1×, 10×, 100×
+  uv run python scripts/bench_pipeline.py --scales 0.1,1 --steps csb,crime,gtfs
+  uv run python scripts/bench_pipeline.py --baseline 84ed2f3 --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PYTHON_DIR = SCRIPTS_DIR.parent
+BENCH_DIR = PYTHON_DIR / "data" / "bench"
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+
+DEFAULT_SCALES = "1,10,100"
+DEFAULT_THRESHOLD = 0.25  # fail on >25% slower or >25% more memory
+LINKS_PER_PAGE = 20_000  # anchors in the synthetic crime-stats page at 1×
+
+FETCH_STEPS = ["fetch:links", "fetch:extract"]
+
+# Steps that read other steps' outputs: run them (untimed) first
+DEPENDS = {
+    "csb": ["lake"],
+    "crime": ["lake"],
+    "housing": ["neighborhoods"],
+    "cooccurrence": ["lake", "vacancies"],
+    "panel": ["neighborhoods", "gtfs", "csb", "crime", "demographics", "vacancies"],
+}
+STEP_OUTPUT = {
+    "lake": "lake/crime/_manifest.json",
+    "neighborhoods": "neighborhoods.geojson",
+    "gtfs": "stop_stats.json",
+    "csb": "csb_latest.json",
+    "crime": "crime.json",
+    "demographics": "demographics.json",
+    "vacancies": "vacancies.json",
+}
+
+# Synthetic-manifest entry used as each step's input row count
+ROWS_FROM = {
+    "neighborhoods": "neighborhoods",
+    "gtfs": "gtfs",
+    "food": "usda",
+    "csb": "csb",
+    "crime": "crime",
+    "arpa": "arpa",
+    "demographics": "demographics",
+    "vacancies": "vacancies",
+    "housing": "housing",
+    "cooccurrence": "crime",
+    "fetch:extract": "gtfs",
+}
+
+
+def log(msg: str):
+    print(f"  → {msg}")
+
+
+def _scale_label(scale: float) -> str:
+    return f"{scale:g}x"
+
+
+def raw_dir_for(scale: float) -> Path:
+    return BENCH_DIR / f"raw_{scale:g}"
+
+
+def ensure_raw(scale: float, regen: bool) -> dict[str, int]:
+    """Generate (or reuse) synthetic raw data for a scale; returns its row manifest."""
+    from synth_raw import generate
+
+    raw = raw_dir_for(scale)
+    manifest_path = raw / "manifest.json"
+    if manifest_path.exists() and not regen:
+        return json.loads(manifest_path.read_text())["rows"]
+    if raw.exists():
+        shutil.rmtree(raw)
+    log(f"Generating synthetic raw data at {_scale_label(scale)}...")
+    t0 = time.perf_counter()
+    rows = generate(raw, scale)
+    manifest_path.write_text(json.dumps({"scale": scale, "seed": 0, "rows": rows}))
+    log(f"Generated in {time.perf_counter() - t0:.1f}s")
+    return rows
+
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PYTHON_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PYTHON_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ── Child process: run one step ─────────────────────────────────────────────
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _fetch_step(step: str, scale: float, raw: Path, work: Path):
+    """(callable, rows) for a fetch_raw.py parsing path, run against the synthetic data."""
+    import fetch_raw
+
+    if step == "fetch:links":
+        n = max(1, int(LINKS_PER_PAGE * scale))
+        rows = "".join(
+            f'<tr><td><a href="/crimestats/{i}.{"csv" if i % 3 else "pdf"}">file {i}</a></td></tr>' for i in range(n)
+        )
+        html = f"<html><body><table>{rows}</table></body></html>"
+        return (lambda: fetch_raw.find_csv_links(html)), n
+    if step == "fetch:extract":
+        return (lambda: fetch_raw.extract_zip(raw / "google_transit.zip", work / "gtfs_extract")), None
+    raise KeyError(step)
+
+
+def run_child(step: str, scale: float, prepare: bool, repeat: int) -> dict:
+    import clean_data
+
+    raw = raw_dir_for(scale)
+    work = BENCH_DIR / f"out_{scale:g}"
+    (work / "training").mkdir(parents=True, exist_ok=True)
+    clean_data.RAW_DIR = raw
+    clean_data.OUT_DIR = work
+    clean_data.TRAINING_DIR = work / "training"
+    clean_data.requests = None  # keep network out of the timings
+    clean_data.WEATHER_DIR = work / "weather"
+    clean_data.LAKE_DIR = work / "lake"  # csb/crime time the warm lake; the lake step times ingest
+    os.environ["PANEL_REBUILD"] = "1"
+
+    if prepare:
+        for dep in DEPENDS.get(step, []):
+            if not (work / STEP_OUTPUT[dep]).exists():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    clean_data.STEPS[dep][1]()
+        return {}
+
+    rows = None
+    if step in FETCH_STEPS:
+        fn, rows = _fetch_step(step, scale, raw, work)
+    else:
+        fn = clean_data.STEPS[step][1]
+    rss_before = _peak_rss_mb()
+    walls, cpus = [], []
+    for _ in range(repeat):
+        if step == "lake":
+            shutil.rmtree(clean_data.LAKE_DIR, ignore_errors=True)  # time a cold ingest every repeat
+        c0, t0 = time.process_time(), time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        walls.append(time.perf_counter() - t0)
+        cpus.append(time.process_time() - c0)
+    result = {
+        "wall_s": min(walls),
+        "cpu_s": min(cpus),
+        "peak_rss_mb": _peak_rss_mb(),
+        "import_rss_mb": rss_before,
+    }
+    if rows is not None:
+        result["rows"] = rows
+    return result
+
+
+# ── Parent: orchestrate, record, compare ────────────────────────────────────
+
+def _spawn(step: str, scale: float, *extra: str) -> dict:
+    cmd = [sys.executable, __file__, "--child", step, "--scales", f"{scale:g}", *extra]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=PYTHON_DIR)
+    if proc.returncode != 0:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["(no output)"]
+        return {"error": f"exit {proc.returncode}: {tail[0]}"}
+    lines = proc.stdout.strip().splitlines()
+    return json.loads(lines[-1]) if lines else {}
+
+
+def load_results(path: Path = RESULTS_PATH) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history: list[dict], rec: dict, baseline: str | None) -> dict | None:
+    """Most recent comparable record (same step/scale/machine) from another commit."""
+    for old in reversed(history):
+        if (old["step"], old["scale"], old["machine"]) != (rec["step"], rec["scale"], rec["machine"]):
+            continue
+        if "error" in old:
+            continue
+        if baseline is not None:
+            if old["commit"].startswith(baseline):
+                return old
+        elif old["commit"] != rec["commit"]:
+            return old
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clean_data.py steps on synthetic data")
+    parser.add_argument("--scales", type=str, default=DEFAULT_SCALES, help="Comma-separated multiples of real volume")
+    parser.add_argument("--steps", type=str, help="Comma-separated step keys (default: every STEPS entry + fetch paths)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per step; the fastest is recorded")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional regression in wall time / peak RSS")
+    parser.add_argument("--baseline", type=str, help="Compare against this commit instead of the previous one")
+    parser.add_argument("--regen", action="store_true", help="Regenerate cached synthetic raw data")
+    parser.add_argument("--no-record", action="store_true", help=f"Don't append to {RESULTS_PATH.name}")
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(",") if s]
+
+    if args.child:
+        print(json.dumps(run_child(args.child, scales[0], args.prepare, args.repeat)))
+        return
+
+    import clean_data
+
+    steps = [s for s in args.steps.split(",") if s] if args.steps else list(clean_data.STEPS) + FETCH_STEPS
+    unknown = [s for s in steps if s not in clean_data.STEPS and s not in FETCH_STEPS]
+    if unknown:
+        sys.exit(f"Unknown step(s): {', '.join(unknown)}. Choices: {', '.join(list(clean_data.STEPS) + FETCH_STEPS)}")
+
+    commit = git_commit()
+    machine = f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu"
+    history = load_results()
+    date = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    print("=" * 72)
+    print(f"  Pipeline benchmark — commit {commit} on {machine}")
+    print(f"  Scales: {', '.join(_scale_label(s) for s in scales)}   threshold: {args.threshold:.0%}")
+    print("=" * 72)
+
+    records, regressions = [], []
+    for scale in scales:
+        manifest = ensure_raw(scale, args.regen)
+        print(f"\n── {_scale_label(scale)} ──")
+        print(f"  {'step':<16} {'wall s':>9} {'rows':>12} {'rows/s':>12} {'peak MB':>9}   vs baseline")
+        for step in steps:
+            if step in DEPENDS:
+                prepared = _spawn(step, scale, "--prepare")
+                if "error" in prepared:
+                    # Timing the step against missing or stale inputs would record a bogus number
+                    sys.exit(f"Preparing inputs for {step} at {_scale_label(scale)} failed — {prepared['error']}")
+            result = _spawn(step, scale, "--repeat", str(args.repeat))
+            rows = manifest.get(ROWS_FROM.get(step, ""), 0)
+            rec = {"commit": commit, "date": date, "machine": machine, "step": step, "scale": scale, "rows": rows}
+            if "error" in result:
+                rec["error"] = result["error"]
+                print(f"  {step:<16} FAILED — {result['error']}")
+                records.append(rec)
+                continue
+            rec.update(result)
+            rows = rec["rows"]
+            rec["rows_per_s"] = rows / rec["wall_s"] if rows and rec["wall_s"] > 0 else None
+            records.append(rec)
+
+            base = find_baseline(history, rec, args.baseline)
+            note = "—"
+            if base:
+                d_wall = rec["wall_s"] / base["wall_s"] - 1 if base["wall_s"] > 0 else 0.0
+                d_rss = rec["peak_rss_mb"] / base["peak_rss_mb"] - 1 if base["peak_rss_mb"] > 0 else 0.0
+                note = f"wall {d_wall:+.0%}  rss {d_rss:+.0%}  ({base['commit']})"
+                if d_wall > args.threshold or d_rss > args.threshold:
+                    regressions.append((step, scale, d_wall, d_rss, base["commit"]))
+                    note += "  REGRESSION"
+            rate = f"{rec['rows_per_s']:>12,.0f}" if rec["rows_per_s"] else f"{'—':>12}"
+            print(f"  {step:<16} {rec['wall_s']:>9.3f} {rows:>12,} {rate} {rec['peak_rss_mb']:>9.1f}   {note}")
+
+    if not args.no_record:
+        BENCH_DIR.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_PATH, "a") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+        print(f"\nAppended {len(records)} record(s) to {RESULTS_PATH.relative_to(PYTHON_DIR)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for step, scale, d_wall, d_rss, base in regressions:
+            print(f"  {step} @ {_scale_label(scale)}: wall {d_wall:+.0%}, peak RSS {d_rss:+.0%} vs {base}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,35 +11,48 @@ Usage:
   uv run python scripts/clean_data.py  # then process
 
 Set DATA_YEAR env var to change the target year (default: 2025).
+Daily weather for trends.json is cached per year in python/data/weather/;
+only days not cached yet are requested. The lookup honours HTTP_MODE /
+--http (see http_cache.py), so a recorded run can be replayed offline.
 """
 
 import csv
+import functools
 import io
 import json
-import math
 import os
 import re
 import shutil
 import sys
 import zipfile
 from collections import Counter, defaultdict
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from itertools import accumulate
 from pathlib import Path
 
 try:
     import requests
+    from http_cache import MODES as HTTP_MODES, http_session
 except ImportError:
     requests = None  # only needed for weather API
+    HTTP_MODES = ()
 
 try:
     import shapefile  # pyshp
 except ImportError:
     sys.exit("Missing dependency: uv sync")
 
-try:
-    import openpyxl
-except ImportError:
-    sys.exit("Missing dependency: uv sync")
+import count_cube
+import density
+from columnar import OUTPUTS as COLUMNAR_OUTPUTS, encode as encode_columnar
+from geo import CITY_BBOX, in_bbox, lnglat_to_metres, web_mercator_to_lnglat
+from json_stream import feature_collection, write_json
+from quantile_sketch import TDigest
+from reservoir import StratifiedReservoir
+from spacetime import SpaceTimeIndex
+from raw_lake import parse_timestamps, scan as scan_raw_lake, sync as sync_raw_lake
+from step_profile import StepProfile, count_rows, phase
+from xlsx_stream import iter_rows as iter_xlsx_rows
 
 # ── Config ───────────────────────────────────────────────────────────────────
 
@@ -47,6 +60,9 @@ PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
 ROOT = PYTHON_DIR.parent  # repo root
 RAW_DIR = PYTHON_DIR / "data" / "raw"
 OUT_DIR = ROOT / "public" / "data"
+PROFILE_DIR = PYTHON_DIR / "data" / "profile"  # run_report.json + per-step .pstats/.folded
+WEATHER_DIR = PYTHON_DIR / "data" / "weather"  # weather_<year>.json daily observation cache
+LAKE_DIR = RAW_DIR / "lake"  # year/month-partitioned Parquet copies of raw/csb + raw/crime (raw_lake.py)
 
 # Load .env from repo root
 _dotenv = ROOT / ".env"
@@ -58,10 +74,18 @@ if _dotenv.exists():
             os.environ.setdefault(key.strip(), val.strip())
 
 YEAR = int(os.environ.get("DATA_YEAR", "2025"))
+
+# Timestamp formats seen in each export, tried in order
+CSB_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d")
+CRIME_DATE_FORMATS = ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
 ACS_YEAR = int(os.environ.get("ACS_YEAR", "2022"))  # ACS data lags ~2 years
 
 STL_COUNTY_FIPS = "29510"
 
+HEATMAP_POINTS = 50000  # overview sample size in <name>_points/sample.json (reservoir.py)
+HEATMAP_SEED = int(os.environ.get("HEATMAP_SEED", "0"))
+DENSITY_TOP_CATEGORIES = 8  # categories with their own density surface (density.py)
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def log(msg: str):
@@ -74,13 +98,6 @@ def require_raw(path: Path, name: str):
         sys.exit(f"Missing raw data: {path}\nRun `uv run python scripts/fetch_raw.py` first.")
 
 
-def web_mercator_to_lnglat(x: float, y: float) -> tuple[float, float]:
-    """Convert Web Mercator (EPSG:3857) coordinates to lon/lat (EPSG:4326)."""
-    lng = x * 180.0 / 20037508.34
-    lat = math.atan(math.exp(y * math.pi / 20037508.34)) * 360.0 / math.pi - 90.0
-    return lng, lat
-
-
 def shapefile_to_geojson(shp_path: str) -> dict:
     """Convert a shapefile to GeoJSON FeatureCollection."""
     sf = shapefile.Reader(shp_path)
@@ -96,6 +113,156 @@ def shapefile_to_geojson(shp_path: str) -> dict:
     return {"type": "FeatureCollection", "features": features}
 
 
+def _day_strings(ts) -> list:
+    """"YYYY-MM-DD" per timestamp (None for NaT), without a per-row strftime."""
+    import numpy as np
+
+    days = ts.to_numpy(dtype="datetime64[D]")
+    out = np.datetime_as_string(days, unit="D").astype(object)
+    out[np.isnat(days)] = None
+    return out.tolist()
+
+
+HEATMAP_FIELDS = ["lat", "lng", "category", "date", "neighborhood"]
+
+
+def heatmap_sample(month_id, hoods, idx):
+    """Stratified heatmap sample of the rows ``idx``, one stratum per month × neighborhood.
+
+    ``month_id`` is YYYYMM per row (0 when undated) and ``hoods`` the
+    neighborhood label per row. Returns (sampled row indices in ``idx``
+    order, {(month "YYYY-MM" or "", neighborhood): weight}).
+    """
+    import pandas as pd
+
+    hood_codes, hood_labels = pd.factorize(hoods[idx])
+    sampler = StratifiedReservoir(HEATMAP_POINTS, seed=HEATMAP_SEED)
+    sampler.offer_many(month_id[idx] * len(hood_labels) + hood_codes, idx)
+    sampled, weights = sampler.sample()
+    labelled = {}
+    for stratum, w in weights.items():
+        month, hood = divmod(stratum, len(hood_labels))
+        labelled[(f"{month // 100}-{month % 100:02d}" if month else "", hood_labels[hood])] = w
+    return sampled, labelled
+
+
+def heatmap_weights(weights: dict[tuple[str, str], float]) -> dict:
+    """{month: {neighborhood: weight}} from {(month, neighborhood): rows offered / rows kept}."""
+    out = defaultdict(dict)
+    for (month, hood), w in sorted(weights.items()):
+        out[month][hood] = round(w, 4)
+    return dict(out)
+
+
+def write_density(name: str, lat, lng, month_id, category, idx) -> None:
+    """Heat surfaces over points ``idx``: all of them, each month, and each top category.
+
+    ``month_id`` is YYYYMM per row (0 when undated); see density.py for the file layout.
+    """
+    import numpy as np
+    import pandas as pd
+
+    layers, meta = [idx], [{"key": "all", "points": len(idx)}]
+    by_month = idx[np.argsort(month_id[idx], kind="stable")]
+    months, starts = np.unique(month_id[by_month], return_index=True)
+    for m, part in zip(months.tolist(), np.split(by_month, starts[1:])):
+        if m:
+            layers.append(part)
+            meta.append({"key": f"month:{m // 100}-{m % 100:02d}", "points": len(part)})
+    for cat in pd.Series(category[idx]).value_counts().index[:DENSITY_TOP_CATEGORIES]:
+        part = idx[category[idx] == cat]
+        layers.append(part)
+        meta.append({"key": f"category:{cat}", "points": len(part)})
+
+    stack, grid = density.build(lat, lng, layers)
+    size = density.write(OUT_DIR / f"{name}.json", stack, grid, meta)
+    log(f"Wrote {name}.json + .bin ({len(layers)} surfaces of {grid['rows']} × {grid['cols']} cells, {size // 1024}KB)")
+
+
+def write_point_shards(shard_dir: Path, shards, aggregates: str, sample: list, weights: dict) -> int:
+    """Write heatmap rows as one JSON array per month plus ``index.json``.
+
+    ``shards`` yields (month "YYYY-MM", rows) in month order. The index
+    lists each shard's file, row count, byte size and [minLng, minLat,
+    maxLng, maxLat] so the explorer can fetch only the months in view;
+    ``aggregates`` names the aggregate file the shards belong to, which
+    points back here through its ``heatmapIndex``. ``sample`` is the
+    stratified all-months overview, written as sample.json and listed in
+    the index with its {month: {neighborhood: weight}} ``weights``.
+    Returns the number of rows written.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for stale in shard_dir.glob("*.json"):
+        stale.unlink()
+    entries = []
+    for month, rows in shards:
+        lats = [r[0] for r in rows]
+        lngs = [r[1] for r in rows]
+        size = write_json(shard_dir / f"{month}.json", rows)
+        entries.append({
+            "month": month,
+            "file": f"{shard_dir.name}/{month}.json",
+            "rows": len(rows),
+            "bytes": size,
+            "bbox": [min(lngs), min(lats), max(lngs), max(lats)],
+        })
+    size = write_json(shard_dir / "sample.json", sample)
+    overview = {"file": f"{shard_dir.name}/sample.json", "rows": len(sample), "bytes": size, "weights": weights}
+    index = {"aggregates": aggregates, "fields": HEATMAP_FIELDS, "sample": overview, "shards": entries}
+    write_json(shard_dir / "index.json", index)
+    total = sum(e["rows"] for e in entries)
+    log(f"Wrote {shard_dir.name}/ ({len(entries)} monthly shards, {total:,} points, "
+        f"{sum(e['bytes'] for e in entries) // 1024}KB; {len(sample):,}-point sample, {size // 1024}KB)")
+    return total + len(sample)
+
+
+def write_columnar(name: str, records) -> None:
+    """Write the struct-of-arrays twin of OUT_DIR/``name`` (layout in columnar.OUTPUTS)."""
+    out_name, dictionary, key = COLUMNAR_OUTPUTS[name]
+    size = write_json(OUT_DIR / out_name, encode_columnar(records, dictionary, key))
+    log(f"Wrote {out_name} ({size // 1024}KB)")
+
+
+def _hood_id(key: str) -> str:
+    """Zero-padded NHD_NUM for numeric neighborhood keys, the key itself otherwise."""
+    try:
+        return str(int(key)).zfill(2)
+    except (ValueError, TypeError):
+        return key
+
+
+def build_count_cube(ts, hood_keys, categories) -> tuple[dict, object, int]:
+    """neighborhood × month × category × hour-of-week counts (see count_cube.py).
+
+    Returns (dimension labels, cube, rows without a timestamp).
+    """
+    import numpy as np
+
+    hood_codes, raw_hoods = count_cube.factorize(hood_keys.astype(str))
+    hood_ids = [_hood_id(h) for h in raw_hoods]
+    hoods = sorted(set(hood_ids))
+    # "5" and "05" share a label; code -1 stays -1 via the trailing entry
+    hood_codes = np.array([hoods.index(h) for h in hood_ids] + [-1])[hood_codes]
+
+    month_codes, month_ids = count_cube.factorize(ts.dt.year * 100 + ts.dt.month)
+    cat_codes, cats = count_cube.factorize(categories.astype(str))
+    how = count_cube.hour_of_week(ts)
+    dims = {
+        "neighborhood": hoods,
+        "month": [f"{int(m) // 100}-{int(m) % 100:02d}" for m in month_ids],
+        "category": cats,
+        "hourOfWeek": list(range(168)),
+    }
+    cube, dropped = count_cube.build([hood_codes, month_codes, cat_codes, how], tuple(len(v) for v in dims.values()))
+    return dims, cube, dropped
+
+
+def write_count_cube(name: str, dims: dict, cube, dropped: int) -> None:
+    path = OUT_DIR / f"{name}.json"
+    size = count_cube.write(path, dims, cube, year=YEAR, undated=dropped)
+    log(f"Wrote {name}.json + .bin ({' × '.join(str(n) for n in cube.shape)} cells, {size // 1024}KB)")
+
+
 def safe_int(v, default=0):
     try:
         return int(v) if v is not None and str(v).strip().upper() != "NULL" else default
@@ -110,87 +277,161 @@ def safe_float(v, default=0.0):
         return default
 
 
+# ── Raw data lake (CSB + crime) ─────────────────────────────────────────────
+
+def _raw_csvs(src_dir: Path) -> list[Path]:
+    # One walk matching the suffix case-insensitively: globbing "*.csv" and "*.CSV"
+    # separately lists every file twice on case-insensitive filesystems
+    return [p for p in src_dir.rglob("*") if p.suffix.lower() == ".csv" and p.is_file()]
+
+
+def _pick(columns, *tests) -> str | None:
+    """First column passing the earliest test that matches any column."""
+    for test in tests:
+        col = next((k for k in columns if test(k)), None)
+        if col:
+            return col
+    return None
+
+
+def _strip(df, col: str | None):
+    import pandas as pd
+
+    return df[col].str.strip() if col else pd.Series("", index=df.index, dtype=object)
+
+
+@functools.lru_cache(maxsize=None)
+def _csb_schema(header: tuple[str, ...]) -> dict[str, str | None]:
+    """Raw column behind each CSB field for one header layout (column names vary across exports).
+
+    Cached by the header itself, so the rules run and the mapping is
+    logged once per distinct layout rather than once per raw file.
+    """
+    cols = list(header)
+    schema = {
+        "date": _pick(
+            cols,
+            lambda k: k.upper() == "DATETIMEINIT",
+            lambda k: "date" in k.lower() and "request" in k.lower(),
+            lambda k: "date" in k.lower() and "init" in k.lower(),
+            lambda k: "date" in k.lower(),
+        ),
+        "category": _pick(
+            cols,
+            lambda k: k.upper() == "PROBLEMCODE",
+            lambda k: "problem" in k.lower() or "category" in k.lower(),
+            lambda k: "type" in k.lower(),
+        ),
+        "status": _pick(cols, lambda k: "status" in k.lower()),
+        "hood": _pick(cols, lambda k: "neighborhood" in k.lower() or "nhd" in k.lower()),
+        "lat": _pick(cols, lambda k: k.lower() in ("latitude", "lat", "y")),
+        "lng": _pick(cols, lambda k: k.lower() in ("longitude", "lng", "lon", "long", "x")),
+        "srx": _pick(cols, lambda k: k.upper() == "SRX"),
+        "sry": _pick(cols, lambda k: k.upper() == "SRY"),
+        "closed": _pick(
+            cols,
+            lambda k: k.upper() == "DATETIMECLOSED",
+            lambda k: "close" in k.lower() and "date" in k.lower(),
+        ),
+    }
+    coords_src = ("lat/lon" if (schema["lat"] and schema["lng"])
+                  else ("SRX/SRY" if (schema["srx"] and schema["sry"]) else "none"))
+    log(f"Columns: date={schema['date']}, category={schema['category']}, status={schema['status']}, "
+        f"hood={schema['hood']}, coords={coords_src}")
+    return schema
+
+
+def _normalize_csb(df, schema: dict[str, str | None]):
+    """Typed lake columns for one CSB export whose columns ``schema`` maps (see _csb_schema)."""
+    import pandas as pd
+
+    date_col, cat_col, status_col, hood_col = schema["date"], schema["category"], schema["status"], schema["hood"]
+    lat_col, lng_col, srx_col, sry_col = schema["lat"], schema["lng"], schema["srx"], schema["sry"]
+    close_col = schema["closed"]
+
+    empty = pd.Series("", index=df.index, dtype=object)
+    out = pd.DataFrame({
+        "ts": parse_timestamps(df[date_col] if date_col else empty, CSB_DATE_FORMATS),
+        "closed_ts": parse_timestamps(df[close_col] if close_col else empty, CSB_DATE_FORMATS),
+        "category": _strip(df, cat_col).replace("", "Unknown").astype("category"),
+        "status": _strip(df, status_col).astype("category"),
+        "hood": _strip(df, hood_col).astype("category"),
+    })
+
+    lat = pd.to_numeric(df[lat_col], errors="coerce") if lat_col and lng_col else pd.Series(float("nan"), index=df.index)
+    lng = pd.to_numeric(df[lng_col], errors="coerce") if lat_col and lng_col else pd.Series(float("nan"), index=df.index)
+    lng = lng.where(lat.notna())
+    if srx_col and sry_col:
+        # Older exports only carry State Plane-ish Web Mercator SRX/SRY
+        sx = pd.to_numeric(df[srx_col], errors="coerce")
+        sy = pd.to_numeric(df[sry_col], errors="coerce")
+        fallback = lat.isna() & sx.notna() & sy.notna() & (sx != 0) & (sy != 0)
+        lng.loc[fallback], lat.loc[fallback] = web_mercator_to_lnglat(sx[fallback], sy[fallback])
+    out["lat"] = lat.astype("float64")
+    out["lng"] = lng.astype("float64")
+    return out
+
+
+def sync_lake(source: str) -> list[Path] | None:
+    """Ingest new/changed raw CSVs for ``source`` into LAKE_DIR; returns the raw file list."""
+    src_dir = RAW_DIR / source
+    if not src_dir.exists():
+        return None
+    files = _raw_csvs(src_dir)
+    if not files:
+        return files
+    schema, normalize = {"csb": (_csb_schema, _normalize_csb), "crime": (_crime_schema, _normalize_crime)}[source]
+    stats = sync_raw_lake(LAKE_DIR / source, RAW_DIR, files, schema, normalize)
+    if stats["ingested"] or stats["removed"]:
+        log(f"Lake {source}: ingested {stats['ingested']} file(s), dropped {stats['removed']} "
+            f"({stats['rows']:,} rows total)")
+    return files
+
+
+def process_lake() -> None:
+    """Convert new or changed CSB / crime CSVs into the partitioned Parquet lake."""
+    phase("parse")
+    for source in ("csb", "crime"):
+        files = sync_lake(source)
+        if files is None:
+            log(f"No raw/{source}/ — skipping")
+            continue
+        manifest = LAKE_DIR / source / "_manifest.json"
+        if manifest.exists():
+            with open(manifest, "r") as f:
+                rows = sum(e["rows"] for e in json.load(f)["files"].values())
+            count_rows(read=rows)
+            log(f"Lake {source}: {len(files)} raw file(s), {rows:,} rows")
+
+
 # ── 1. CSB 311 Data ──────────────────────────────────────────────────────────
 
 def process_csb() -> None:
-    """Process CSB 311 complaint CSVs from raw data."""
-    csb_dir = RAW_DIR / "csb"
-    require_raw(csb_dir, "CSB")
+    """Process CSB 311 complaints from the raw-data lake (synced from raw/csb/ first)."""
+    import numpy as np
+    import pandas as pd
 
-    csv_files = list(csb_dir.rglob("*.csv"))
+    require_raw(RAW_DIR / "csb", "CSB")
+    phase("parse")
+    csv_files = sync_lake("csb")
     if not csv_files:
         sys.exit("No CSV files found in raw/csb/")
 
-    log(f"Found {len(csv_files)} CSV file(s), parsing...")
-
-    all_rows = []
-    for cf in csv_files:
-        with open(cf, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                all_rows.append(row)
-
-    log(f"Total rows: {len(all_rows):,}")
-
-    # Identify columns
-    sample = all_rows[0] if all_rows else {}
-    date_col = next((k for k in sample if k.upper() == "DATETIMEINIT"), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower() and "request" in k.lower()), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower() and "init" in k.lower()), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower()), None)
-    cat_col = next((k for k in sample if k.upper() == "PROBLEMCODE"), None)
-    if not cat_col:
-        cat_col = next((k for k in sample if "problem" in k.lower() or "category" in k.lower()), None)
-    if not cat_col:
-        cat_col = next((k for k in sample if "type" in k.lower()), None)
-    status_col = next((k for k in sample if "status" in k.lower()), None)
-    hood_col = next((k for k in sample if "neighborhood" in k.lower() or "nhd" in k.lower()), None)
-    lat_col = next((k for k in sample if k.lower() in ("latitude", "lat", "y")), None)
-    lng_col = next((k for k in sample if k.lower() in ("longitude", "lng", "lon", "long", "x")), None)
-    srx_col = next((k for k in sample if k.upper() == "SRX"), None)
-    sry_col = next((k for k in sample if k.upper() == "SRY"), None)
-    close_date_col = next((k for k in sample if k.upper() == "DATETIMECLOSED"), None)
-    if not close_date_col:
-        close_date_col = next((k for k in sample if "close" in k.lower() and "date" in k.lower()), None)
-
-    coords_src = "lat/lon" if (lat_col and lng_col) else ("SRX/SRY" if (srx_col and sry_col) else "none")
-    log(f"Columns: date={date_col}, category={cat_col}, status={status_col}, hood={hood_col}, coords={coords_src}")
-
-    def parse_date(s: str) -> str | None:
-        if not s:
-            return None
-        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        return None
-
-    def parse_datetime(s: str) -> datetime | None:
-        if not s:
-            return None
-        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt)
-            except ValueError:
-                continue
-        return None
+    # Every year for the heatmap; the year's extra columns only for its partitions
+    history = scan_raw_lake(LAKE_DIR / "csb", ["ts", "category", "hood", "lat", "lng"], csv_files, RAW_DIR)
+    log(f"Total rows: {len(history):,}")
+    year_cols = ["ts", "closed_ts", "category", "status", "hood"]
+    year_df = scan_raw_lake(LAKE_DIR / "csb", year_cols, csv_files, RAW_DIR,
+                            start=date(YEAR, 1, 1), end=date(YEAR + 1, 1, 1))
+    count_rows(read=len(history))  # year_df re-reads a subset of the same rows
 
     # Filter to target year
-    year_rows = []
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
-        if d and d.startswith(str(YEAR)):
-            year_rows.append(row)
-
-    log(f"Rows for {YEAR}: {len(year_rows):,}")
+    phase("aggregate")
+    log(f"Rows for {YEAR}: {len(year_df):,}")
 
-    if not year_rows:
+    if year_df.empty:
         log(f"WARNING: No rows found for year {YEAR}. Using all data instead.")
-        year_rows = all_rows
+        year_df = scan_raw_lake(LAKE_DIR / "csb", year_cols, csv_files, RAW_DIR)
 
     # Aggregations (year-filtered for analytics)
     categories = Counter()
@@ -200,70 +441,84 @@ def process_csb() -> None:
     monthly = defaultdict(Counter)
     neighborhoods = defaultdict(lambda: {
         "name": "", "total": 0, "closed": 0, "avgResolutionDays": 0,
-        "topCategories": Counter(), "_resolution_days": [],
+        "topCategories": Counter(),
     })
 
-    for row in year_rows:
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
+    ts = year_df["ts"]
+    resolution = (year_df["closed_ts"] - ts).where(year_df["closed_ts"] > ts).dt.days
+    rows = zip(
+        year_df["category"].astype(str).tolist(),
+        _day_strings(ts),
+        ts.dt.hour.tolist(),
+        ts.dt.weekday.tolist(),
+        year_df["hood"].astype(str).tolist(),
+        year_df["status"].astype(str).str.lower().tolist(),
+    )
+    for cat, date_str, hour, wday, hood_name, status in rows:
         categories[cat] += 1
 
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
         if date_str:
             daily_counts[date_str] += 1
             month_key = date_str[:7]
             monthly[month_key][cat] += 1
-
-        dt = parse_datetime(row.get(date_col, "")) if date_col else None
-        if dt:
-            hourly[str(dt.hour)] += 1
-            weekday[str(dt.weekday())] += 1
+            hourly[str(int(hour))] += 1
+            weekday[str(int(wday))] += 1
 
         # Neighborhood
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
         if hood_name:
             nb = neighborhoods[hood_name]
             nb["name"] = hood_name
             nb["total"] += 1
             nb["topCategories"][cat] += 1
 
-            status = (row.get(status_col, "") if status_col else "").strip().lower()
             if "closed" in status or "complete" in status:
                 nb["closed"] += 1
 
-            if close_date_col and date_col:
-                open_dt = parse_datetime(row.get(date_col, ""))
-                close_dt = parse_datetime(row.get(close_date_col, ""))
-                if open_dt and close_dt and close_dt > open_dt:
-                    days = (close_dt - open_dt).days
-                    if days < 365:
-                        nb["_resolution_days"].append(days)
-
-    # Heatmap points — ALL years for time slider scrubbing
-    heatmap_points = []
-    for row in all_rows:
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
-
-        lat, lng = None, None
-        if lat_col and lng_col:
-            try:
-                lat = float(row.get(lat_col, ""))
-                lng = float(row.get(lng_col, ""))
-            except (ValueError, TypeError):
-                pass
-        if lat is None and srx_col and sry_col:
-            try:
-                sx = float(row.get(srx_col, ""))
-                sy = float(row.get(sry_col, ""))
-                if sx != 0 and sy != 0:
-                    lng, lat = web_mercator_to_lnglat(sx, sy)
-            except (ValueError, TypeError):
-                pass
-        if lat is not None and lng is not None:
-            if 38.0 < lat < 39.0 and -91.0 < lng < -89.0:
-                heatmap_points.append([lat, lng, cat, date_str or "", hood_name])
-    log(f"Heatmap points (all years): {len(heatmap_points):,}")
+    cube = build_count_cube(ts, year_df["hood"], year_df["category"])
+
+    # Resolution time: a t-digest per neighborhood × category × month, merged per neighborhood
+    resolved = year_df[(resolution < 365) & (year_df["hood"].astype(str) != "")]
+    res_days = resolution[resolved.index].to_numpy()
+    cells = resolved.groupby(
+        [resolved["hood"].astype(str), resolved["category"].astype(str), resolved["ts"].dt.to_period("M")], sort=True,
+    ).indices
+    cell_digests = {
+        (hood, cat, str(month)): TDigest.from_values(res_days[idx]) for (hood, cat, month), idx in sorted(cells.items())
+    }
+    by_hood = defaultdict(list)
+    for (hood, _, _), digest in cell_digests.items():
+        by_hood[hood].append(digest)
+    hood_digests = {hood: TDigest.merge_all(digests) for hood, digests in by_hood.items()}
+
+    # Heatmap points — ALL years for time slider scrubbing, sampled per month × neighborhood
+    history_days = _day_strings(history["ts"])
+    hist_lat, hist_lng = history["lat"].to_numpy(), history["lng"].to_numpy()
+    hist_cat = history["category"].astype(str).to_numpy()
+    hist_hood = history["hood"].astype(str).to_numpy()
+
+    def point_rows(idx) -> list:
+        return [
+            [la, ln, cat, history_days[i] or "", hood_name]
+            for i, la, ln, cat, hood_name in zip(
+                idx.tolist(), hist_lat[idx].tolist(), hist_lng[idx].tolist(),
+                hist_cat[idx].tolist(), hist_hood[idx].tolist(),
+            )
+        ]
+
+    in_city = in_bbox(hist_lng, hist_lat).nonzero()[0]
+    log(f"Heatmap points (all years): {len(in_city):,}")
+    month_id = (history["ts"].dt.year * 100 + history["ts"].dt.month).fillna(0).astype(int).to_numpy()
+    sampled, stratum_weights = heatmap_sample(month_id, hist_hood, in_city)
+    heatmap_points = point_rows(sampled)
+
+    # Every dated in-city point, partitioned by month for the shard files
+    dated = in_city[month_id[in_city] > 0]
+    dated = dated[np.argsort(month_id[dated], kind="stable")]
+    months, starts = np.unique(month_id[dated], return_index=True)
+    month_shards = (
+        (f"{m // 100}-{m % 100:02d}", point_rows(idx))
+        for m, idx in zip(months.tolist(), np.split(dated, starts[1:]))
+    )
 
     # Finalize neighborhoods — key by zero-padded NHD_NUM
     final_hoods = {}
@@ -272,14 +527,16 @@ def process_csb() -> None:
             hood_id = str(int(key)).zfill(2)
         except (ValueError, TypeError):
             hood_id = key  # fallback for non-numeric
-        res_days = nb.pop("_resolution_days", [])
-        avg_res = round(sum(res_days) / len(res_days), 1) if res_days else 0
+        res = hood_digests[key].summary() if key in hood_digests else {"mean": 0, "p50": 0, "p90": 0, "p99": 0}
         top_cats = dict(nb["topCategories"].most_common(5))
         final_hoods[hood_id] = {
             "name": nb["name"],
             "total": nb["total"],
             "closed": nb["closed"],
-            "avgResolutionDays": avg_res,
+            "avgResolutionDays": res["mean"],
+            "p50ResolutionDays": res["p50"],
+            "p90ResolutionDays": res["p90"],
+            "p99ResolutionDays": res["p99"],
             "topCategories": top_cats,
         }
 
@@ -295,36 +552,50 @@ def process_csb() -> None:
         "dailyCounts": dict(sorted(daily_counts.items())),
         "hourly": dict(sorted(hourly.items(), key=lambda x: int(x[0]))),
         "weekday": dict(sorted(weekday.items(), key=lambda x: int(x[0]))),
-        "heatmapPoints": heatmap_points[::max(1, len(heatmap_points) // 50000)][:50000],
         "monthly": monthly_out,
+        "heatmapIndex": "csb_points/index.json",
     }
 
+    phase("serialize")
     out_path = OUT_DIR / f"csb_{YEAR}.json"
-    with open(out_path, "w") as f:
-        json.dump(csb_data, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
+    count_rows(written=len(final_hoods) + write_point_shards(
+        OUT_DIR / "csb_points", month_shards, out_path.name, heatmap_points, heatmap_weights(stratum_weights),
+    ))
+    write_count_cube("csb_cube", *cube)
+    write_density("csb_density", hist_lat, hist_lng, month_id, hist_cat, in_city)
+    cells = [
+        {"neighborhood": _hood_id(hood), "category": cat, "month": month, **digest.summary()}
+        for (hood, cat, month), digest in cell_digests.items()
+    ]
+    resolution_path = OUT_DIR / "csb_resolution.json"
+    size = write_json(resolution_path, encode_columnar(cells, ("neighborhood", "category", "month")))
+    log(f"Wrote {resolution_path.name} ({len(cells)} neighborhood × category × month cells, {size // 1024}KB)")
+
+    size = write_json(out_path, csb_data)
+    log(f"Wrote {out_path.name} ({size // 1024}KB)")
 
     latest_path = OUT_DIR / "csb_latest.json"
     shutil.copy2(out_path, latest_path)
     log(f"Copied to {latest_path.name}")
 
     # ── trends.json (multi-year) ──
+    phase("aggregate")
     yearly_monthly = defaultdict(dict)
     yearly_categories = defaultdict(Counter)
 
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
+    for d, cat in zip(history_days, history["category"].astype(str).tolist()):
         if not d:
             continue
         year = d[:4]
         if year not in (str(YEAR), str(YEAR - 1), str(YEAR - 2)):
             continue
         month_key = d[:7]
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
         yearly_monthly[year][month_key] = yearly_monthly[year].get(month_key, 0) + 1
         yearly_categories[year][cat] += 1
 
-    weather_data = fetch_weather(YEAR)
+    phase("fetch")
+    weather_data = load_weather(sorted({YEAR, *map(int, yearly_monthly)}))
+    phase("serialize")
 
     trends = {
         "yearlyMonthly": {y: dict(sorted(m.items())) for y, m in sorted(yearly_monthly.items())},
@@ -333,47 +604,127 @@ def process_csb() -> None:
     }
 
     out_path = OUT_DIR / "trends.json"
-    with open(out_path, "w") as f:
-        json.dump(trends, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, trends)
+    log(f"Wrote {out_path.name} ({size // 1024}KB)")
+
 
+def fetch_weather(start: str, end: str) -> dict:
+    """Fetch daily weather for [start, end] from Open-Meteo's historical API for St. Louis.
 
-def fetch_weather(year: int) -> dict:
-    """Fetch daily weather from Open-Meteo historical API for St. Louis."""
-    if requests is None:
-        log("WARNING: requests not available, skipping weather")
-        return {}
-    log("Fetching weather data from Open-Meteo...")
+    Days the archive has not filled in yet (it lags a few days) are left out.
+    """
     url = (
         f"https://archive-api.open-meteo.com/v1/archive?"
         f"latitude=38.627&longitude=-90.199"
-        f"&start_date={year}-01-01&end_date={year}-12-31"
+        f"&start_date={start}&end_date={end}"
         f"&daily=temperature_2m_max,temperature_2m_min,precipitation_sum"
         f"&temperature_unit=fahrenheit&precipitation_unit=inch"
         f"&timezone=America/Chicago"
     )
-    try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        daily = data.get("daily", {})
-        dates = daily.get("time", [])
-        highs = daily.get("temperature_2m_max", [])
-        lows = daily.get("temperature_2m_min", [])
-        precip = daily.get("precipitation_sum", [])
-
-        weather = {}
-        for i, d in enumerate(dates):
-            weather[d] = {
-                "high": round(highs[i], 1) if highs[i] is not None else None,
-                "low": round(lows[i], 1) if lows[i] is not None else None,
-                "precip": round(precip[i], 2) if precip[i] is not None else 0,
-            }
-        log(f"Got {len(weather)} days of weather data")
-        return weather
-    except Exception as e:
-        log(f"WARNING: Could not fetch weather data: {e}")
-        return {}
+    resp = http_session().get(url, timeout=30)
+    resp.raise_for_status()
+    daily = resp.json().get("daily", {})
+    dates = daily.get("time", [])
+    highs = daily.get("temperature_2m_max", [])
+    lows = daily.get("temperature_2m_min", [])
+    precip = daily.get("precipitation_sum", [])
+
+    weather = {}
+    for i, d in enumerate(dates):
+        if highs[i] is None and lows[i] is None and precip[i] is None:
+            continue
+        weather[d] = {
+            "high": round(highs[i], 1) if highs[i] is not None else None,
+            "low": round(lows[i], 1) if lows[i] is not None else None,
+            "precip": round(precip[i], 2) if precip[i] is not None else 0,
+        }
+    return weather
+
+
+WEATHER_MAX_REQUESTS = 4  # per year and run; more gaps than this are fetched as one span
+
+
+def _missing_ranges(days: dict, first: date, last: date) -> list[tuple[date, date]]:
+    """Contiguous (start, end) runs of dates in first..last that ``days`` has no entry for."""
+    ranges = []
+    day = first
+    while day <= last:
+        if day.isoformat() in days:
+            day += timedelta(days=1)
+            continue
+        start = day
+        while day <= last and day.isoformat() not in days:
+            day += timedelta(days=1)
+        ranges.append((start, day - timedelta(days=1)))
+    return ranges
+
+
+def load_weather(years: list[int]) -> dict:
+    """Daily weather for every day of ``years`` we can get, served from WEATHER_DIR.
+
+    Each year is cached as weather_<year>.json. Only the date ranges the
+    cache is missing are requested, so gaps in the middle of a year are
+    filled as well as the days after its last cached one. A past year is
+    marked closed, and never requested again, once every gap in it has been
+    requested; days the archive did not return are listed under "missing".
+    If the API is unreachable, whatever is cached is returned.
+    """
+    WEATHER_DIR.mkdir(parents=True, exist_ok=True)
+    today = date.today()
+    weather = {}
+    for year in years:
+        path = WEATHER_DIR / f"weather_{year}.json"
+        cached = {"year": year, "closed": False, "days": {}}
+        if path.exists():
+            with open(path, "r") as f:
+                cached = json.load(f)
+
+        last = date(year, 12, 31) if year < today.year else today - timedelta(days=1)
+        days = cached["days"]
+        missing = [] if cached["closed"] else _missing_ranges(days, date(year, 1, 1), last)
+        if len(missing) > WEATHER_MAX_REQUESTS:
+            missing = [(missing[0][0], missing[-1][1])]  # many scattered gaps: one request spanning them
+        if not missing:
+            weather.update(days)
+            continue
+        if requests is None:
+            log(f"WARNING: requests not available, using {len(days)} cached weather days for {year}")
+            weather.update(days)
+            continue
+
+        fetched, attempted = {}, 0
+        for start, end in missing:
+            log(f"Fetching {year} weather {start}..{end} from Open-Meteo...")
+            try:
+                fetched.update(fetch_weather(start.isoformat(), end.isoformat()))
+            except Exception as e:
+                log(f"WARNING: Could not fetch {year} weather data: {e}")
+                break
+            attempted += 1
+        # A past year whose gaps were all requested is closed even if the
+        # archive left some of them empty; those dates go in "missing"
+        closing = year < today.year and attempted == len(missing)
+        if not fetched and not closing:
+            weather.update(days)
+            continue
+        days.update(fetched)
+        cached["days"] = dict(sorted(days.items()))
+        if closing:
+            gaps = _missing_ranges(days, date(year, 1, 1), date(year, 12, 31))
+            cached["missing"] = [
+                (start + timedelta(days=i)).isoformat()
+                for start, end in gaps for i in range((end - start).days + 1)
+            ]
+            if cached["missing"]:
+                log(f"WARNING: Open-Meteo has no data for {len(cached['missing'])} day(s) of {year}")
+        cached["closed"] = closing
+
+        write_json(path, cached)
+        log(f"Got {len(fetched)} new days of {year} weather ({len(days)} cached)")
+        weather.update(cached["days"])
+
+    log(f"Weather: {len(weather)} days across {', '.join(map(str, years))}")
+    return dict(sorted(weather.items()))
 
 
 # ── 2. Neighborhood Boundaries ───────────────────────────────────────────────
@@ -389,9 +740,12 @@ def process_neighborhoods() -> None:
     if not shp_files:
         sys.exit("No .shp files found in raw/neighborhoods/")
 
+    phase("parse")
     log(f"Converting {shp_files[0].name} to GeoJSON...")
     gdf = gpd.read_file(shp_files[0])
+    count_rows(read=len(gdf))
 
+    phase("aggregate")
     if gdf.crs and gdf.crs != "EPSG:4326":
         log(f"Reprojecting from {gdf.crs} to EPSG:4326...")
         gdf = gdf.to_crs(epsg=4326)
@@ -399,16 +753,19 @@ def process_neighborhoods() -> None:
     geojson = json.loads(gdf.to_json())
     log(f"{len(geojson['features'])} neighborhood features")
 
+    phase("serialize")
+    count_rows(written=len(geojson["features"]))
     out_path = OUT_DIR / "neighborhoods.geojson"
-    with open(out_path, "w") as f:
-        json.dump(geojson, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, geojson)
+    log(f"Wrote {out_path.name} ({size // 1024}KB)")
 
 
 # ── 3. Transit (GTFS) ───────────────────────────────────────────────────────
 
 def process_gtfs() -> None:
     """Process GTFS feed into stops, routes, shapes, stop_stats."""
+    import pandas as pd
+
     gtfs_dir = RAW_DIR / "gtfs"
     require_raw(gtfs_dir, "GTFS")
 
@@ -433,6 +790,7 @@ def process_gtfs() -> None:
             return True
         return (gtfs_dir / name).exists()
 
+    phase("parse")
     log("Parsing GTFS feed...")
 
     # ── stops.geojson ──
@@ -442,15 +800,15 @@ def process_gtfs() -> None:
     reader = csv.DictReader(f)
     stops = list(reader)
     f.close()
+    count_rows(read=len(stops))
+    phase("aggregate")
 
+    # Unparseable or 0,0 coordinates fall outside the bbox along with out-of-area stops
+    coords = pd.DataFrame(stops, columns=["stop_lat", "stop_lon"]).apply(pd.to_numeric, errors="coerce")
+    keep = in_bbox(coords["stop_lon"], coords["stop_lat"])
     features = []
-    for s in stops:
-        try:
-            lat = float(s.get("stop_lat", 0))
-            lon = float(s.get("stop_lon", 0))
-        except ValueError:
-            continue
-        if lat == 0 or lon == 0:
+    for s, lat, lon, ok in zip(stops, coords["stop_lat"].tolist(), coords["stop_lon"].tolist(), keep.tolist()):
+        if not ok:
             continue
         features.append({
             "type": "Feature",
@@ -463,12 +821,14 @@ def process_gtfs() -> None:
         })
 
     stops_geo = {"type": "FeatureCollection", "features": features}
+    phase("serialize")
+    count_rows(written=len(features))
     out_path = OUT_DIR / "stops.geojson"
-    with open(out_path, "w") as f:
-        json.dump(stops_geo, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({len(features)} stops, {out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, stops_geo)
+    log(f"Wrote {out_path.name} ({len(features)} stops, {size // 1024}KB)")
 
     # ── routes.json ──
+    phase("parse")
     f = open_gtfs_file("routes.txt")
     if f:
         reader = csv.DictReader(f)
@@ -483,13 +843,16 @@ def process_gtfs() -> None:
             })
         f.close()
 
+        phase("serialize")
+        count_rows(read=len(routes_list), written=len(routes_list))
         out_path = OUT_DIR / "routes.json"
-        with open(out_path, "w") as f:
-            json.dump(routes_list, f, separators=(",", ":"))
+        write_json(out_path, routes_list)
         log(f"Wrote {out_path.name} ({len(routes_list)} routes)")
+        write_columnar(out_path.name, routes_list)
 
     # ── shapes.geojson ──
     if has_gtfs_file("shapes.txt"):
+        phase("parse")
         f = open_gtfs_file("shapes.txt")
         reader = csv.DictReader(f)
         shape_points = defaultdict(list)
@@ -515,26 +878,32 @@ def process_gtfs() -> None:
                     shape_to_route[sid] = rid
             f.close()
 
-        shape_features = []
-        for sid, pts in shape_points.items():
-            pts.sort(key=lambda x: x[0])
-            coords = [p[1] for p in pts]
-            if len(coords) < 2:
-                continue
-            shape_features.append({
-                "type": "Feature",
-                "properties": {"shape_id": sid, "route_id": shape_to_route.get(sid, "")},
-                "geometry": {"type": "LineString", "coordinates": coords},
-            })
+        count_rows(read=sum(len(pts) for pts in shape_points.values()))
+        phase("aggregate")
+        n_shapes = sum(1 for pts in shape_points.values() if len(pts) >= 2)
 
-        shapes_geo = {"type": "FeatureCollection", "features": shape_features}
+        def shape_features():
+            # One LineString at a time; each shape's points are dropped once written
+            for sid in list(shape_points):
+                pts = shape_points.pop(sid)
+                if len(pts) < 2:
+                    continue
+                pts.sort(key=lambda x: x[0])
+                yield {
+                    "type": "Feature",
+                    "properties": {"shape_id": sid, "route_id": shape_to_route.get(sid, "")},
+                    "geometry": {"type": "LineString", "coordinates": [p[1] for p in pts]},
+                }
+
+        phase("serialize")
+        count_rows(written=n_shapes)
         out_path = OUT_DIR / "shapes.geojson"
-        with open(out_path, "w") as f:
-            json.dump(shapes_geo, f, separators=(",", ":"))
-        log(f"Wrote {out_path.name} ({len(shape_features)} shapes, {out_path.stat().st_size // 1024}KB)")
+        size = write_json(out_path, feature_collection(shape_features()))
+        log(f"Wrote {out_path.name} ({n_shapes} shapes, {size // 1024}KB)")
 
     # ── stop_stats.json ──
     if has_gtfs_file("stop_times.txt"):
+        phase("parse")
         trip_to_route = {}
         if has_gtfs_file("trips.txt"):
             f = open_gtfs_file("trips.txt")
@@ -556,7 +925,9 @@ def process_gtfs() -> None:
             if rid:
                 stop_routes[sid].add(rid)
         f.close()
+        count_rows(read=reader.line_num - 1)
 
+        phase("aggregate")
         stats = {}
         for sid in stop_trips:
             stats[sid] = {
@@ -564,10 +935,12 @@ def process_gtfs() -> None:
                 "routes": sorted(stop_routes.get(sid, set())),
             }
 
+        phase("serialize")
+        count_rows(written=len(stats))
         out_path = OUT_DIR / "stop_stats.json"
-        with open(out_path, "w") as f:
-            json.dump(stats, f, separators=(",", ":"))
-        log(f"Wrote {out_path.name} ({len(stats)} stops, {out_path.stat().st_size // 1024}KB)")
+        size = write_json(out_path, stats)
+        log(f"Wrote {out_path.name} ({len(stats)} stops, {size // 1024}KB)")
+        write_columnar(out_path.name, stats)
 
     if zf:
         zf.close()
@@ -575,6 +948,61 @@ def process_gtfs() -> None:
 
 # ── 4. Food Desert Tracts ────────────────────────────────────────────────────
 
+USDA_SHEET = "Food Access Research Atlas"
+
+
+def _usda_stl_subset(xlsx_path: Path):
+    """Every column of the atlas's St. Louis rows, cached as Parquet keyed by the workbook hash.
+
+    The national sheet (~72k tracts) is only streamed when the workbook
+    changes; the sheet XML is scanned with a FIPS-prefix filter on the
+    tract column, so only the ~100 STL rows are decoded.
+    """
+    import hashlib
+
+    import pandas as pd
+
+    h = hashlib.sha256()
+    with open(xlsx_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    cache_dir = LAKE_DIR / "usda_food"
+    cache = cache_dir / f"stl_{h.hexdigest()[:16]}.parquet"
+    if cache.exists():
+        log(f"USDA atlas: STL subset from cache ({cache.name})")
+        return pd.read_parquet(cache)
+
+    log("Streaming USDA Food Access Research Atlas (STL tracts only)...")
+    rows = iter_xlsx_rows(
+        xlsx_path, USDA_SHEET, key_header="CensusTract",
+        keep=lambda v: bool(v) and str(v).startswith(STL_COUNTY_FIPS),
+    )
+    header = [str(v) if v is not None else f"col{i}" for i, v in enumerate(next(rows))]
+    data = [row + [None] * (len(header) - len(row)) for row in rows]
+    atlas = pd.DataFrame(data, columns=header, dtype=object)
+    for col in atlas.columns:
+        values = atlas[col].dropna()
+        if "CensusTract" in col:
+            atlas[col] = atlas[col].map(lambda v: str(v) if v is not None else None)
+        elif len(values) and all(isinstance(v, bool) for v in values):
+            atlas[col] = atlas[col].astype("boolean")
+        elif len(values) and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            atlas[col] = atlas[col].astype("Int64")
+        elif len(values) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            atlas[col] = atlas[col].astype("float64")
+        else:
+            atlas[col] = atlas[col].map(lambda v: str(v) if v is not None else None)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob("stl_*.parquet"):
+        stale.unlink()
+    tmp_path = cache.with_suffix(".tmp")
+    atlas.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache)
+    log(f"Cached {len(atlas)} STL tracts × {len(header)} columns → {cache.name}")
+    return atlas
+
+
 def process_food_deserts() -> None:
     """Merge USDA food access data with Census TIGER tract geometries."""
     xlsx_path = RAW_DIR / "food-access-research-atlas-data-download-2019.xlsx"
@@ -583,11 +1011,9 @@ def process_food_deserts() -> None:
     tiger_dir = RAW_DIR / "tiger_tracts"
     require_raw(tiger_dir, "TIGER tracts")
 
-    log("Parsing USDA Food Access Research Atlas...")
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
-    ws = wb["Food Access Research Atlas"]
-
-    headers = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
+    phase("parse")
+    atlas = _usda_stl_subset(xlsx_path)
+    headers = list(atlas.columns)
     tract_col = next((i for i, h in enumerate(headers) if h and "CensusTract" in str(h)), None)
     pop_col = next((i for i, h in enumerate(headers) if h and str(h).strip() == "POP2010"), None)
     poverty_col = next((i for i, h in enumerate(headers) if h and "Poverty" in str(h) and "Rate" in str(h)), None)
@@ -596,7 +1022,7 @@ def process_food_deserts() -> None:
     income_col = next((i for i, h in enumerate(headers) if h and "Median" in str(h) and "Income" in str(h)), None)
 
     stl_tracts = {}
-    for row in ws.iter_rows(min_row=2, values_only=True):
+    for row in atlas.astype(object).where(atlas.notna(), None).itertuples(index=False):
         tract_id = str(row[tract_col]) if tract_col is not None and row[tract_col] else ""
         if not tract_id.startswith(STL_COUNTY_FIPS):
             continue
@@ -617,7 +1043,7 @@ def process_food_deserts() -> None:
             "median_income": median_income,
         }
 
-    wb.close()
+    count_rows(read=len(atlas))
     log(f"Found {len(stl_tracts)} St. Louis census tracts in USDA data")
 
     shp_files = list(tiger_dir.rglob("*.shp"))
@@ -630,6 +1056,7 @@ def process_food_deserts() -> None:
     geoid_idx = fields.index("GEOID") if "GEOID" in fields else 0
     name_idx = fields.index("NAMELSAD") if "NAMELSAD" in fields else 1
 
+    phase("aggregate")
     features = []
     for sr in sf.shapeRecords():
         geoid = str(sr.record[geoid_idx])
@@ -655,10 +1082,11 @@ def process_food_deserts() -> None:
         })
 
     food_geo = {"type": "FeatureCollection", "features": features}
+    phase("serialize")
+    count_rows(written=len(features))
     out_path = OUT_DIR / "food_deserts.geojson"
-    with open(out_path, "w") as f:
-        json.dump(food_geo, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({len(features)} tracts, {out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, food_geo)
+    log(f"Wrote {out_path.name} ({len(features)} tracts, {size // 1024}KB)")
 
 
 # ── 5. Grocery Stores (embedded) ─────────────────────────────────────────────
@@ -701,6 +1129,8 @@ def write_grocery_stores() -> None:
         for s in GROCERY_STORES
     ]
     geo = {"type": "FeatureCollection", "features": features}
+    phase("serialize")
+    count_rows(written=len(features))
     out_path = OUT_DIR / "grocery_stores.geojson"
     with open(out_path, "w") as f:
         json.dump(geo, f, indent=2)
@@ -709,86 +1139,139 @@ def write_grocery_stores() -> None:
 
 # ── 6. Crime Data (SLMPD) ──────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
+def _crime_schema(header: tuple[str, ...]) -> dict[str, str | None]:
+    """Raw column behind each crime field for one SLMPD header layout (cached like _csb_schema).
+
+    The bulk historical file and the monthly files do not always share a
+    header, so every file is mapped by its own.
+    """
+    cols = list(header)
+    schema = {
+        "date": _pick(
+            cols,
+            lambda k: k.upper() in ("DATEOCCUR", "DATE_OCCUR", "DATEOCCURRED"),
+            lambda k: "date" in k.lower(),
+        ),
+        "crime": _pick(
+            cols,
+            lambda k: k.upper() in ("CRIME", "OFFENSE", "NIBRS"),
+            lambda k: "crime" in k.lower() or "offense" in k.lower(),
+        ),
+        "description": _pick(cols, lambda k: k.upper() == "DESCRIPTION", lambda k: "desc" in k.lower()),
+        "hood": _pick(cols, lambda k: k.upper() in ("NEIGHBORHOOD", "NBRHD"), lambda k: "neighborhood" in k.lower()),
+        "hood_num": _pick(
+            cols,
+            lambda k: k.upper() in ("NBHDNUM", "NEIGHBORHOODNUM", "NHD_NUM"),
+            lambda k: "nbhd" in k.lower() and "num" in k.lower(),
+        ),
+        "lat": _pick(cols, lambda k: k.upper() in ("XLAT", "LAT", "LATITUDE")),
+        "lng": _pick(cols, lambda k: k.upper() in ("XLON", "LON", "LONGITUDE", "LONG")),
+        "felony": _pick(cols, lambda k: k.upper() in ("FELMISCIT", "CRIME_TYPE")),
+        "firearm": _pick(cols, lambda k: k.upper() in ("FIREARMUSED", "FIREARM")),
+        "complaint": _pick(
+            cols,
+            lambda k: k.upper() in ("COMPLAINT", "INCIDENTNUM", "INCIDENT_NUM", "CN"),
+            lambda k: "complaint" in k.lower() or "incident" in k.lower(),
+        ),
+    }
+    log(f"Columns: date={schema['date']}, crime={schema['crime']}, hood={schema['hood']}, "
+        f"hoodNum={schema['hood_num']}, lat={schema['lat']}, complaint={schema['complaint']}")
+    return schema
+
+
+def _normalize_crime(df, schema: dict[str, str | None]):
+    """Typed lake columns for one SLMPD NIBRS export whose columns ``schema`` maps."""
+    import pandas as pd
+
+    date_col, crime_col, desc_col = schema["date"], schema["crime"], schema["description"]
+    hood_col, hood_num_col, lat_col, lng_col = schema["hood"], schema["hood_num"], schema["lat"], schema["lng"]
+    fel_col, firearm_col, complaint_col = schema["felony"], schema["firearm"], schema["complaint"]
+
+    # Use description if available, else crime code
+    offense = _strip(df, desc_col)
+    offense = offense.where(offense != "", _strip(df, crime_col)).replace("", "Unknown")
+    has_coords = lat_col and lng_col
+    lat = pd.to_numeric(df[lat_col], errors="coerce") if has_coords else pd.Series(float("nan"), index=df.index)
+    lng = pd.to_numeric(df[lng_col], errors="coerce") if has_coords else pd.Series(float("nan"), index=df.index)
+    ts = parse_timestamps(df[date_col] if date_col else pd.Series("", index=df.index), CRIME_DATE_FORMATS)
+    # Incident identity for cross-file dedup: complaint number + crime code + day; 0 = no complaint number.
+    # Only columns every layout has, normalized, since offense text depends on whether Description exists
+    complaint = _strip(df, complaint_col).str.upper().str.replace(r"[^0-9A-Z]", "", regex=True)
+    crime_code = _strip(df, crime_col).str.upper().str.lstrip("0")
+    identity = pd.DataFrame({"complaint": complaint, "crime": crime_code, "day": ts.dt.floor("D")})
+    incident_key = pd.util.hash_pandas_object(identity, index=False).where(complaint != "", 0)
+    return pd.DataFrame({
+        "ts": ts,
+        "offense": offense.astype("category"),
+        "felony": _strip(df, fel_col).str.upper().str.startswith("FEL"),
+        "firearm": _strip(df, firearm_col).str.upper().isin(("Y", "YES", "TRUE", "1")),
+        "hood": _strip(df, hood_col).astype("category"),
+        "hood_num": _strip(df, hood_num_col).astype("category"),
+        "lat": lat.where(lng.notna()).astype("float64"),
+        "lng": lng.where(lat.notna()).astype("float64"),
+        "incident_key": incident_key.astype("uint64"),
+    })
+
+
+def _drop_duplicate_incidents(df):
+    """Drop incidents already read from an earlier raw file.
+
+    SLMPD's bulk historical file and its monthly files can overlap. A row
+    is a duplicate when its ``incident_key`` (64-bit hash of complaint
+    number, crime code and day, set by _normalize_crime) first appeared in a
+    different file; repeats inside one file are kept. Rows without a
+    complaint number are never dropped. ``df`` must be in read order (as
+    scan() returns it) so the first file's copy survives. Logs the rows
+    removed per file.
+    """
+    import numpy as np
+
+    if df.empty:
+        return df
+    keys = df["incident_key"].to_numpy()
+    src = df["src"].factorize()[0]
+    # Sorted 8-byte keys act as the hash set: first row (and so first file) of every key
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    dup = (src != src[first][inverse]) & (keys != 0)
+    if not dup.any():
+        return df
+    for name, n in df.loc[dup, "src"].astype(str).value_counts(sort=False).items():
+        log(f"Dedup: dropped {n:,} incident(s) from {name} already read from an earlier file")
+    log(f"Dedup: {int(dup.sum()):,} duplicates removed, {int((~dup).sum()):,} incidents kept")
+    return df[~dup].reset_index(drop=True)
+
+
 def process_crime() -> None:
-    """Process SLMPD crime CSVs from raw data."""
-    crime_dir = RAW_DIR / "crime"
-    if not crime_dir.exists():
+    """Process SLMPD crime incidents for YEAR from the raw-data lake."""
+    import numpy as np
+
+    phase("parse")
+    csv_files = sync_lake("crime")
+    if csv_files is None:
         log("No crime data found in raw/crime/ — skipping")
         return
-
-    csv_files = list(crime_dir.rglob("*.csv")) + list(crime_dir.rglob("*.CSV"))
     if not csv_files:
         log("No CSV files found in raw/crime/ — skipping")
         return
 
-    log(f"Found {len(csv_files)} crime CSV file(s), parsing...")
+    # The scan filters to the target year's partitions; dedup then runs on
+    # those rows, so every count below sees each incident once
+    crime_cols = ["ts", "offense", "felony", "firearm", "hood", "hood_num", "lat", "lng", "incident_key"]
+    year_df = scan_raw_lake(LAKE_DIR / "crime", crime_cols, csv_files, RAW_DIR,
+                            start=date(YEAR, 1, 1), end=date(YEAR + 1, 1, 1))
+    count_rows(read=len(year_df))
+    year_df = _drop_duplicate_incidents(year_df)
 
-    all_rows = []
-    for cf in csv_files:
-        with open(cf, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                all_rows.append(row)
-
-    log(f"Total crime rows: {len(all_rows):,}")
-
-    # Identify columns (SLMPD NIBRS format)
-    sample = all_rows[0] if all_rows else {}
-    date_col = next((k for k in sample if k.upper() in ("DATEOCCUR", "DATE_OCCUR", "DATEOCCURRED")), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower()), None)
-    crime_col = next((k for k in sample if k.upper() in ("CRIME", "OFFENSE", "NIBRS")), None)
-    if not crime_col:
-        crime_col = next((k for k in sample if "crime" in k.lower() or "offense" in k.lower()), None)
-    desc_col = next((k for k in sample if k.upper() == "DESCRIPTION"), None)
-    if not desc_col:
-        desc_col = next((k for k in sample if "desc" in k.lower()), None)
-    hood_col = next((k for k in sample if k.upper() in ("NEIGHBORHOOD", "NBRHD")), None)
-    if not hood_col:
-        hood_col = next((k for k in sample if "neighborhood" in k.lower()), None)
-    hood_num_col = next((k for k in sample if k.upper() in ("NBHDNUM", "NEIGHBORHOODNUM", "NHD_NUM")), None)
-    if not hood_num_col:
-        hood_num_col = next((k for k in sample if "nbhd" in k.lower() and "num" in k.lower()), None)
-    lat_col = next((k for k in sample if k.upper() in ("XLAT", "LAT", "LATITUDE")), None)
-    lng_col = next((k for k in sample if k.upper() in ("XLON", "LON", "LONGITUDE", "LONG")), None)
-    fel_col = next((k for k in sample if k.upper() in ("FELMISCIT", "CRIME_TYPE")), None)
-    firearm_col = next((k for k in sample if k.upper() in ("FIREARMUSED", "FIREARM")), None)
-    district_col = next((k for k in sample if k.upper() == "DISTRICT"), None)
-
-    log(f"Columns: date={date_col}, crime={crime_col}, hood={hood_col}, hoodNum={hood_num_col}, lat={lat_col}")
-
-    def parse_date(s: str) -> str | None:
-        if not s:
-            return None
-        for fmt in ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        return None
+    # No incidents left for the target year: scan and dedup every year instead
+    phase("aggregate")
+    log(f"Crime rows for {YEAR}: {len(year_df):,}")
 
-    def parse_datetime(s: str) -> datetime | None:
-        if not s:
-            return None
-        for fmt in ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt)
-            except ValueError:
-                continue
-        return None
-
-    # Filter to target year
-    year_rows = []
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
-        if d and d.startswith(str(YEAR)):
-            year_rows.append(row)
-
-    log(f"Crime rows for {YEAR}: {len(year_rows):,}")
-
-    if not year_rows:
+    if year_df.empty:
         log(f"WARNING: No crime rows for year {YEAR}. Using all data.")
-        year_rows = all_rows
+        year_df = scan_raw_lake(LAKE_DIR / "crime", crime_cols, csv_files, RAW_DIR)
+        count_rows(read=len(year_df))
+        year_df = _drop_duplicate_incidents(year_df)
 
     # Aggregations
     categories = Counter()
@@ -800,49 +1283,46 @@ def process_crime() -> None:
         "name": "", "total": 0, "topOffenses": Counter(),
         "felonies": 0, "firearmIncidents": 0,
     })
-    heatmap_points = []
     total_felonies = 0
     total_firearms = 0
 
-    for row in year_rows:
-        # Use description if available, else crime code
-        offense = ""
-        if desc_col:
-            offense = (row.get(desc_col, "") or "").strip()
-        if not offense and crime_col:
-            offense = (row.get(crime_col, "") or "").strip()
-        offense = offense or "Unknown"
+    ts = year_df["ts"]
+    lat, lng = year_df["lat"].tolist(), year_df["lng"].tolist()
+    in_city = in_bbox(lng, lat)
+    offenses = year_df["offense"].astype(str).tolist()
+    days = _day_strings(ts)
+    hood_names = year_df["hood"].astype(str).tolist()
+    hood_nums = year_df["hood_num"].astype(str).tolist()
+    heatmap_hoods = [
+        str(int(num)).zfill(2) if num and num.isdigit() else name for num, name in zip(hood_nums, hood_names)
+    ]
+    rows = zip(
+        offenses,
+        days,
+        ts.dt.hour.tolist(),
+        ts.dt.weekday.tolist(),
+        year_df["felony"].tolist(),
+        year_df["firearm"].tolist(),
+        hood_names,
+        hood_nums,
+    )
+    for offense, date_str, hour, wday, is_felony, has_firearm, hood_name, hood_num in rows:
         categories[offense] += 1
 
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
         if date_str:
             daily_counts[date_str] += 1
             month_key = date_str[:7]
             monthly[month_key][offense] += 1
-
-        dt = parse_datetime(row.get(date_col, "")) if date_col else None
-        if dt:
-            hourly[str(dt.hour)] += 1
-            weekday_counts[str(dt.weekday())] += 1
+            hourly[str(int(hour))] += 1
+            weekday_counts[str(int(wday))] += 1
 
         # Felony / firearm tracking
-        is_felony = False
-        if fel_col:
-            fel_val = (row.get(fel_col, "") or "").strip().upper()
-            is_felony = fel_val.startswith("FEL")
-            if is_felony:
-                total_felonies += 1
-
-        has_firearm = False
-        if firearm_col:
-            fa_val = (row.get(firearm_col, "") or "").strip().upper()
-            has_firearm = fa_val in ("Y", "YES", "TRUE", "1")
-            if has_firearm:
-                total_firearms += 1
+        if is_felony:
+            total_felonies += 1
+        if has_firearm:
+            total_firearms += 1
 
         # Neighborhood
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
-        hood_num = (row.get(hood_num_col, "") if hood_num_col else "").strip()
         hood_key = hood_num if hood_num else hood_name
         if hood_key:
             nb = neighborhoods[hood_key]
@@ -854,18 +1334,25 @@ def process_crime() -> None:
             if has_firearm:
                 nb["firearmIncidents"] += 1
 
-        # Heatmap point
-        lat, lng = None, None
-        if lat_col and lng_col:
-            try:
-                lat = float(row.get(lat_col, ""))
-                lng = float(row.get(lng_col, ""))
-            except (ValueError, TypeError):
-                pass
-        if lat is not None and lng is not None:
-            if 38.0 < lat < 39.0 and -91.0 < lng < -89.0:
-                hood_id_for_heatmap = str(int(hood_num)).zfill(2) if hood_num and hood_num.isdigit() else hood_name
-                heatmap_points.append([lat, lng, offense, date_str or "", hood_id_for_heatmap])
+    def point_rows(idx) -> list:
+        return [[lat[i], lng[i], offenses[i], days[i] or "", heatmap_hoods[i]] for i in idx.tolist()]
+
+    city = in_city.nonzero()[0]
+    month_id = (ts.dt.year * 100 + ts.dt.month).fillna(0).astype(int).to_numpy()
+    sampled, stratum_weights = heatmap_sample(month_id, np.array(heatmap_hoods, dtype=object), city)
+    heatmap_points = point_rows(sampled)
+
+    # Every dated in-city point, partitioned by month; each shard's rows are built only as it is written
+    dated = city[month_id[city] > 0]
+    dated = dated[np.argsort(month_id[dated], kind="stable")]
+    months, starts = np.unique(month_id[dated], return_index=True)
+    month_shards = (
+        (f"{m // 100}-{m % 100:02d}", point_rows(idx))
+        for m, idx in zip(months.tolist(), np.split(dated, starts[1:]))
+    )
+
+    hood_num = year_df["hood_num"].astype(str)
+    cube = build_count_cube(ts, hood_num.where(hood_num != "", year_df["hood"].astype(str)), year_df["offense"])
 
     # Finalize neighborhoods — key by zero-padded NHD_NUM
     final_hoods = {}
@@ -899,13 +1386,22 @@ def process_crime() -> None:
         "hourly": dict(sorted(hourly.items(), key=lambda x: int(x[0]))),
         "weekday": dict(sorted(weekday_counts.items(), key=lambda x: int(x[0]))),
         "monthly": monthly_out,
-        "heatmapPoints": heatmap_points[:50000],
+        "heatmapIndex": "crime_points/index.json",
     }
 
+    phase("serialize")
     out_path = OUT_DIR / "crime.json"
-    with open(out_path, "w") as f:
-        json.dump(crime_data, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
+    count_rows(written=len(final_hoods) + write_point_shards(
+        OUT_DIR / "crime_points", month_shards, out_path.name, heatmap_points, heatmap_weights(stratum_weights),
+    ))
+    write_count_cube("crime_cube", *cube)
+    write_density(
+        "crime_density", np.array(lat, dtype=float), np.array(lng, dtype=float), month_id,
+        np.array(offenses, dtype=object), city,
+    )
+
+    size = write_json(out_path, crime_data)
+    log(f"Wrote {out_path.name} ({size // 1024}KB)")
 
 
 # ── 7. ARPA Fund Expenditures ──────────────────────────────────────────────
@@ -917,6 +1413,7 @@ def process_arpa() -> None:
         log("No ARPA data found — skipping")
         return
 
+    phase("parse")
     with open(arpa_path, "r") as f:
         raw = json.load(f)
 
@@ -927,6 +1424,8 @@ def process_arpa() -> None:
         return
 
     log(f"Processing {len(records)} ARPA transactions...")
+    count_rows(read=len(records))
+    phase("aggregate")
 
     # Category keywords for classification
     CATEGORY_KEYWORDS = {
@@ -999,28 +1498,20 @@ def process_arpa() -> None:
     projects.sort(key=lambda x: -x["totalSpent"])
 
     # Top vendors
-    top_vendors = [
-        {"name": name, "totalSpent": round(amount, 2)}
-        for name, amount in vendor_totals.most_common(20)
-    ]
+    top_vendors = [{"name": name, "totalSpent": amount} for name, amount in vendor_totals.most_common(20)]
 
     # Category breakdown
     cat_breakdown = Counter()
     for p in projects:
         cat_breakdown[p["category"]] += p["totalSpent"]
-    category_breakdown = {k: round(v, 2) for k, v in cat_breakdown.most_common()}
+    category_breakdown = dict(cat_breakdown.most_common())
 
     # Monthly + cumulative spending
     monthly_sorted = dict(sorted(monthly_spending.items()))
-    cumulative = {}
-    running = 0
-    for k, v in monthly_sorted.items():
-        running += v
-        cumulative[k] = round(running, 2)
-    monthly_sorted = {k: round(v, 2) for k, v in monthly_sorted.items()}
+    cumulative = dict(zip(monthly_sorted, accumulate(monthly_sorted.values())))
 
     arpa_data = {
-        "totalSpent": round(total_spent, 2),
+        "totalSpent": total_spent,
         "transactionCount": len(records),
         "projects": projects[:100],  # Top 100 projects
         "monthlySpending": monthly_sorted,
@@ -1029,10 +1520,12 @@ def process_arpa() -> None:
         "categoryBreakdown": category_breakdown,
     }
 
+    phase("serialize")
+    count_rows(written=len(arpa_data["projects"]))
     out_path = OUT_DIR / "arpa.json"
-    with open(out_path, "w") as f:
-        json.dump(arpa_data, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
+    cents = dict.fromkeys(("totalSpent", "monthlySpending", "cumulativeSpending", "categoryBreakdown"), 2)
+    size = write_json(out_path, arpa_data, precision=cents)
+    log(f"Wrote {out_path.name} ({size // 1024}KB)")
 
 
 # ── 8. Census Demographics ──────────────────────────────────────────────────
@@ -1053,10 +1546,13 @@ def process_demographics() -> None:
         log("No demographics data found — skipping")
         return
 
+    phase("parse")
     with open(demo_path, "r") as f:
         raw = json.load(f)
 
     log(f"Processing demographics for {len(raw)} neighborhoods...")
+    count_rows(read=len(raw))
+    phase("aggregate")
 
     def parse_int(s: str) -> int:
         """Parse a comma-formatted integer string."""
@@ -1141,10 +1637,11 @@ def process_demographics() -> None:
             "popChange10to20": pop_change,
         }
 
+    phase("serialize")
+    count_rows(written=len(demographics))
     out_path = OUT_DIR / "demographics.json"
-    with open(out_path, "w") as f:
-        json.dump(demographics, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({len(demographics)} neighborhoods, {out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, demographics)
+    log(f"Wrote {out_path.name} ({len(demographics)} neighborhoods, {size // 1024}KB)")
 
 
 # ── 9. Real Vacancy Data ───────────────────────────────────────────────────
@@ -1175,6 +1672,7 @@ def process_vacancies() -> None:
         return
 
     # Load vacancy overview (HANDLE -> {mo, vmin, vmaj, csb, unpd})
+    phase("parse")
     with open(overview_path, "r") as f:
         vacancy_overview = json.load(f)
     log(f"Loaded {len(vacancy_overview)} vacant parcels from API")
@@ -1186,7 +1684,10 @@ def process_vacancies() -> None:
         log(f"Reprojecting from {gdf.crs} to EPSG:4326...")
         gdf = gdf.to_crs(epsg=4326)
 
+    count_rows(read=len(vacancy_overview) + len(gdf))
+
     # Index parcels by HANDLE for fast lookup
+    phase("aggregate")
     parcel_lookup = {}
     for _, row in gdf.iterrows():
         handle = str(row.get("HANDLE", "")).strip()
@@ -1219,7 +1720,7 @@ def process_vacancies() -> None:
         centroid = geom.centroid
         lat = round(centroid.y, 6)
         lng = round(centroid.x, 6)
-        if not (38.0 < lat < 39.0 and -91.0 < lng < -89.0):
+        if not in_bbox(lng, lat):
             continue
 
         # Parcel fields
@@ -1346,10 +1847,48 @@ def process_vacancies() -> None:
 
     log(f"Matched {matched} of {len(vacancy_overview)} vacant parcels to parcel shapefile")
 
+    phase("serialize")
+    count_rows(written=len(properties))
     out_path = OUT_DIR / "vacancies.json"
-    with open(out_path, "w") as f:
-        json.dump(properties, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({len(properties)} properties, {out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, properties)
+    log(f"Wrote {out_path.name} ({len(properties)} properties, {size // 1024}KB)")
+    write_columnar(out_path.name, properties)
+    write_vacancy_shards(OUT_DIR / "vacancies", properties)
+
+
+VACANCY_INDEX_FIELDS = ("id", "lat", "lng", "triageScore", "bestUse", "neighborhood")
+
+
+def write_vacancy_shards(shard_dir: Path, properties: list[dict]) -> None:
+    """Split vacancies into a slim map index plus per-neighborhood detail shards.
+
+    index.json carries only VACANCY_INDEX_FIELDS per property, enough to
+    draw and colour the map; <NN>.json holds the full records of one
+    neighborhood ("00" for parcels without one). manifest.json lists every
+    file with its row count, byte size and a content hash to append as a
+    cache-busting query string, so unchanged shards stay cached.
+    """
+    import hashlib
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for stale in shard_dir.glob("*.json"):
+        stale.unlink()
+
+    by_hood = defaultdict(list)
+    for prop in properties:
+        by_hood[prop["neighborhood"] or "00"].append(prop)
+
+    def entry(name: str, rows: list) -> dict:
+        path = shard_dir / name
+        size = write_json(path, rows)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+        return {"file": f"{shard_dir.name}/{name}", "rows": len(rows), "bytes": size, "hash": digest}
+
+    index = entry("index.json", [{k: p[k] for k in VACANCY_INDEX_FIELDS} for p in properties])
+    shards = {hood: entry(f"{hood}.json", rows) for hood, rows in sorted(by_hood.items())}
+    write_json(shard_dir / "manifest.json", {"index": index, "shards": shards})
+    log(f"Wrote {shard_dir.name}/ (index {index['bytes'] // 1024}KB, {len(shards)} neighborhood shards, "
+        f"{sum(e['bytes'] for e in shards.values()) // 1024}KB)")
 
 
 # ── 10. Census ACS Housing Data ──────────────────────────────────────────────
@@ -1375,12 +1914,14 @@ def process_housing() -> None:
         return
 
     # Load ACS data (Census API returns header row + data rows)
+    phase("parse")
     with open(acs_path, "r") as f:
         raw = json.load(f)
 
     headers = raw[0]
     rows = raw[1:]
     log(f"Loaded {len(rows)} ACS tract records")
+    count_rows(read=len(rows))
 
     # Build GEOID -> {rent, value} lookup
     # GEOID = state + county + tract
@@ -1425,6 +1966,7 @@ def process_housing() -> None:
         nhd_gdf = nhd_gdf.to_crs(epsg=4326)
 
     # Spatial join: assign each tract to the neighborhood it overlaps most
+    phase("aggregate")
     joined = gpd.sjoin(tracts_gdf, nhd_gdf, how="left", predicate="intersects")
     log(f"Spatial join: {len(joined)} tract-neighborhood matches")
 
@@ -1458,10 +2000,387 @@ def process_housing() -> None:
         "neighborhoods": neighborhoods,
     }
 
+    phase("serialize")
+    count_rows(written=len(neighborhoods))
     out_path = OUT_DIR / "housing.json"
-    with open(out_path, "w") as f:
-        json.dump(housing, f, separators=(",", ":"))
-    log(f"Wrote {out_path.name} ({len(neighborhoods)} neighborhoods, {out_path.stat().st_size // 1024}KB)")
+    size = write_json(out_path, housing)
+    log(f"Wrote {out_path.name} ({len(neighborhoods)} neighborhoods, {size // 1024}KB)")
+
+
+# ── 11. Co-occurrence (CSB × crime × vacancies) ─────────────────────────────
+
+COOCCUR_RADIUS_M = 200  # crimes counted within this distance of a complaint / parcel
+COOCCUR_WINDOW_DAYS = 30  # … and within this many days after (or, as a baseline, before) a complaint
+
+
+def _cooccurrence_stats(df) -> dict:
+    """Totals and per-complaint / per-parcel rates for one group of _cooccurrence rows."""
+    vac = df[df["vacant"]]
+    complaints, vacant_complaints = int(df["complaint"].sum()), int(vac["complaint"].sum())
+    parcels = int(df["parcel"].sum())
+    after_all = int(df["after"].sum())
+    after, before = int(vac["after"].sum()), int(vac["before"].sum())
+    near = int(df["near"].sum())
+    return {
+        "complaints": complaints,
+        "crimesAfterComplaints": after_all,
+        "crimesAfterPerComplaint": round(after_all / complaints, 3) if complaints else None,
+        "vacantComplaints": vacant_complaints,
+        "crimesAfterVacant": after,
+        "crimesBeforeVacant": before,
+        "crimesAfterPerVacantComplaint": round(after / vacant_complaints, 3) if vacant_complaints else None,
+        "afterBeforeRatio": round(after / before, 3) if before else None,
+        "vacantParcels": parcels,
+        "crimesNearVacantParcels": near,
+        "crimesPerVacantParcel": round(near / parcels, 3) if parcels else None,
+    }
+
+
+def process_cooccurrence() -> None:
+    """Crime near 311 complaints and vacant parcels, per neighborhood (spacetime.py).
+
+    For every CSB complaint in YEAR: crimes within COOCCUR_RADIUS_M in the
+    COOCCUR_WINDOW_DAYS after it, and in the same span before it as a
+    baseline. For every vacant parcel in vacancies.json: crimes within the
+    radius at any time in YEAR. Counts are (complaint or parcel, crime)
+    pairs, so a crime near two complaints counts for both.
+    """
+    import pandas as pd
+
+    phase("parse")
+    csb_files, crime_files = sync_lake("csb"), sync_lake("crime")
+    if not csb_files or not crime_files:
+        log("Needs both raw/csb/ and raw/crime/ — skipping")
+        return
+    start, end = date(YEAR, 1, 1), date(YEAR + 1, 1, 1)
+    margin = timedelta(days=COOCCUR_WINDOW_DAYS)
+    # Crimes a window either side of the year, so complaints near Jan 1 / Dec 31 see whole windows
+    crime = scan_raw_lake(LAKE_DIR / "crime", ["ts", "lat", "lng", "incident_key"], crime_files, RAW_DIR,
+                          start=start - margin, end=end + margin)
+    csb = scan_raw_lake(LAKE_DIR / "csb", ["ts", "category", "hood", "lat", "lng"], csb_files, RAW_DIR,
+                        start=start, end=end)
+    parcels = []
+    vacancies_path = OUT_DIR / "vacancies.json"
+    if vacancies_path.exists():
+        with open(vacancies_path, "r") as f:
+            parcels = json.load(f)
+    else:
+        log("No vacancies.json — parcel counts will be empty (run the vacancies step first)")
+    count_rows(read=len(crime) + len(csb) + len(parcels))
+
+    phase("aggregate")
+    crime = _drop_duplicate_incidents(crime)
+    epoch = pd.Timestamp(start)
+
+    def located(df):
+        keep = in_bbox(df["lng"], df["lat"], CITY_BBOX) & df["ts"].notna().to_numpy()
+        df = df[keep].reset_index(drop=True)
+        x, y = lnglat_to_metres(df["lng"], df["lat"])
+        return df, x, y, ((df["ts"] - epoch) / pd.Timedelta(days=1)).to_numpy()
+
+    crime, ex, ey, eday = located(crime)
+    csb, qx, qy, qday = located(csb)
+    index = SpaceTimeIndex(ex, ey, eday, cell_m=COOCCUR_RADIUS_M, bucket_days=COOCCUR_WINDOW_DAYS)
+    log(f"Space-time index: {index.size:,} crimes in {len(index.keys):,} cell × {COOCCUR_WINDOW_DAYS}-day buckets")
+
+    after = index.count(qx, qy, qday, COOCCUR_RADIUS_M, (0, COOCCUR_WINDOW_DAYS))
+    before = index.count(qx, qy, qday, COOCCUR_RADIUS_M, (-COOCCUR_WINDOW_DAYS, 0))
+    px, py = lnglat_to_metres([p["lng"] for p in parcels], [p["lat"] for p in parcels])
+    near = index.count(px, py, [0] * len(parcels), COOCCUR_RADIUS_M, (0, (end - start).days))
+    log(f"Joined {len(csb):,} complaints and {len(parcels):,} vacant parcels against {len(crime):,} crimes")
+
+    rows = pd.concat([
+        pd.DataFrame({
+            "hood": [_hood_id(h) for h in csb["hood"].astype(str)],
+            "vacant": csb["category"].astype(str).str.upper().str.contains("VACANT").to_numpy(),
+            "complaint": 1, "parcel": 0, "after": after, "before": before, "near": 0,
+        }),
+        pd.DataFrame({
+            "hood": [p["neighborhood"] for p in parcels],
+            "vacant": False, "complaint": 0, "parcel": 1, "after": 0, "before": 0, "near": near,
+        }),
+    ], ignore_index=True)
+    hoods = {
+        hood: _cooccurrence_stats(group)
+        for hood, group in rows[rows["hood"] != ""].groupby("hood", sort=True)
+    }
+
+    phase("serialize")
+    out = {
+        "year": YEAR,
+        "radiusM": COOCCUR_RADIUS_M,
+        "windowDays": COOCCUR_WINDOW_DAYS,
+        "city": _cooccurrence_stats(rows),
+        "neighborhoods": hoods,
+    }
+    count_rows(written=len(hoods))
+    out_path = OUT_DIR / "cooccurrence.json"
+    size = write_json(out_path, out)
+    log(f"Wrote {out_path.name} ({len(hoods)} neighborhoods, {size // 1024}KB)")
+
+
+# ── 12. Training Panel (neighborhood × month) ───────────────────────────────
+
+TRAINING_DIR = PYTHON_DIR / "training"
+PANEL_TEST_MONTHS = 9  # holdout = last 9 months (see model2_codebook.json)…
+PANEL_TEST_FRAC = 0.25  # …or the last quarter of the months, if that is fewer
+PANEL_MIN_TRAIN_MONTHS = 12  # refuse to write a split with less training history
+PANEL_XS_TRAIN_FRAC = 0.8  # cross-sectional split: 80% of neighborhoods
+PANEL_SEED = 2021  # seeds the monthly noise draw + cross-sectional split
+
+# Column order matches model2_codebook.json
+PANEL_COLUMNS = [
+    "neighborhood_id", "neighborhood_name", "month", "year", "month_num",
+    "population", "pct_black", "pct_white", "pct_hispanic",
+    "total_housing_units", "census_vacancy_rate", "census_vacant_units",
+    "active_vacancy_count", "avg_condition_rating", "condemned_count",
+    "total_violation_count", "violations_per_vacancy",
+    "transit_stop_count", "transit_trip_count", "transit_route_count", "transit_trips_per_1000pop",
+    "csb_complaint_count", "csb_vacant_bldg_complaints", "csb_avg_resolution_days", "complaints_per_1000pop",
+    "city_monthly_crime", "est_monthly_crime_count",
+    "neigh_total_crime_snapshot", "firearm_incidents_snapshot",
+    "crime_rate_per_1000pop", "firearm_rate_per_1000pop",
+]
+
+
+def _panel_static_features():
+    """Build one row per neighborhood with every time-invariant panel column.
+
+    Each source is loaded into a DataFrame and aggregated with a groupby,
+    then left-joined onto the demographics frame on neighborhood_id.
+    """
+    import geopandas as gpd
+    import pandas as pd
+
+    for name in ("demographics.json", "neighborhoods.geojson", "vacancies.json", "stops.geojson",
+                 "stop_stats.json", "csb_latest.json", "crime.json"):
+        if not (OUT_DIR / name).exists():
+            log(f"{name} not found — run the other steps first")
+            return None
+
+    def per_1000(num, pop):
+        return (num / pop.where(pop > 0) * 1000).fillna(0).round(2)
+
+    # Demographics (2020 Census)
+    with open(OUT_DIR / "demographics.json", "r") as f:
+        demo_raw = json.load(f)
+    demo = pd.DataFrame([
+        {
+            "neighborhood_id": nhd_id,
+            "neighborhood_name": d["name"],
+            "population": d["population"]["2020"],
+            "black": d["race"]["black"],
+            "white": d["race"]["white"],
+            "hispanic": d["race"]["hispanic"],
+            "total_housing_units": d["housing"]["totalUnits"],
+            "census_vacancy_rate": d["housing"]["vacancyRate"],
+            "census_vacant_units": d["housing"]["vacant"],
+        }
+        for nhd_id, d in demo_raw.items()
+    ])
+    pop = demo["population"]
+    for col in ("black", "white", "hispanic"):
+        demo[f"pct_{col}"] = (demo.pop(col) / pop.where(pop > 0) * 100).fillna(0).round(2)
+
+    # Vacancies (one row per tracked parcel)
+    vac = pd.read_json(OUT_DIR / "vacancies.json", dtype={"neighborhood": str})
+    vac_agg = vac.groupby("neighborhood").agg(
+        active_vacancy_count=("id", "size"),
+        avg_condition_rating=("conditionRating", "mean"),
+        condemned_count=("condemned", "sum"),
+        total_violation_count=("violationCount", "sum"),
+    )
+    vac_agg["avg_condition_rating"] = vac_agg["avg_condition_rating"].round(2)
+    vac_agg["violations_per_vacancy"] = (vac_agg["total_violation_count"] / vac_agg["active_vacancy_count"]).round(2)
+
+    # Transit: spatial join stops → neighborhoods, then attach GTFS trip/route stats
+    nhd_gdf = gpd.read_file(OUT_DIR / "neighborhoods.geojson")[["NHD_NUM", "geometry"]]
+    stops_gdf = gpd.read_file(OUT_DIR / "stops.geojson")[["stop_id", "geometry"]]
+    stops = gpd.sjoin(stops_gdf, nhd_gdf, how="inner", predicate="within")
+    stops["neighborhood_id"] = stops["NHD_NUM"].astype(int).astype(str).str.zfill(2)
+    stops["stop_id"] = stops["stop_id"].astype(str)  # numeric IDs come back as int from GeoJSON
+    stop_stats = pd.read_json(OUT_DIR / "stop_stats.json", orient="index", convert_axes=False)
+    stops = stops.merge(stop_stats, left_on="stop_id", right_index=True, how="left")
+    stops["trip_count"] = stops["trip_count"].fillna(0)
+    transit = stops.groupby("neighborhood_id").agg(
+        transit_stop_count=("stop_id", "size"),
+        transit_trip_count=("trip_count", "sum"),
+    )
+    routes = stops[["neighborhood_id", "routes"]].explode("routes").dropna()
+    transit["transit_route_count"] = routes.groupby("neighborhood_id")["routes"].nunique()
+    log(f"Matched {len(stops):,} of {len(stops_gdf):,} stops to neighborhoods")
+
+    # CSB 311 (neighborhood rollup from csb_latest.json)
+    with open(OUT_DIR / "csb_latest.json", "r") as f:
+        csb_hoods = json.load(f)["neighborhoods"]
+    csb = pd.DataFrame.from_dict(csb_hoods, orient="index")
+    csb["csb_vacant_bldg_complaints"] = csb["topCategories"].map(
+        lambda cats: sum(n for cat, n in cats.items() if "VACANT" in cat.upper())
+    )
+    csb = csb.rename(columns={"total": "csb_complaint_count", "avgResolutionDays": "csb_avg_resolution_days"})
+    csb = csb[["csb_complaint_count", "csb_vacant_bldg_complaints", "csb_avg_resolution_days"]]
+
+    # Crime snapshot (neighborhood totals from crime.json)
+    with open(OUT_DIR / "crime.json", "r") as f:
+        crime_hoods = json.load(f)["neighborhoods"]
+    crime = pd.DataFrame.from_dict(crime_hoods, orient="index")
+    crime = crime.rename(columns={"total": "neigh_total_crime_snapshot", "firearmIncidents": "firearm_incidents_snapshot"})
+    crime = crime[["neigh_total_crime_snapshot", "firearm_incidents_snapshot"]]
+
+    static = (
+        demo.set_index("neighborhood_id")
+        .join(vac_agg)
+        .join(transit)
+        .join(csb)
+        .join(crime)
+        .fillna(0)
+        .reset_index()
+    )
+    int_cols = [
+        "active_vacancy_count", "condemned_count", "total_violation_count", "transit_stop_count",
+        "transit_trip_count", "transit_route_count", "csb_complaint_count", "csb_vacant_bldg_complaints",
+        "neigh_total_crime_snapshot", "firearm_incidents_snapshot",
+    ]
+    static[int_cols] = static[int_cols].astype(int)
+    pop = static["population"]
+    static["transit_trips_per_1000pop"] = per_1000(static["transit_trip_count"], pop)
+    static["complaints_per_1000pop"] = per_1000(static["csb_complaint_count"], pop)
+    static["crime_rate_per_1000pop"] = per_1000(static["neigh_total_crime_snapshot"], pop)
+    static["firearm_rate_per_1000pop"] = per_1000(static["firearm_incidents_snapshot"], pop)
+    return static.sort_values("neighborhood_id").reset_index(drop=True)
+
+
+def _panel_city_monthly_crime():
+    """City-wide crime incidents per complete month, over every year in raw/crime/.
+
+    Counts come from the raw lake (deduplicated like process_crime), so the
+    panel's month axis spans the full history rather than just YEAR. Without
+    raw/crime/ the target year's crime.json dailyCounts are used instead.
+    """
+    import pandas as pd
+
+    csv_files = sync_lake("crime")
+    if csv_files:
+        incidents = _drop_duplicate_incidents(
+            scan_raw_lake(LAKE_DIR / "crime", ["ts", "incident_key"], csv_files, RAW_DIR)
+        )
+        count_rows(read=len(incidents))
+        days = incidents["ts"].dropna().dt.floor("D")
+        daily = days.value_counts().sort_index()
+        dates = pd.DatetimeIndex(daily.index)
+    else:
+        with open(OUT_DIR / "crime.json", "r") as f:
+            daily = pd.Series(json.load(f).get("dailyCounts", {}), dtype="int64")
+        dates = pd.to_datetime(daily.index)
+    if daily.empty:
+        return daily
+    monthly = daily.groupby(dates.strftime("%Y-%m")).sum()
+    # Drop partial months at either end so they aren't frozen into the panel half-counted
+    first_day, last_day = dates.min(), dates.max()
+    if first_day.day != 1:
+        monthly = monthly.drop(first_day.strftime("%Y-%m"))
+    if not last_day.is_month_end:
+        monthly = monthly.drop(last_day.strftime("%Y-%m"), errors="ignore")
+    return monthly
+
+
+def _write_panel_table(df, stem: str) -> None:
+    count_rows(written=len(df))
+    df.to_parquet(TRAINING_DIR / f"{stem}.parquet", index=False)
+    df.to_csv(TRAINING_DIR / f"{stem}.csv", index=False)
+    log(f"Wrote {stem}.parquet + {stem}.csv ({len(df):,} rows)")
+
+
+def process_panel() -> None:
+    """Build the neighborhood × month training panel described in model2_codebook.json.
+
+    Reads the processed outputs in public/data/ plus the crime lake's monthly
+    totals and writes panel_full, panel_train/panel_test (the last
+    PANEL_TEST_MONTHS months held out, or the last PANEL_TEST_FRAC of them
+    when the history is short) and the cross-sectional splits to
+    python/training/ as Parquet + CSV. Exits if fewer than
+    PANEL_MIN_TRAIN_MONTHS months would be left for training.
+
+    History is append-only: months already in panel_full.parquet are kept
+    as-is and only months newly present in the crime history are built. Set
+    PANEL_REBUILD=1 to regenerate the whole panel.
+    """
+    import numpy as np
+    import pandas as pd
+
+    phase("parse")
+    static = _panel_static_features()
+    if static is None:
+        return
+    city_monthly = _panel_city_monthly_crime()
+    if city_monthly.empty:
+        log("No crime history (raw/crime/ or crime.json dailyCounts) — skipping panel")
+        return
+
+    existing = None
+    full_parquet = TRAINING_DIR / "panel_full.parquet"
+    full_csv = TRAINING_DIR / "panel_full.csv"
+    if os.environ.get("PANEL_REBUILD") != "1":
+        if full_parquet.exists():
+            existing = pd.read_parquet(full_parquet)
+        elif full_csv.exists():
+            existing = pd.read_csv(full_csv, dtype={"neighborhood_id": str, "month": str})
+        if existing is not None and list(existing.columns) != PANEL_COLUMNS:
+            log("Existing panel has a different schema — rebuilding")
+            existing = None
+
+    count_rows(read=len(static) + (len(existing) if existing is not None else 0))
+
+    phase("aggregate")
+    done_months = set(existing["month"]) if existing is not None else set()
+    new_months = sorted(m for m in city_monthly.index if m not in done_months)
+    log(f"Panel: {len(done_months)} existing month(s), {len(new_months)} new")
+
+    if new_months:
+        months = pd.DataFrame({"month": new_months})
+        months["year"] = months["month"].str[:4].astype(int)
+        months["month_num"] = months["month"].str[5:7].astype(int)
+        months["city_monthly_crime"] = city_monthly.loc[new_months].to_numpy()
+        rows = static.merge(months, how="cross").sort_values(["neighborhood_id", "month"], ignore_index=True)
+
+        # est_monthly_crime_count = neighborhood crime share × city monthly total × noise(0.9–1.1).
+        # Noise is drawn per month from a (seed, year, month) stream so an
+        # incremental append reproduces the same values as a full rebuild.
+        crime_total = static["neigh_total_crime_snapshot"].sum()
+        share = rows["neigh_total_crime_snapshot"] / crime_total if crime_total else 0.0
+        noise = pd.Series(0.0, index=rows.index)
+        for (year, month_num), idx in rows.groupby(["year", "month_num"]).groups.items():
+            rng = np.random.default_rng([PANEL_SEED, year, month_num])
+            noise.loc[idx] = rng.uniform(0.9, 1.1, size=len(idx))
+        rows["est_monthly_crime_count"] = (share * rows["city_monthly_crime"] * noise).round(2)
+
+        rows = rows[PANEL_COLUMNS]
+        panel = rows if existing is None else pd.concat([existing, rows], ignore_index=True)
+        panel = panel.sort_values(["neighborhood_id", "month"], ignore_index=True)
+    else:
+        panel = existing
+
+    all_months = sorted(panel["month"].unique())
+    n_test = max(1, min(PANEL_TEST_MONTHS, int(len(all_months) * PANEL_TEST_FRAC)))
+    if len(all_months) - n_test < PANEL_MIN_TRAIN_MONTHS:
+        sys.exit(f"Panel has {len(all_months)} month(s) ({all_months[0]} → {all_months[-1]}): too few for "
+                 f"{PANEL_MIN_TRAIN_MONTHS} training months plus a holdout. Add earlier raw/crime/ files.")
+    test_months = set(all_months[-n_test:])
+    is_test = panel["month"].isin(test_months)
+
+    # Cross-sectional: one row per neighborhood (first panel month), seeded 80/20 split
+    xs = panel[panel["month"] == all_months[0]].reset_index(drop=True)
+    order = np.random.default_rng(PANEL_SEED).permutation(len(xs))
+    n_train = round(len(xs) * PANEL_XS_TRAIN_FRAC)
+
+    phase("serialize")
+    TRAINING_DIR.mkdir(parents=True, exist_ok=True)
+    _write_panel_table(panel, "panel_full")
+    _write_panel_table(panel[~is_test], "panel_train")
+    _write_panel_table(panel[is_test], "panel_test")
+    _write_panel_table(xs.iloc[order[:n_train]], "crosssectional_train")
+    _write_panel_table(xs.iloc[order[n_train:]], "crosssectional_test")
+    log(f"Panel covers {all_months[0]} → {all_months[-1]} ({panel['neighborhood_id'].nunique()} neighborhoods)")
 
 
 # ── Main ─────────────────────────────────────────────────────────────────────
@@ -1471,15 +2390,53 @@ STEPS = {
     "gtfs": ("GTFS transit", process_gtfs),
     "food": ("Food deserts", process_food_deserts),
     "grocery": ("Grocery stores", write_grocery_stores),
+    "lake": ("Raw data lake (CSB + crime)", process_lake),
     "csb": ("CSB 311 data", process_csb),
     "crime": ("Crime data", process_crime),
     "arpa": ("ARPA funds", process_arpa),
     "demographics": ("Demographics", process_demographics),
     "vacancies": ("Vacancy data", process_vacancies),
     "housing": ("Housing (ACS)", process_housing),
+    "cooccurrence": ("Co-occurrence (CSB × crime × vacancies)", process_cooccurrence),
+    "panel": ("Training panel", process_panel),
 }
 
 
+def write_run_report(path: Path, started: str, steps: list[dict]) -> None:
+    """Write the --profile report and print a per-step summary table."""
+    import platform
+
+    report = {
+        "startedAt": started,
+        "year": YEAR,
+        "rawDir": str(RAW_DIR),
+        "outDir": str(OUT_DIR),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "totals": {
+            "wallS": round(sum(s["wallS"] for s in steps), 4),
+            "cpuS": round(sum(s["cpuS"] for s in steps), 4),
+            "peakRssMb": max((s["peakRssMb"] for s in steps), default=0),
+            "rowsRead": sum(s["rowsRead"] for s in steps),
+            "rowsWritten": sum(s["rowsWritten"] for s in steps),
+        },
+        "steps": steps,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, report)
+
+    print("\n" + "=" * 60)
+    print("  Profile")
+    print("=" * 60)
+    print(f"  {'step':<14} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'rows in':>10} {'rows out':>9}  phases")
+    for s in steps:
+        phases = " ".join(f"{k}={v:.2f}" for k, v in s["phases"].items())
+        flag = "" if s["status"] == "ok" else " FAILED"
+        print(f"  {s['key']:<14} {s['wallS']:>8.2f} {s['cpuS']:>8.2f} {s['peakRssMb']:>8.1f} "
+              f"{s['rowsRead']:>10,} {s['rowsWritten']:>9,}  {phases}{flag}")
+    log(f"Wrote {path}")
+
+
 def main():
     import argparse
 
@@ -1490,7 +2447,32 @@ def main():
         help=f"Process only this step. Choices: {', '.join(STEPS.keys())}",
     )
     parser.add_argument("--list", action="store_true", help="List available steps and exit")
+    parser.add_argument("--raw-dir", type=Path, help="Read raw data from here instead (e.g. synth_raw.py output)")
+    parser.add_argument("--out-dir", type=Path, help="Write processed files here instead of public/data/")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-step time, memory, rows, bytes and phases to run_report.json")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile: also dump <step>.pstats and flamegraph <step>.folded stacks")
+    parser.add_argument("--profile-dir", type=Path,
+                        help="Where the report and dumps go (default: data/profile/, or <out-dir>/profile/)")
+    parser.add_argument("--http", choices=HTTP_MODES, help="Record/replay HTTP transport (default: $HTTP_MODE or passthrough)")
     args = parser.parse_args()
+    if args.http:
+        os.environ["HTTP_MODE"] = args.http
+    args.profile = args.profile or args.cprofile
+
+    global RAW_DIR, OUT_DIR, TRAINING_DIR, LAKE_DIR, WEATHER_DIR, PROFILE_DIR
+    if args.raw_dir:
+        RAW_DIR = args.raw_dir.resolve()
+        LAKE_DIR = RAW_DIR / "lake"
+    if args.out_dir:
+        # Keep the checked-in training/ panel and python/data/ untouched when writing elsewhere
+        OUT_DIR = args.out_dir.resolve()
+        TRAINING_DIR = OUT_DIR / "training"
+        TRAINING_DIR.mkdir(parents=True, exist_ok=True)
+        WEATHER_DIR = OUT_DIR / "weather"
+        PROFILE_DIR = OUT_DIR / "profile"
+    args.profile_dir = args.profile_dir or PROFILE_DIR
 
     if args.list:
         print("Available steps:")
@@ -1516,20 +2498,36 @@ def main():
         if args.only not in STEPS:
             sys.exit(f"Unknown step '{args.only}'. Use --list to see options.")
 
-    for key, (name, fn) in STEPS.items():
-        if args.only and args.only != key:
-            continue
-        try:
-            print(f"\n── {name} ──")
-            fn()
-        except SystemExit:
-            raise
-        except Exception as e:
-            print(f"\n\u274c {name} failed: {e}")
+    started = datetime.now().isoformat(timespec="seconds")
+    report_steps = []
+    # A step ending the run with sys.exit still gets its profile written
+    try:
+        for key, (name, fn) in STEPS.items():
+            if args.only and args.only != key:
+                continue
+            prof = None
+            try:
+                print(f"\n── {name} ──")
+                if args.profile:
+                    prof = StepProfile(key, name, [OUT_DIR, TRAINING_DIR], args.profile_dir if args.cprofile else None)
+                    with prof:
+                        fn()
+                else:
+                    fn()
+            except SystemExit:
+                raise
+            except Exception as e:
+                print(f"\n\u274c {name} failed: {e}")
+            finally:
+                if prof is not None and hasattr(prof, "wall"):
+                    report_steps.append(prof.record())
+    finally:
+        if args.profile:
+            write_run_report(args.profile_dir / "run_report.json", started, report_steps)
 
     # Summary
     print("\n" + "=" * 60)
-    print("  Done! Files in public/data/:")
+    print(f"  Done! Files in {OUT_DIR.name}/:")
     print("=" * 60)
     for f in sorted(OUT_DIR.iterdir()):
         size = f.stat().st_size
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+columnar.py — Struct-of-arrays JSON encoding for record-shaped outputs.
+
+Arrays of objects repeat every key name once per record. ``encode`` turns
+them into one array per column:
+
+    {"columns": ["id", "owner", ...],
+     "data": {"id": [1, 2, ...], "owner": [0, 1, ...]},
+     "dictionaries": {"owner": ["LRA", "PRIVATE", ...]}}
+
+Columns named in ``dictionary`` hold indexes into ``dictionaries[col]``
+(values in first-seen order) instead of repeating low-cardinality strings.
+A mapping of records (such as stop_stats.json, keyed by stop id) is encoded
+with ``key=<column>``: the mapping keys become that column and ``"key"`` is
+recorded so ``decode`` rebuilds the mapping. Nested values (lists, dicts)
+are stored as they are. Every record must have the same keys; ``decode``
+returns exactly the records that were encoded.
+
+``decode`` is the reference decoder; the frontend equivalent is a loop over
+``columns`` with the same dictionary lookup. Run this file to compare size
+and parse time against the row-encoded outputs in public/data/.
+
+Usage:
+  cd python/
+  uv run python scripts/columnar.py
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+# Row-encoded output → (columnar file, dictionary-encoded columns, mapping key column)
+OUTPUTS = {
+    "vacancies.json": ("vacancies.columnar.json", ("owner", "zoning", "bestUse", "propertyType"), None),
+    "routes.json": ("routes.columnar.json", (), None),
+    "stop_stats.json": ("stop_stats.columnar.json", (), "stop_id"),
+}
+
+
+def encode(records, dictionary=(), key: str | None = None) -> dict:
+    """Columnar form of a list of records, or of a {key: record} mapping when ``key`` is given."""
+    if key is not None:
+        records = [{key: k, **rec} for k, rec in records.items()]
+    columns = list(records[0]) if records else ([key] if key else [])
+    data = {col: [rec[col] for rec in records] for col in columns}
+
+    dictionaries = {}
+    for col in dictionary:
+        if col not in data:
+            continue
+        codes = {}
+        data[col] = [codes.setdefault(v, len(codes)) for v in data[col]]
+        dictionaries[col] = list(codes)
+
+    doc = {"columns": columns, "data": data}
+    if dictionaries:
+        doc["dictionaries"] = dictionaries
+    if key is not None:
+        doc["key"] = key
+    return doc
+
+
+def decode(doc: dict):
+    """Records (or the {key: record} mapping) that ``encode`` was given."""
+    columns = doc["columns"]
+    dictionaries = doc.get("dictionaries", {})
+    values = [
+        [dictionaries[col][i] for i in doc["data"][col]] if col in dictionaries else doc["data"][col]
+        for col in columns
+    ]
+    records = [dict(zip(columns, row)) for row in zip(*values)]
+    key = doc.get("key")
+    if key is None:
+        return records
+    return {rec.pop(key): rec for rec in records}
+
+
+def _parse_ms(text: str, decoder=None, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        obj = json.loads(text)
+        if decoder is not None:
+            decoder(obj)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    out_dir = Path(__file__).resolve().parent.parent.parent / "public" / "data"
+    parser = argparse.ArgumentParser(description="Compare columnar outputs with their row-encoded versions")
+    parser.add_argument("--out-dir", type=Path, default=out_dir)
+    args = parser.parse_args()
+
+    found = [(name, spec) for name, spec in OUTPUTS.items() if (args.out_dir / spec[0]).exists()]
+    if not found:
+        sys.exit(f"No columnar outputs in {args.out_dir} — run clean_data.py first")
+
+    print(f"{'file':<20} {'rows KB':>8} {'cols KB':>8} {'rows gz':>8} {'cols gz':>8} {'rows ms':>8} {'cols ms':>8}")
+    failed = False
+    for name, (columnar_name, _, _) in found:
+        rows_text = (args.out_dir / name).read_text()
+        cols_text = (args.out_dir / columnar_name).read_text()
+        if decode(json.loads(cols_text)) != json.loads(rows_text):
+            print(f"{name:<20} MISMATCH: decoded {columnar_name} differs")
+            failed = True
+            continue
+        sizes = [len(rows_text), len(cols_text), len(gzip.compress(rows_text.encode())),
+                 len(gzip.compress(cols_text.encode()))]
+        print(f"{name:<20} " + " ".join(f"{s / 1024:8.1f}" for s in sizes)
+              + f" {_parse_ms(rows_text):8.2f} {_parse_ms(cols_text, decode):8.2f}")
+    print("\n(ms = best json.loads time; columnar includes decode() back to records)")
+    if failed:
+        sys.exit("FAILED: columnar output does not decode to the row output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+count_cube.py — Integer count cubes over categorical dimensions, in binary.
+
+``build`` counts rows over any number of factorised dimensions (for CSB
+and crime: neighborhood × month × category × hour-of-week) with one
+``np.bincount`` over the flattened cell index, so every slice and rollup
+can be answered exactly on the client instead of from the truncated
+top-N summaries.
+
+``write`` stores a cube as two files:
+
+    <name>.json  header: dimension names and labels, shape, dtype, layout
+    <name>.bin   little-endian counts
+
+Counts use the smallest unsigned dtype that holds the largest cell.
+Most cells of a city-wide cube are empty, so when fewer than a third of
+them are non-zero the cube is written "sparse": the C-order flat index of
+each non-zero cell (uint32, ascending) followed by its count. Otherwise
+the whole C-order array is written "dense". ``read`` is the reference
+reader and always returns the dense array.
+
+Run this file on a written cube to print its shape and time a rollup.
+
+Usage:
+  cd python/
+  uv run python scripts/count_cube.py ../public/data/csb_cube.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from json_stream import write_json
+
+CUBE_VERSION = 1
+SPARSE_MAX_FILL = 1 / 3  # above this share of non-zero cells the dense layout is smaller
+
+
+def factorize(values) -> tuple[np.ndarray, list]:
+    """(codes, sorted labels) for a column; missing values get code -1."""
+    import pandas as pd
+
+    codes, labels = pd.factorize(pd.Series(values), sort=True)
+    return codes, labels.tolist()
+
+
+def hour_of_week(ts) -> np.ndarray:
+    """Monday 00:00 → 0 … Sunday 23:00 → 167; -1 for NaT."""
+    how = ts.dt.weekday * 24 + ts.dt.hour
+    return how.fillna(-1).astype(int).to_numpy()
+
+
+def build(codes: list[np.ndarray], shape: tuple[int, ...]) -> tuple[np.ndarray, int]:
+    """Count rows per cell; rows with any code -1 are left out. Returns (cube, rows dropped)."""
+    codes = [np.asarray(c, dtype=np.int64) for c in codes]
+    keep = np.logical_and.reduce([c >= 0 for c in codes])
+    flat = np.ravel_multi_index([c[keep] for c in codes], shape)
+    counts = np.bincount(flat, minlength=int(np.prod(shape)))
+    return counts.reshape(shape), int((~keep).sum())
+
+
+def _dtype(counts: np.ndarray) -> np.dtype:
+    peak = int(counts.max()) if counts.size else 0
+    for dt in (np.uint8, np.uint16, np.uint32):
+        if peak <= np.iinfo(dt).max:
+            return np.dtype(dt).newbyteorder("<")
+    return np.dtype(np.uint64).newbyteorder("<")
+
+
+def write(path: Path, dims: dict[str, list], cube: np.ndarray, **meta) -> int:
+    """Write ``cube`` (axes in ``dims`` order) to ``path`` (.json header) and its .bin; returns bin bytes."""
+    dtype = _dtype(cube)
+    flat = cube.ravel()
+    nonzero = np.flatnonzero(flat)
+    sparse = flat.size > 0 and len(nonzero) < flat.size * SPARSE_MAX_FILL
+    bin_path = path.with_suffix(".bin")
+    tmp_path = bin_path.with_name(f"{bin_path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        if sparse:
+            f.write(nonzero.astype("<u4").tobytes())
+            f.write(flat[nonzero].astype(dtype).tobytes())
+        else:
+            f.write(flat.astype(dtype).tobytes())
+    tmp_path.replace(bin_path)
+
+    header = {
+        "version": CUBE_VERSION,
+        "bin": bin_path.name,
+        "layout": "sparse" if sparse else "dense",
+        "dtype": dtype.str.lstrip("<|"),
+        "shape": list(cube.shape),
+        "nonZero": int(len(nonzero)),
+        "total": int(flat.sum()),
+        "dims": [{"name": name, "labels": labels} for name, labels in dims.items()],
+        **meta,
+    }
+    write_json(path, header)
+    return bin_path.stat().st_size
+
+
+def read(path: Path) -> tuple[dict, np.ndarray]:
+    """(header, dense cube) of a cube written by ``write``."""
+    with open(path, "r") as f:
+        header = json.load(f)
+    raw = (path.parent / header["bin"]).read_bytes()
+    dtype = np.dtype(header["dtype"]).newbyteorder("<")
+    shape = tuple(header["shape"])
+    if header["layout"] == "dense":
+        return header, np.frombuffer(raw, dtype=dtype).reshape(shape)
+    nnz = header["nonZero"]
+    index = np.frombuffer(raw, dtype="<u4", count=nnz)
+    values = np.frombuffer(raw, dtype=dtype, offset=nnz * 4, count=nnz)
+    cube = np.zeros(int(np.prod(shape)), dtype=dtype)
+    cube[index] = values
+    return header, cube.reshape(shape)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a count cube and time a rollup")
+    parser.add_argument("path", type=Path, help="Cube header (.json)")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        sys.exit(f"No cube at {args.path} — run clean_data.py first")
+    t0 = time.perf_counter()
+    header, cube = read(args.path)
+    load_ms = (time.perf_counter() - t0) * 1e3
+    names = [d["name"] for d in header["dims"]]
+    bin_size = (args.path.parent / header["bin"]).stat().st_size
+    print(f"{args.path.name}: {' × '.join(f'{n} {s}' for n, s in zip(names, cube.shape))}")
+    print(f"  {header['layout']} {header['dtype']}, {header['nonZero']:,} non-zero of {cube.size:,} cells, "
+          f"{header['total']:,} rows, {bin_size // 1024} KB, read in {load_ms:.1f} ms")
+
+    for i, name in enumerate(names):
+        t0 = time.perf_counter()
+        rollup = cube.sum(axis=tuple(j for j in range(cube.ndim) if j != i), dtype=np.int64)
+        ms = (time.perf_counter() - t0) * 1e3
+        top = np.argsort(rollup, kind="stable")[::-1][:3]
+        labels = header["dims"][i]["labels"]
+        print(f"  by {name:<13} {ms:6.2f} ms   top: " + ", ".join(f"{labels[j]}={rollup[j]:,}" for j in top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+density.py — Precomputed heat surfaces on a fixed city grid.
+
+``build`` bins point sets onto one grid of ~``CELL_M`` metre cells over
+geo.CITY_BBOX with ``np.histogram2d``, smooths every layer with a
+separable Gaussian (one 1-D kernel along rows, then along columns) and
+returns a float stack [layer, row, col], row 0 being the northern edge so
+a layer uploads as a texture as-is.
+
+``write`` quantises each layer to uint8 (or uint16) against its own
+maximum and stores the stack like count_cube.py does:
+
+    <name>.json  header: grid bounds and shape, dtype, sigma, and per
+                 layer its key, point count and ``max`` (density at 255
+                 / 65535, in points per cell)
+    <name>.bin   layers back to back, C order
+
+``read`` is the reference reader and returns the de-quantised stack.
+Run this file on a written surface to print its layers.
+
+Usage:
+  cd python/
+  uv run python scripts/density.py ../public/data/csb_density.json
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from geo import CITY_BBOX, METRES_PER_DEG_LAT
+from json_stream import write_json
+
+CELL_M = 100  # grid cell edge, metres
+SIGMA_CELLS = 1.5  # Gaussian smoothing radius (standard deviation), in cells
+DENSITY_VERSION = 1
+
+
+def grid_edges(bbox: tuple[float, float, float, float] = CITY_BBOX, cell_m: float = CELL_M):
+    """(lat edges north → south, lng edges west → east) for ~cell_m cells over ``bbox``."""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    d_lat = cell_m / METRES_PER_DEG_LAT
+    d_lng = cell_m / (METRES_PER_DEG_LAT * math.cos(math.radians((min_lat + max_lat) / 2)))
+    n_rows = math.ceil((max_lat - min_lat) / d_lat)
+    n_cols = math.ceil((max_lng - min_lng) / d_lng)
+    lat_edges = min_lat + d_lat * np.arange(n_rows + 1)
+    lng_edges = min_lng + d_lng * np.arange(n_cols + 1)
+    return lat_edges, lng_edges
+
+
+def gaussian_kernel(sigma: float) -> np.ndarray:
+    radius = max(1, math.ceil(3 * sigma))
+    x = np.arange(-radius, radius + 1)
+    k = np.exp(-0.5 * (x / sigma) ** 2)
+    return k / k.sum()
+
+
+def smooth(stack: np.ndarray, sigma: float) -> np.ndarray:
+    """Separable Gaussian blur over the last two axes (zero beyond the grid edge)."""
+    if sigma <= 0:
+        return stack
+    kernel = gaussian_kernel(sigma)
+    radius = len(kernel) // 2
+    for axis in (-2, -1):
+        pad = [(0, 0)] * stack.ndim
+        pad[axis] = (radius, radius)
+        padded = np.pad(stack, pad)
+        n = stack.shape[axis]
+        out = np.zeros_like(stack)
+        for i, w in enumerate(kernel):
+            out += w * np.take(padded, np.arange(i, i + n), axis=axis)
+        stack = out
+    return stack
+
+
+def build(lat, lng, layers: list[np.ndarray], sigma: float = SIGMA_CELLS,
+          bbox: tuple[float, float, float, float] = CITY_BBOX, cell_m: float = CELL_M) -> tuple[np.ndarray, dict]:
+    """Smoothed per-cell counts for each index array in ``layers``. Returns (stack, grid)."""
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    lat_edges, lng_edges = grid_edges(bbox, cell_m)
+    stack = np.zeros((len(layers), len(lat_edges) - 1, len(lng_edges) - 1), dtype=np.float32)
+    for i, idx in enumerate(layers):
+        counts, _, _ = np.histogram2d(lat[idx], lng[idx], bins=[lat_edges, lng_edges])
+        stack[i] = counts[::-1]  # north up
+    grid = {
+        "bbox": [float(lng_edges[0]), float(lat_edges[0]), float(lng_edges[-1]), float(lat_edges[-1])],
+        "rows": stack.shape[1],
+        "cols": stack.shape[2],
+        "cellM": cell_m,
+    }
+    return smooth(stack, sigma), grid
+
+
+def write(path: Path, stack: np.ndarray, grid: dict, layers: list[dict], dtype=np.uint8,
+          sigma: float = SIGMA_CELLS) -> int:
+    """Quantise ``stack`` per layer and write ``path`` (.json header) + .bin; returns bin bytes."""
+    top = np.iinfo(dtype).max
+    maxes = stack.reshape(len(stack), -1).max(axis=1) if len(stack) else np.zeros(0)
+    scale = np.where(maxes > 0, top / np.where(maxes > 0, maxes, 1), 0).astype(np.float32)
+    quantised = np.rint(stack * scale[:, None, None]).astype(np.dtype(dtype).newbyteorder("<"))
+
+    bin_path = path.with_suffix(".bin")
+    tmp_path = bin_path.with_name(f"{bin_path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(quantised.tobytes())
+    tmp_path.replace(bin_path)
+
+    header = {
+        "version": DENSITY_VERSION,
+        "bin": bin_path.name,
+        "dtype": np.dtype(dtype).name,
+        "sigmaCells": sigma,
+        **grid,
+        "layers": [{**meta, "max": float(m)} for meta, m in zip(layers, maxes)],  # exact, read rescales by it
+    }
+    write_json(path, header)
+    return bin_path.stat().st_size
+
+
+def read(path: Path) -> tuple[dict, np.ndarray]:
+    """(header, float32 stack in points per cell) of a surface written by ``write``."""
+    with open(path, "r") as f:
+        header = json.load(f)
+    dtype = np.dtype(header["dtype"]).newbyteorder("<")
+    raw = np.fromfile(path.parent / header["bin"], dtype=dtype)
+    stack = raw.reshape(len(header["layers"]), header["rows"], header["cols"]).astype(np.float32)
+    maxes = np.array([layer["max"] for layer in header["layers"]], dtype=np.float32)
+    return header, stack * (maxes / np.iinfo(dtype).max)[:, None, None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a density surface file")
+    parser.add_argument("path", type=Path, help="Surface header (.json)")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        sys.exit(f"No density surface at {args.path} — run clean_data.py first")
+    header, stack = read(args.path)
+    bin_size = (args.path.parent / header["bin"]).stat().st_size
+    print(f"{args.path.name}: {len(stack)} layers of {header['rows']} × {header['cols']} "
+          f"{header['cellM']} m cells, {header['dtype']}, {bin_size // 1024} KB")
+    for layer, surface in zip(header["layers"], stack):
+        r, c = np.unravel_index(int(surface.argmax()), surface.shape)
+        print(f"  {layer['key']:<36} {layer['points']:>9,} points   peak {layer['max']:8.2f}/cell at row {r}, col {c}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,13 @@ fetch_raw.py — Download all raw datasets into python/data/raw/.
 Just fetches and extracts. No processing, no aggregation.
 Do EDA and cleaning in notebooks.
 
+Every request goes through http_cache.http_session(), so a run can be
+recorded once (--http record) and replayed offline (--http replay).
+
 Usage:
   cd python/
   uv run python scripts/fetch_raw.py
+  uv run python scripts/fetch_raw.py --http record
 """
 
 import json
@@ -22,6 +26,8 @@ try:
 except ImportError:
     sys.exit("Missing dependency: pip install requests")
 
+from http_cache import MODES, http_mode, http_session, store_dir  # noqa: E402
+
 ROOT = Path(__file__).resolve().parent.parent  # python/
 REPO_ROOT = ROOT.parent  # repo root
 RAW_DIR = ROOT / "data" / "raw"
@@ -62,11 +68,13 @@ SOURCES = {
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (STL Urban Analytics data pipeline)"}
 
+HTTP = http_session()  # rebound by main() when --http is given
+
 
 def download(url: str, dest: Path, quiet: bool = False) -> Path:
     if not quiet:
         print(f"  \U0001f4e5 {url.split('/')[-1]}...", end=" ", flush=True)
-    resp = requests.get(url, stream=True, timeout=120, headers=HEADERS)
+    resp = HTTP.get(url, stream=True, timeout=120, headers=HEADERS)
     resp.raise_for_status()
     downloaded = 0
     with open(dest, "wb") as f:
@@ -79,6 +87,24 @@ def download(url: str, dest: Path, quiet: bool = False) -> Path:
     return dest
 
 
+def find_csv_links(html: str) -> list[str]:
+    """Absolute URLs of every .csv/.CSV link on an SLMPD crime stats page."""
+    links = []
+    for link in re.findall(r'href="([^"]*\.(?:csv|CSV))"', html):
+        if not link.startswith("http"):
+            link = f"https://www.slmpd.org/{link.lstrip('/')}"
+        links.append(link)
+    return links
+
+
+def extract_zip(archive: Path, extract_dir: Path) -> int:
+    """Extract a zip into extract_dir; returns the number of files now there."""
+    extract_dir.mkdir(exist_ok=True)
+    with zipfile.ZipFile(archive) as zf:
+        zf.extractall(extract_dir)
+    return sum(1 for f in extract_dir.rglob("*") if f.is_file())
+
+
 def fetch_crime() -> None:
     """Download SLMPD crime CSVs.
 
@@ -91,13 +117,13 @@ def fetch_crime() -> None:
 
     print("  Scraping SLMPD crime stats page for CSV links...")
     try:
-        resp = requests.get(
+        resp = HTTP.get(
             "https://www.slmpd.org/crime_stats.shtml",
             timeout=30,
             headers=HEADERS,
         )
         resp.raise_for_status()
-        csv_links = re.findall(r'href="([^"]*\.(?:csv|CSV))"', resp.text)
+        csv_links = find_csv_links(resp.text)
 
         if not csv_links:
             print("  WARNING: No CSV links found on SLMPD page")
@@ -106,8 +132,6 @@ def fetch_crime() -> None:
         downloaded = 0
         total_bytes = 0
         for link in csv_links:
-            if not link.startswith("http"):
-                link = f"https://www.slmpd.org/{link.lstrip('/')}"
             filename = link.split("/")[-1]
             dest = crime_dir / filename
             if dest.exists():
@@ -133,7 +157,7 @@ def fetch_arpa() -> None:
     print("  Fetching ARPA expenditures JSON...")
     url = "https://www.stlouis-mo.gov/customcf/endpoints/arpa/expenditures.cfm?format=json"
     try:
-        resp = requests.get(url, timeout=60, headers=HEADERS)
+        resp = HTTP.get(url, timeout=60, headers=HEADERS)
         resp.raise_for_status()
         data = resp.json()
         dest = RAW_DIR / "arpa.json"
@@ -163,7 +187,7 @@ def fetch_demographics() -> None:
         for year in (2020, 2010):
             url = f"{base_url}?number={num}&censusYear={year}"
             try:
-                resp = requests.get(url, timeout=30, headers=HEADERS)
+                resp = HTTP.get(url, timeout=30, headers=HEADERS)
                 resp.raise_for_status()
                 soup = BeautifulSoup(resp.text, "lxml")
 
@@ -215,7 +239,7 @@ def fetch_housing_acs() -> None:
     ]
     print("  Fetching ACS 5-Year housing data (B25064 + B25077)...")
     try:
-        resp = requests.get(base, params=params, timeout=60, headers=HEADERS)
+        resp = HTTP.get(base, params=params, timeout=60, headers=HEADERS)
         resp.raise_for_status()
         data = resp.json()
         dest = RAW_DIR / "housing_acs.json"
@@ -234,7 +258,7 @@ def fetch_vacancies() -> None:
     # 1. Fetch vacancy overview from the live API (keyed by parcel HANDLE)
     print("  Fetching vacancy overview from stlcitypermits.com API...")
     try:
-        resp = requests.get(
+        resp = HTTP.get(
             "https://www.stlcitypermits.com/API/VacantBuilding/GetVacantBuildingOverview",
             timeout=120,
             headers=HEADERS,
@@ -255,12 +279,8 @@ def fetch_vacancies() -> None:
         print("  Downloading parcel shapefile...")
         try:
             download(parcel_url, parcel_dest)
-            extract_dir = RAW_DIR / "parcels"
-            extract_dir.mkdir(exist_ok=True)
-            with zipfile.ZipFile(parcel_dest) as zf:
-                zf.extractall(extract_dir)
-            files = list(extract_dir.rglob("*"))
-            print(f"  Extracted {sum(1 for f in files if f.is_file())} files to parcels/")
+            n_files = extract_zip(parcel_dest, RAW_DIR / "parcels")
+            print(f"  Extracted {n_files} files to parcels/")
         except Exception as e:
             print(f"  Failed to download parcel shapefile: {e}")
     else:
@@ -291,8 +311,15 @@ def main():
         help=f"Fetch only this dataset. Choices: {', '.join(ALL_SOURCES.keys())}",
     )
     parser.add_argument("--list", action="store_true", help="List available datasets and exit")
+    parser.add_argument("--http", choices=MODES, help="Record/replay HTTP transport (default: $HTTP_MODE or passthrough)")
     args = parser.parse_args()
 
+    global HTTP
+    if args.http:
+        os.environ["HTTP_MODE"] = args.http
+        HTTP = http_session(args.http)
+    mode = http_mode()
+
     if args.list:
         print("Available datasets:")
         for key, (desc, _) in ALL_SOURCES.items():
@@ -310,6 +337,8 @@ def main():
     print(f"  Output: {RAW_DIR}")
     if args.only:
         print(f"  Only: {args.only}")
+    if mode != "passthrough":
+        print(f"  HTTP: {mode} ({store_dir()})")
     print("=" * 50)
 
     # Static zip sources (from SOURCES dict)
@@ -326,13 +355,8 @@ def main():
 
             # Auto-extract zips into a subfolder
             if dest.suffix == ".zip":
-                extract_dir = RAW_DIR / name
-                extract_dir.mkdir(exist_ok=True)
-                with zipfile.ZipFile(dest) as zf:
-                    zf.extractall(extract_dir)
-                contents = list(extract_dir.rglob("*"))
-                files = [f for f in contents if f.is_file()]
-                print(f"  Extracted {len(files)} files to {name}/")
+                n_files = extract_zip(dest, RAW_DIR / name)
+                print(f"  Extracted {n_files} files to {name}/")
 
         except Exception as e:
             print(f"  Failed: {e}")
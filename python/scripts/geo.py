@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+geo.py — Batch Web Mercator reprojection and the St. Louis bounding-box mask.
+
+Both functions take whole coordinate columns (numpy arrays, pandas
+Series or plain scalars) and work in one vectorised pass, so CSB, crime
+and GTFS points are converted and filtered without a Python loop.
+
+The inverse projection uses the spherical EPSG:3857 definition
+(R = 6378137 m) with the Gudermannian ``atan(sinh(y / R))``. Run this
+file to check it against pyproj and time it against a per-point loop.
+
+Usage:
+  cd python/
+  uv run python scripts/geo.py
+  uv run python scripts/geo.py --points 5000000
+"""
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+EARTH_RADIUS = 6378137.0  # EPSG:3857 sphere, meters
+HALF_WORLD = math.pi * EARTH_RADIUS  # 20037508.342789244
+STL_BBOX = (-91.0, 38.0, -89.0, 39.0)  # (min lng, min lat, max lng, max lat), bounds exclusive
+CITY_BBOX = (-90.33, 38.53, -90.16, 38.78)  # St. Louis city limits plus a small margin
+METRES_PER_DEG_LAT = 111_320.0  # metres per degree of latitude (and of longitude at the equator)
+TOLERANCE_DEG = 1e-9  # ~0.1 mm; the pyproj check fails above this
+
+
+def web_mercator_to_lnglat(x, y) -> tuple[np.ndarray, np.ndarray]:
+    """Convert Web Mercator (EPSG:3857) x/y to (lng, lat) degrees (EPSG:4326)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    lng = x * (180.0 / HALF_WORLD)
+    lat = np.degrees(np.arctan(np.sinh(y / EARTH_RADIUS)))
+    return lng, lat
+
+
+def lnglat_to_metres(lng, lat, bbox: tuple[float, float, float, float] = CITY_BBOX) -> tuple[np.ndarray, np.ndarray]:
+    """Equirectangular x/y metres east/north of ``bbox``'s south-west corner.
+
+    Distances are within ~0.1% of geodesic across a city-sized bbox, which
+    is all the grid and radius lookups need.
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    lng = np.asarray(lng, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    x = (lng - min_lng) * METRES_PER_DEG_LAT * math.cos(math.radians((min_lat + max_lat) / 2))
+    y = (lat - min_lat) * METRES_PER_DEG_LAT
+    return x, y
+
+
+def in_bbox(lng, lat, bbox: tuple[float, float, float, float] = STL_BBOX) -> np.ndarray:
+    """Boolean mask of points strictly inside ``bbox``; NaN coordinates are outside."""
+    lng = np.asarray(lng, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return (lng > min_lng) & (lng < max_lng) & (lat > min_lat) & (lat < max_lat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate batch Web Mercator reprojection against pyproj")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from pyproj import Transformer
+    except ImportError:
+        sys.exit("Missing dependency: uv sync (pyproj comes with geopandas)")
+
+    rng = np.random.default_rng(args.seed)
+    to_merc = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+    to_wgs = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+    min_lng, min_lat, max_lng, max_lat = STL_BBOX
+    samples = {
+        "St. Louis bbox": (rng.uniform(min_lng, max_lng, args.points), rng.uniform(min_lat, max_lat, args.points)),
+        "world ±85°": (rng.uniform(-180, 180, args.points), rng.uniform(-85, 85, args.points)),
+    }
+
+    failed = False
+    for label, (lng0, lat0) in samples.items():
+        x, y = to_merc.transform(lng0, lat0)
+        ref_lng, ref_lat = to_wgs.transform(x, y)
+        t0 = time.perf_counter()
+        lng, lat = web_mercator_to_lnglat(x, y)
+        batch_s = time.perf_counter() - t0
+        err = max(np.abs(lng - ref_lng).max(), np.abs(lat - ref_lat).max())
+        failed |= err > TOLERANCE_DEG
+        print(f"{label:<16} {args.points:,} points   max |Δ| vs pyproj {err:.2e}°   batch {batch_s * 1e3:.1f} ms")
+
+    # Per-point loop, the way rows used to be converted
+    x, y = to_merc.transform(*samples["St. Louis bbox"])
+    n = min(args.points, 200_000)
+    t0 = time.perf_counter()
+    for xi, yi in zip(x[:n].tolist(), y[:n].tolist()):
+        xi * 180.0 / HALF_WORLD, math.atan(math.exp(yi * math.pi / HALF_WORLD)) * 360.0 / math.pi - 90.0
+    loop_s = (time.perf_counter() - t0) * args.points / n
+    t0 = time.perf_counter()
+    lng, lat = web_mercator_to_lnglat(x, y)
+    mask = in_bbox(lng, lat)
+    batch_s = time.perf_counter() - t0
+    print(f"\nreproject + bbox mask: {batch_s * 1e3:.1f} ms batch vs ~{loop_s * 1e3:.0f} ms per-point loop "
+          f"({loop_s / batch_s:.0f}×); {mask.mean():.1%} inside")
+    if failed:
+        sys.exit(f"FAILED: error above {TOLERANCE_DEG:g}°")
+
+
+if __name__ == "__main__":
+    main()
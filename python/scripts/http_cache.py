@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+http_cache.py — Record/replay HTTP transport for fetch_raw.py and clean_data.py.
+
+Every outbound request in the pipeline goes through ``http_session()``, a
+requests.Session whose transport depends on HTTP_MODE (env var, or the
+--http flag of either script):
+
+  passthrough  live network, nothing stored (default)
+  record       live network; every response is saved to the store
+  replay       served from the store only — a request that was never
+               recorded fails with ConnectionError instead of going online
+
+The store (HTTP_STORE, default data/http_store/) is content-addressed:
+response bodies live under objects/<sha256[:2]>/<sha256>, so identical
+payloads are stored once, and requests/<key>.json maps a request to its
+status, headers and body hash. The key hashes the method, the canonical
+URL (query params sorted, credentials such as the Census ``key`` dropped)
+and the request body.
+
+Replay normally reads the store in-process. Setting HTTP_REPLAY_SERVER to
+the address of the stand-in server (``http_cache.py serve``) sends replayed
+requests over a local socket instead, for tools or timings that need a real
+HTTP round trip.
+
+Usage:
+  cd python/
+  uv run python scripts/fetch_raw.py --http record
+  uv run python scripts/clean_data.py --http replay
+  uv run python scripts/http_cache.py ls
+  uv run python scripts/http_cache.py serve --port 8765
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_STORE = PYTHON_DIR / "data" / "http_store"
+MODES = ("passthrough", "record", "replay")
+REDACT_PARAMS = {"key", "api_key", "apikey", "token"}  # never hashed or written to disk
+# Headers that describe the wire encoding, not the stored (decoded) body
+WIRE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive"}
+CHUNK = 1 << 16
+
+
+def http_mode() -> str:
+    mode = os.environ.get("HTTP_MODE", "passthrough")
+    if mode not in MODES:
+        sys.exit(f"HTTP_MODE must be one of {', '.join(MODES)}, got '{mode}'")
+    return mode
+
+
+def store_dir() -> Path:
+    return Path(os.environ.get("HTTP_STORE", DEFAULT_STORE))
+
+
+def canonical_url(url: str) -> str:
+    """URL with credentials removed and query params in a stable order."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in REDACT_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def request_key(method: str, url: str, body: bytes | str | None = None) -> str:
+    h = hashlib.sha256(f"{method.upper()} {canonical_url(url)}\n".encode())
+    if body:
+        h.update(body.encode() if isinstance(body, str) else body)
+    return h.hexdigest()
+
+
+# ── Content-addressed store ──────────────────────────────────────────────────
+
+class Store:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / "requests" / f"{key}.json"
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def get(self, key: str) -> dict | None:
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def put(self, key: str, entry: dict, chunks) -> dict:
+        """Stream ``chunks`` into the object store and write the request entry."""
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        h = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.root / "objects", delete=False) as tmp:
+            for chunk in chunks:
+                h.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        digest = h.hexdigest()
+        obj = self.object_path(digest)
+        if obj.exists():
+            os.unlink(tmp.name)  # same payload already stored
+        else:
+            obj.parent.mkdir(exist_ok=True)
+            os.replace(tmp.name, obj)
+
+        entry = {**entry, "body": digest, "size": size, "recordedAt": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_entry = path.with_suffix(".tmp")
+        with open(tmp_entry, "w") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_entry, path)
+        return entry
+
+    def entries(self):
+        for path in sorted((self.root / "requests").glob("*.json")):
+            with open(path, "r") as f:
+                yield path.stem, json.load(f)
+
+
+# ── Transport ────────────────────────────────────────────────────────────────
+
+class RecordReplayAdapter(HTTPAdapter):
+    """HTTPAdapter that records responses to, or replays them from, a Store."""
+
+    def __init__(self, mode: str, store: Store, replay_server: str | None = None):
+        super().__init__()
+        self.mode = mode
+        self.store = store
+        self.replay_server = replay_server.rstrip("/") if replay_server else None
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url, request.body)
+        if self.mode == "replay":
+            if self.replay_server:
+                return self._via_server(request, stream, timeout)
+            entry = self.store.get(key)
+            if entry is None:
+                raise requests.ConnectionError(
+                    f"HTTP replay: no recording for {request.method} {canonical_url(request.url)}", request=request
+                )
+            return self._from_store(request, entry)
+
+        live = super().send(request, stream=True, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        entry = {
+            "method": request.method,
+            "url": canonical_url(request.url),
+            "status": live.status_code,
+            "reason": live.reason,
+            "headers": {k: v for k, v in live.headers.items() if k.lower() not in WIRE_HEADERS},
+        }
+        try:
+            entry = self.store.put(key, entry, live.raw.stream(CHUNK, decode_content=True))
+        finally:
+            live.close()
+        return self._from_store(request, entry)
+
+    def _from_store(self, request, entry: dict):
+        headers = {**entry["headers"], "Content-Length": str(entry["size"])}
+        raw = HTTPResponse(
+            body=io.BytesIO(self.store.object_path(entry["body"]).read_bytes()),
+            headers=headers,
+            status=entry["status"],
+            reason=entry["reason"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def _via_server(self, request, stream, timeout):
+        parts = urlsplit(request.url)
+        local = request.copy()
+        local.url = f"{self.replay_server}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            local.url += f"?{parts.query}"
+        return super().send(local, stream=stream, timeout=timeout)
+
+
+def http_session(mode: str | None = None) -> requests.Session:
+    """requests.Session using the HTTP_MODE transport (passthrough → a plain Session)."""
+    mode = mode or http_mode()
+    session = requests.Session()
+    if mode != "passthrough":
+        adapter = RecordReplayAdapter(mode, Store(store_dir()), os.environ.get("HTTP_REPLAY_SERVER"))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+# ── Stand-in server ──────────────────────────────────────────────────────────
+
+def make_server(store: Store, host: str, port: int) -> ThreadingHTTPServer:
+    """Local server replaying recorded responses at /<scheme>/<host>/<path>?<query>."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _replay(self, send_body: bool):
+            scheme, _, rest = self.path.lstrip("/").partition("/")
+            netloc, _, path = rest.partition("/")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else None
+            method = "GET" if self.command == "HEAD" else self.command
+            entry = store.get(request_key(method, f"{scheme}://{netloc}/{path}", body))
+            if entry is None:
+                self.send_error(404, "Not recorded")
+                return
+            self.send_response(entry["status"], entry["reason"])
+            for k, v in entry["headers"].items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(entry["size"]))
+            self.end_headers()
+            if send_body:
+                with open(store.object_path(entry["body"]), "rb") as f:
+                    shutil.copyfileobj(f, self.wfile, CHUNK)
+
+        def do_GET(self):
+            self._replay(True)
+
+        def do_POST(self):
+            self._replay(True)
+
+        def do_HEAD(self):
+            self._replay(False)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or serve the record/replay HTTP store")
+    parser.add_argument("--store", type=Path, default=store_dir())
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ls", help="List recorded requests")
+    serve = sub.add_parser("serve", help="Run the local stand-in server for HTTP_REPLAY_SERVER")
+    serve.add_argument("--host", type=str, default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    store = Store(args.store)
+    if args.command == "ls":
+        total = 0
+        for key, entry in store.entries():
+            total += entry["size"]
+            print(f"{key[:12]}  {entry['status']}  {entry['size'] // 1024:>8} KB  {entry['method']} {entry['url']}")
+        n_objects = sum(1 for p in (args.store / "objects").rglob("*") if p.is_file())
+        print(f"\n{total / 1024 / 1024:.1f} MB recorded in {n_objects} unique object(s) under {args.store}")
+        return
+
+    server = make_server(store, args.host, args.port)
+    print(f"Replaying {args.store} at http://{args.host}:{args.port}")
+    print(f"  export HTTP_MODE=replay HTTP_REPLAY_SERVER=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+json_stream.py — Incremental JSON writer for the large frontend outputs.
+
+``write_json(path, obj)`` writes exactly the bytes of
+``json.dump(obj, f, separators=(",", ":"))`` but never holds the whole
+document, or the whole of a big array, in memory:
+
+  - a generator (any iterator) as the document, a dict value or an array
+    element is written as a JSON array, one element at a time, so
+    FeatureCollections and heatmap rows can be produced lazily —
+    ``feature_collection(features)`` wraps a feature generator;
+  - dicts are walked key by key; each array element is encoded in one call
+    to the C encoder, which is also faster than json.dump's pure-Python
+    iterencode;
+  - output goes to ``<name>.tmp`` in the same directory and is renamed over
+    the target only once complete, so a crash or a concurrent reader never
+    sees a truncated file.
+
+``precision`` maps a dict key to a number of decimal places; every float
+under that key, however deeply nested, is rounded before encoding. Without
+it floats keep their full repr and the output is byte-identical to
+json.dump.
+
+Run this file to re-encode existing outputs and check them byte for byte.
+
+Usage:
+  cd python/
+  uv run python scripts/json_stream.py
+  uv run python scripts/json_stream.py ../public/data/csb_latest.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from json.encoder import encode_basestring_ascii
+from pathlib import Path
+
+CHUNK = 1 << 16  # characters buffered before each write
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def feature_collection(features: Iterable[dict]) -> dict:
+    """GeoJSON FeatureCollection whose ``features`` may be a generator."""
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _key(k) -> str:
+    # Same coercions as json.dumps for non-string keys
+    if isinstance(k, str):
+        return encode_basestring_ascii(k)
+    if k is True:
+        return '"true"'
+    if k is False:
+        return '"false"'
+    if k is None:
+        return '"null"'
+    if isinstance(k, (int, float)):
+        return encode_basestring_ascii(_ENCODER.encode(k))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(k).__name__}")
+
+
+def _round(obj, precision: dict, digits: int | None = None):
+    if isinstance(obj, float):
+        return round(obj, digits) if digits is not None else obj
+    if isinstance(obj, dict):
+        return {k: _round(v, precision, precision.get(k, digits)) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_round(v, precision, digits) for v in obj]
+    return obj
+
+
+def iterencode(obj, precision: dict | None = None, _digits: int | None = None) -> Iterator[str]:
+    """Yield the compact JSON encoding of ``obj`` in pieces."""
+    if isinstance(obj, dict):
+        yield "{"
+        first = True
+        for k, v in obj.items():
+            yield ("" if first else ",") + _key(k) + ":"
+            first = False
+            yield from iterencode(v, precision, precision.get(k, _digits) if precision else None)
+        yield "}"
+    elif isinstance(obj, (list, tuple, Iterator)):
+        yield "["
+        first = True
+        for item in obj:
+            if precision:
+                item = _round(item, precision, _digits)
+            if isinstance(item, Iterator):
+                yield "" if first else ","
+                yield from iterencode(item, precision, _digits)
+            else:
+                yield ("" if first else ",") + _ENCODER.encode(item)
+            first = False
+        yield "]"
+    else:
+        yield _ENCODER.encode(_round(obj, {}, _digits) if precision else obj)
+
+
+def write_json(path: Path, obj, precision: dict | None = None) -> int:
+    """Atomically write ``obj`` as compact JSON to ``path``; returns the size in bytes."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    size = 0
+    try:
+        with open(tmp_path, "w", encoding="ascii") as f:
+            buf, buffered = [], 0
+            for piece in iterencode(obj, precision):
+                buf.append(piece)
+                buffered += len(piece)
+                if buffered >= CHUNK:
+                    f.write("".join(buf))
+                    size += buffered
+                    buf, buffered = [], 0
+            f.write("".join(buf))
+            size += buffered
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return size
+
+
+def main():
+    out_dir = Path(__file__).resolve().parent.parent.parent / "public" / "data"
+    parser = argparse.ArgumentParser(description="Check that write_json reproduces existing compact JSON outputs")
+    parser.add_argument("paths", type=Path, nargs="*", help=f"Files to check (default: {out_dir}/*.json, *.geojson)")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted([*out_dir.glob("*.json"), *out_dir.glob("*.geojson")])
+    if not paths:
+        sys.exit(f"No outputs found in {out_dir} — run clean_data.py first")
+
+    failed = False
+    for path in paths:
+        original = path.read_bytes()
+        obj = json.loads(original)
+        if json.dumps(obj, separators=(",", ":")).encode() != original:
+            print(f"{path.name:<28} skipped (not compact json.dump output)")
+            continue
+        t0 = time.perf_counter()
+        with open(os.devnull, "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+        dump_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        streamed = "".join(iterencode(obj)).encode()
+        stream_s = time.perf_counter() - t0
+        ok = streamed == original
+        failed |= not ok
+        print(f"{path.name:<28} {len(original) // 1024:>8} KB   {'identical' if ok else 'MISMATCH '}   "
+              f"json.dump {dump_s * 1e3:7.1f} ms   streamed {stream_s * 1e3:7.1f} ms")
+    if failed:
+        sys.exit("FAILED: streamed output differs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+quantile_sketch.py — Mergeable t-digest for streaming quantiles.
+
+A ``TDigest`` summarises any number of values in at most ~``compression``
+weighted centroids (plus a small insert buffer), so memory is bounded
+however many samples a cell receives. Centroids near the tails stay
+small (the k1 arcsine scale function), which keeps p90/p99 accurate
+while the middle of the distribution is merged aggressively. Count, sum,
+min and max are tracked exactly, so ``mean`` is exact.
+
+Digests built on different workers or partitions combine with
+``merge`` (one at a time) or ``merge_all`` (many, compressed once);
+``to_dict`` / ``from_dict`` carry them across process boundaries as
+plain JSON.
+
+Run this file to compare sketch quantiles against numpy on random data
+and time the build and merge paths.
+
+Usage:
+  cd python/
+  uv run python scripts/quantile_sketch.py
+  uv run python scripts/quantile_sketch.py --values 5000000 --parts 8
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) over float values."""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[np.ndarray] = []
+        self._buffered = 0
+
+    @classmethod
+    def from_values(cls, values, compression: float = DEFAULT_COMPRESSION) -> "TDigest":
+        digest = cls(compression)
+        digest.update(values)
+        return digest
+
+    # ── Building ─────────────────────────────────────────────────────────────
+
+    def update(self, values) -> None:
+        """Add a batch of values (NaN ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += values.size
+        if self._buffered > 5 * self.compression:
+            self._compress()
+
+    def add(self, value: float) -> None:
+        self.update([value])
+
+    @classmethod
+    def merge_all(cls, digests, compression: float = DEFAULT_COMPRESSION) -> "TDigest":
+        """One digest of many (e.g. per-worker or per-cell) digests, compressed once."""
+        out = cls(compression)
+        parts = [d for d in digests if d.count]
+        if parts:
+            for d in parts:
+                d._compress()
+            out.count = sum(d.count for d in parts)
+            out.total = sum(d.total for d in parts)
+            out.min = min(d.min for d in parts)
+            out.max = max(d.max for d in parts)
+            out._merge_centroids(np.concatenate([d.means for d in parts]), np.concatenate([d.weights for d in parts]))
+        return out
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold ``other`` into this digest (in place) and return self."""
+        other._compress()
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._merge_centroids(other.means, other.weights)
+        return self
+
+    def _compress(self) -> None:
+        if self._buffer:
+            values = np.concatenate(self._buffer)
+            self._buffer, self._buffered = [], 0
+            self._merge_centroids(values, np.ones(values.size))
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(min(max(k * 2 * math.pi / self.compression, -math.pi / 2), math.pi / 2)) + 1) / 2
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _merge_centroids(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if len(means) <= self.compression:
+            self.means, self.weights = means, weights  # small enough to keep every point
+            return
+
+        out_m, out_w = [], []
+        cur_m, cur_w = float(means[0]), float(weights[0])
+        done = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1) * total
+        for m, w in zip(means[1:].tolist(), weights[1:].tolist()):
+            if done + cur_w + w <= q_limit:
+                cur_m += (m - cur_m) * w / (cur_w + w)
+                cur_w += w
+            else:
+                out_m.append(cur_m)
+                out_w.append(cur_w)
+                done += cur_w
+                q_limit = self._k_inverse(self._k(done / total) + 1) * total
+                cur_m, cur_w = m, w
+        out_m.append(cur_m)
+        out_w.append(cur_w)
+        self.means, self.weights = np.array(out_m), np.array(out_w)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile ``q`` in [0, 1] (NaN when empty)."""
+        self._compress()
+        if not self.count:
+            return math.nan
+        if len(self.means) == 1 or q <= 0:
+            return self.means[0] if q > 0 else self.min
+        if q >= 1:
+            return self.max
+        # Each centroid's mass is centred on its mean; interpolate between centres
+        centres = np.cumsum(self.weights) - self.weights / 2
+        index = q * self.count
+        if index <= centres[0]:
+            return self.min + (self.means[0] - self.min) * index / centres[0]
+        if index >= centres[-1]:
+            tail = self.count - centres[-1]
+            return self.means[-1] + (self.max - self.means[-1]) * (index - centres[-1]) / tail
+        i = int(np.searchsorted(centres, index, side="right")) - 1
+        frac = (index - centres[i]) / (centres[i + 1] - centres[i])
+        return float(self.means[i] + (self.means[i + 1] - self.means[i]) * frac)
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99), digits: int = 1) -> dict:
+        """{"n", "mean", "p50", "p90", "p99"} rounded for output."""
+        out = {"n": self.count, "mean": round(self.mean, digits)}
+        for q in quantiles:
+            out[f"p{round(q * 100):d}"] = round(float(self.quantile(q)), digits)
+        return out
+
+    # ── Serialisation ────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {
+            "compression": self.compression, "count": self.count, "sum": self.total,
+            "min": self.min, "max": self.max,
+            "means": self.means.tolist(), "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TDigest":
+        digest = cls(d["compression"])
+        digest.count, digest.total = d["count"], d["sum"]
+        digest.min, digest.max = d["min"], d["max"]
+        digest.means, digest.weights = np.array(d["means"], dtype=float), np.array(d["weights"], dtype=float)
+        return digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check t-digest quantiles against numpy")
+    parser.add_argument("--values", type=int, default=1_000_000)
+    parser.add_argument("--parts", type=int, default=4, help="Partitions built separately, then merged")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = {
+        "lognormal (days)": rng.lognormal(2.0, 1.2, args.values),
+        "integer days": np.floor(rng.exponential(9.0, args.values)),
+    }
+    for label, values in data.items():
+        t0 = time.perf_counter()
+        single = TDigest.from_values(values)
+        build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        merged = TDigest()
+        for part in np.array_split(values, args.parts):
+            merged.merge(TDigest.from_dict(TDigest.from_values(part).to_dict()))
+        merge_s = time.perf_counter() - t0
+        print(f"{label}: {args.values:,} values → {len(single.means)} centroids, "
+              f"built in {build_s:.2f}s, {args.parts} parts merged in {merge_s:.2f}s")
+        for q in (0.5, 0.9, 0.99):
+            exact = np.quantile(values, q)
+            print(f"  p{round(q * 100):<3d} exact {exact:9.3f}   single {single.quantile(q):9.3f} "
+                  f"  merged {merged.quantile(q):9.3f}   rank error "
+                  f"{abs((values < merged.quantile(q)).mean() - q):.4f}")
+
+
+if __name__ == "__main__":
+    main()
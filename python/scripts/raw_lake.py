@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+raw_lake.py — Year/month-partitioned Parquet copies of the raw CSV exports.
+
+The CSB and SLMPD exports are mostly history that never changes, yet every
+clean_data.py run used to re-parse all of it as text. ``sync()`` converts
+each raw CSV once, through a caller-supplied ``normalize`` function that
+returns typed columns (timestamps, float coordinates, dictionary-encoded
+categories), into a hive-partitioned dataset:
+
+    <lake>/<source>/year=2025/month=3/<file-id>-0.parquet
+    <lake>/<source>/_manifest.json      # raw file → size, mtime, rows
+
+A raw file is only re-ingested when its size or mtime changes; fragments
+of deleted files are dropped. Rows without a parseable timestamp land in
+year=0/month=0.
+
+``scan()`` reads back selected columns. A date range prunes whole
+year/month partitions and pushes the timestamp predicate down to Parquet
+row-group statistics. Every fragment carries ``src`` (raw file) and
+``row`` (line in that file), so results come back in the original CSV
+order and Counter tie-breaking is unchanged.
+
+Each file is mapped by its own header: ``sync()`` reads the header row,
+asks the caller's ``schema`` for {field: raw column} (cached per distinct
+header, so a monthly file laid out differently from the bulk file is
+still read correctly) and parses only those column positions.
+
+Run this file on a raw export to time that path against a per-row
+``csv.DictReader`` loop and a positional ``csv.reader`` extractor.
+
+Usage:
+  cd python/
+  uv run python scripts/raw_lake.py crime data/raw/crime/2025.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import operator
+import os
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+LAKE_VERSION = 4  # bump when a normalizer's output changes
+MANIFEST = "_manifest.json"
+DICT_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+
+def read_header(path: Path) -> tuple[str, ...]:
+    """Column names of a raw export, as ``read_raw_csv`` would name them."""
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        return tuple(next(csv.reader(f), ()))
+
+
+def read_raw_csv(path: Path, usecols: list[int] | None = None) -> pd.DataFrame:
+    """A raw export as all-string columns, blanks kept as "" (only column positions ``usecols`` if given)."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig", encoding_errors="replace",
+                       usecols=usecols)
+
+
+def schema_columns(header: tuple[str, ...], schema: dict[str, str | None]) -> list[int] | None:
+    """Positions in ``header`` of the columns ``schema`` maps to (None = read every column)."""
+    wanted = {col for col in schema.values() if col}
+    positions = [i for i, name in enumerate(header) if name in wanted]
+    return positions or None
+
+
+def parse_timestamps(values: pd.Series, formats: tuple[str, ...]) -> pd.Series:
+    """Vectorised strptime: each value takes the first format that parses it, else NaT."""
+    values = values.str.strip()
+    out = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    todo = values != ""
+    for fmt in formats:
+        if not todo.any():
+            break
+        parsed = pd.to_datetime(values[todo], format=fmt, errors="coerce").dropna()
+        out.loc[parsed.index] = parsed
+        todo.loc[parsed.index] = False
+    return out
+
+
+def _file_id(rel: str) -> str:
+    return hashlib.sha1(rel.encode()).hexdigest()[:12]
+
+
+def _fragments(root: Path, rel: str) -> list[Path]:
+    return list(root.glob(f"year=*/month=*/{_file_id(rel)}-*.parquet"))
+
+
+def _load_manifest(root: Path) -> dict:
+    path = root / MANIFEST
+    if path.exists():
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == LAKE_VERSION:
+            return manifest
+    return {"version": LAKE_VERSION, "files": {}}
+
+
+def sync(root: Path, raw_dir: Path, files: list[Path], schema: Callable[[tuple[str, ...]], dict[str, str | None]],
+         normalize: Callable[[pd.DataFrame, dict[str, str | None]], pd.DataFrame]) -> dict:
+    """Bring the partitioned copy at ``root`` up to date with ``files``.
+
+    ``schema`` maps one file's header to {field: raw column or None}; it
+    should be cached (e.g. ``functools.lru_cache``) since files mostly
+    share a header. Only the mapped columns are parsed. ``normalize``
+    turns those (as read_raw_csv) plus the mapping into typed columns and
+    must include a datetime ``ts``. Returns {"ingested", "removed", "rows"}.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(root)
+    if manifest["files"] and not any(root.glob("year=*")):
+        manifest["files"] = {}  # partitions were deleted by hand
+    known = manifest["files"]
+    current = {str(f.relative_to(raw_dir)): f for f in files}
+
+    removed = [rel for rel in known if rel not in current]
+    for rel in removed:
+        del known[rel]
+    # Also catches fragments the manifest no longer lists (e.g. after a LAKE_VERSION bump)
+    current_ids = {_file_id(rel) for rel in current}
+    for frag in root.glob("year=*/month=*/*.parquet"):
+        if frag.name.split("-")[0] not in current_ids:
+            frag.unlink()
+
+    ingested = 0
+    for rel, path in current.items():
+        st = path.stat()
+        sig = {"size": st.st_size, "mtimeNs": st.st_mtime_ns}
+        if {k: known.get(rel, {}).get(k) for k in sig} == sig:
+            continue
+        for frag in _fragments(root, rel):
+            frag.unlink()
+
+        header = read_header(path)
+        mapping = schema(header)
+        df = normalize(read_raw_csv(path, schema_columns(header, mapping)), mapping)
+        ts = df["ts"]
+        df["year"] = ts.dt.year.fillna(0).astype("int16")
+        df["month"] = ts.dt.month.fillna(0).astype("int8")
+        df["src"] = rel
+        df["row"] = pd.RangeIndex(len(df), dtype="int32")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_dictionary(field.type) or field.name == "src":
+                table = table.set_column(i, field.name, table.column(i).cast(DICT_TYPE))
+        if len(table):
+            pq.write_to_dataset(
+                table, root, partition_cols=["year", "month"],
+                basename_template=f"{_file_id(rel)}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        known[rel] = {**sig, "rows": len(df)}
+        ingested += 1
+
+    if ingested or removed:
+        tmp_path = root / f"{MANIFEST}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, root / MANIFEST)
+    return {"ingested": ingested, "removed": len(removed), "rows": sum(e["rows"] for e in known.values())}
+
+
+def scan(root: Path, columns: list[str], order: list[Path] | None = None, raw_dir: Path | None = None,
+         start: date | None = None, end: date | None = None) -> pd.DataFrame:
+    """Read ``columns`` from the lake in original CSV order.
+
+    With ``start``/``end`` only rows with start <= ts < end are returned,
+    and partitions outside that year/month range are never opened.
+    ``order`` (the raw files, in the order they should be read) ranks
+    rows across files; without it files sort by path.
+    """
+    fields = list(dict.fromkeys([*columns, "src", "row"]))
+    if not any(root.glob("year=*/month=*/*.parquet")):
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in fields})
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+
+    flt = None
+    if start is not None or end is not None:
+        lo = datetime.combine(start or date.min, datetime.min.time())
+        hi = datetime.combine(end or date.max, datetime.min.time())
+        ym = ds.field("year") * 100 + ds.field("month")
+        flt = (
+            (ym >= lo.year * 100 + lo.month) & (ym <= hi.year * 100 + hi.month)
+            & (ds.field("ts") >= pa.scalar(lo, pa.timestamp("us"))) & (ds.field("ts") < pa.scalar(hi, pa.timestamp("us")))
+        )
+    df = dataset.to_table(columns=fields, filter=flt).to_pandas()
+
+    if order is not None and raw_dir is not None:
+        rank = {str(f.relative_to(raw_dir)): i for i, f in enumerate(order)}
+        src_rank = df["src"].astype(str).map(rank).fillna(len(rank))
+    else:
+        src_rank = df["src"].astype(str)
+    df = df.assign(_rank=src_rank).sort_values(["_rank", "row"], kind="stable").drop(columns="_rank")
+    return df.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time raw CSV parsing paths on one export")
+    parser.add_argument("source", choices=("csb", "crime"), help="Which column rules to apply")
+    parser.add_argument("path", type=Path, help="Raw CSV export")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        sys.exit(f"No raw export at {args.path}")
+    from clean_data import _crime_schema, _csb_schema
+
+    header = read_header(args.path)
+    mapping = {"csb": _csb_schema, "crime": _crime_schema}[args.source](header)
+    positions = schema_columns(header, mapping) or list(range(len(header)))
+    names = [header[i] for i in positions]
+
+    def dict_reader():
+        with open(args.path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            return sum(1 for row in csv.DictReader(f) if [(row.get(c) or "").strip() for c in names])
+
+    def positional():
+        get, pad = operator.itemgetter(*positions), ("",) * len(header)
+        with open(args.path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return sum(1 for row in reader if [v.strip() for v in get(row if len(row) >= len(header) else
+                                                                         (*row, *pad))])
+
+    paths = {
+        "csv.DictReader, per-row dicts": dict_reader,
+        "csv.reader, positional tuples": positional,
+        "pandas, every column": lambda: len(read_raw_csv(args.path)),
+        "pandas, schema columns (sync)": lambda: len(read_raw_csv(args.path, schema_columns(header, mapping))),
+    }
+    print(f"{args.path.name}: {len(names)} of {len(header)} columns mapped")
+    base = None
+    for label, fn in paths.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            rows = fn()
+            best = min(best, time.perf_counter() - t0)
+        base = base or best
+        print(f"  {label:<32} {rows:>10,} rows  {best:7.3f}s  {rows / best:>12,.0f} rows/s  {base / best:5.1f}×")
+    print("\n(csv paths stop at stripped per-row values; pandas paths build the frame sync() normalizes)")
+
+
+if __name__ == "__main__":
+    main()
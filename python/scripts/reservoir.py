@@ -0,0 +1,106 @@
+"""
+reservoir.py — Seeded, stratified reservoir sampling in fixed memory.
+
+``StratifiedReservoir`` keeps a bounded sample of a stream of items, each
+tagged with an integer stratum (for the heatmaps: month × neighborhood).
+Every item gets a uniform random key from a seeded generator, in arrival
+order, and a stratum keeps the ``quota`` items with the smallest keys (a
+bottom-k sample, i.e. a uniform sample without replacement of that
+stratum). The quota is water-filled from the rows seen per stratum:
+the largest k with sum(min(seen, k)) <= ``capacity``, so small strata are
+kept whole and the rest share what is left equally. More rows can only
+lower the quota, and trimming every reservoir to a lower quota still
+leaves the bottom-k of each stratum.
+
+The result therefore depends only on the seed and the order items were
+offered, not on how they were batched. Memory is the reservoir
+(<= capacity, or one item per stratum if there are more strata than
+capacity) plus one pending batch and a count per stratum.
+
+``sample()`` returns the kept items in arrival order and, per stratum,
+the sampling weight rows_offered / rows_kept. Weighting each kept point
+by its stratum's weight gives unbiased density estimates even though
+small strata are over-represented relative to large ones.
+"""
+
+import numpy as np
+
+BATCH = 1 << 16
+
+
+class StratifiedReservoir:
+    def __init__(self, capacity: int, seed: int = 0, batch: int = BATCH):
+        self.capacity = capacity
+        self.batch = batch
+        self._rng = np.random.default_rng(seed)
+        self._seen: dict[int, int] = {}
+        self._strata = np.empty(0, dtype=np.int64)
+        self._keys = np.empty(0)
+        self._items = np.empty(0, dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self._offered = 0
+        self._pending_strata: list[int] = []
+        self._pending_items: list[int] = []
+
+    @property
+    def quota(self) -> int:
+        """Items kept per stratum: the water level over the rows seen so far."""
+        counts = np.sort(np.fromiter(self._seen.values(), dtype=np.int64, count=len(self._seen)))
+        if not len(counts) or counts.sum() <= self.capacity:
+            return int(counts[-1]) if len(counts) else self.capacity
+        # Strata below the level keep everything; the remainder is split among the rest
+        before = np.r_[0, np.cumsum(counts)[:-1]]
+        level = (self.capacity - before) // (len(counts) - np.arange(len(counts)))
+        first_cut = int(np.argmax(counts > level))
+        return max(1, int(level[first_cut]))
+
+    def offer(self, stratum: int, item: int) -> None:
+        """Offer one item (an int, such as a row index) belonging to ``stratum``."""
+        self._pending_strata.append(stratum)
+        self._pending_items.append(item)
+        if len(self._pending_items) >= self.batch:
+            self._flush()
+
+    def offer_many(self, strata, items) -> None:
+        """Offer a batch of items, equivalent to calling ``offer`` for each in order."""
+        self._flush()
+        strata = np.asarray(strata, dtype=np.int64)
+        items = np.asarray(items, dtype=np.int64)
+        for start in range(0, len(items), self.batch):
+            self._add(strata[start:start + self.batch], items[start:start + self.batch])
+
+    def _flush(self) -> None:
+        if self._pending_items:
+            strata, items = self._pending_strata, self._pending_items
+            self._pending_strata, self._pending_items = [], []
+            self._add(np.array(strata, dtype=np.int64), np.array(items, dtype=np.int64))
+
+    def _add(self, strata: np.ndarray, items: np.ndarray) -> None:
+        if not len(items):
+            return
+        keys = self._rng.random(len(items))
+        order = np.arange(self._offered, self._offered + len(items))
+        self._offered += len(items)
+        values, counts = np.unique(strata, return_counts=True)
+        for s, n in zip(values.tolist(), counts.tolist()):
+            self._seen[s] = self._seen.get(s, 0) + n
+
+        strata = np.concatenate([self._strata, strata])
+        keys = np.concatenate([self._keys, keys])
+        items = np.concatenate([self._items, items])
+        order = np.concatenate([self._order, order])
+        # Rank by key within each stratum; keep the smallest ``quota``
+        by = np.lexsort((keys, strata))
+        sorted_strata = strata[by]
+        starts = np.flatnonzero(np.r_[True, sorted_strata[1:] != sorted_strata[:-1]])
+        rank = np.arange(len(by)) - np.repeat(starts, np.diff(np.r_[starts, len(by)]))
+        keep = by[rank < self.quota]
+        self._strata, self._keys, self._items, self._order = strata[keep], keys[keep], items[keep], order[keep]
+
+    def sample(self) -> tuple[np.ndarray, dict[int, float]]:
+        """(kept items in arrival order, {stratum: rows offered / rows kept})."""
+        self._flush()
+        arrival = np.argsort(self._order, kind="stable")
+        kept_strata, kept_counts = np.unique(self._strata, return_counts=True)
+        weights = {s: self._seen[s] / n for s, n in zip(kept_strata.tolist(), kept_counts.tolist())}
+        return self._items[arrival], weights
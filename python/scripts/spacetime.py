@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+spacetime.py — Space-time grid hash for radius × time-window joins.
+
+``SpaceTimeIndex`` buckets one event set (x/y in metres, e.g. from
+geo.lnglat_to_metres, and a time in fractional days) into ``cell_m``
+square cells and ``bucket_days`` time buckets. Each event's cell and
+bucket are packed into one int64 key, events are sorted by key, and the
+distinct keys with their start offsets form a CSR table, so every
+(cell, bucket) lookup is one ``np.searchsorted``.
+
+``join`` answers a whole batch of queries at once: for each query it
+looks up the neighbouring cells within ``radius_m`` and the buckets
+overlapping its time window, expands the matching key ranges into
+candidate (query, event) pairs with ``np.repeat``, and keeps the pairs
+that pass the exact distance and time tests. With cells about as wide as
+the radius and buckets about as long as the window, each query touches
+3 × 3 cells × 2 buckets instead of every event. Queries run in chunks so
+the candidate arrays stay bounded.
+
+Run this file to check ``join`` against a brute-force scan on random
+points and time both.
+
+Usage:
+  cd python/
+  uv run python scripts/spacetime.py
+  uv run python scripts/spacetime.py --events 500000 --queries 20000
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+QUERY_CHUNK = 4096
+
+
+class SpaceTimeIndex:
+    def __init__(self, x, y, day, cell_m: float, bucket_days: float):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        day = np.asarray(day, dtype=float)
+        self.cell_m = cell_m
+        self.bucket_days = bucket_days
+        self.size = len(x)
+
+        cx, cy, bt = self._cells(x, y, day)
+        if self.size:
+            self._lo = np.array([cx.min(), cy.min(), bt.min()])
+            self._shape = np.array([cx.max(), cy.max(), bt.max()]) - self._lo + 1
+        else:
+            self._lo = np.zeros(3, dtype=np.int64)
+            self._shape = np.ones(3, dtype=np.int64)
+        keys = self._pack(cx, cy, bt)
+
+        self.order = np.argsort(keys, kind="stable")  # event ids in key order
+        sorted_keys = keys[self.order]
+        self.keys, self.starts = np.unique(sorted_keys, return_index=True)
+        self.ends = np.r_[self.starts[1:], self.size]
+        self.x, self.y, self.day = x[self.order], y[self.order], day[self.order]
+
+    def _cells(self, x, y, day):
+        return (
+            np.floor(x / self.cell_m).astype(np.int64),
+            np.floor(y / self.cell_m).astype(np.int64),
+            np.floor(day / self.bucket_days).astype(np.int64),
+        )
+
+    def _pack(self, cx, cy, bt) -> np.ndarray:
+        """int64 key per (cell, bucket); -1 outside the indexed extent."""
+        rel = [c - lo for c, lo in zip((cx, cy, bt), self._lo)]
+        inside = True
+        for r, n in zip(rel, self._shape):
+            inside = inside & (r >= 0) & (r < n)
+        key = (rel[2] * self._shape[1] + rel[1]) * self._shape[0] + rel[0]
+        return np.where(inside, key, -1)
+
+    def join(self, qx, qy, qday, radius_m: float,
+             window: tuple[float, float] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """All (query, event) pairs within ``radius_m`` and, if given, ``window``.
+
+        ``window`` = (lo, hi) keeps events with lo <= event day - query day
+        < hi, so (0, 30) is "in the 30 days after" and (-30, 0) "in the 30
+        days before". Without it every event in range matches (``qday`` is
+        then ignored). Returns (query ids, event ids) ordered by query.
+        """
+        qx = np.asarray(qx, dtype=float)
+        qy = np.asarray(qy, dtype=float)
+        qday = np.zeros(len(qx)) if qday is None else np.asarray(qday, dtype=float)
+        q_out, e_out = [], []
+        for start in range(0, len(qx), QUERY_CHUNK):
+            part = slice(start, start + QUERY_CHUNK)
+            q, e = self._join_chunk(qx[part], qy[part], qday[part], radius_m, window)
+            q_out.append(q + start)
+            e_out.append(e)
+        if not q_out:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(q_out), np.concatenate(e_out)
+
+    def count(self, qx, qy, qday, radius_m: float, window: tuple[float, float] | None = None) -> np.ndarray:
+        """Matching events per query."""
+        q, _ = self.join(qx, qy, qday, radius_m, window)
+        return np.bincount(q, minlength=len(qx))
+
+    def _join_chunk(self, qx, qy, qday, radius_m, window):
+        n = len(qx)
+        empty = np.empty(0, dtype=np.int64)
+        if not n or not self.size:
+            return empty, empty
+
+        reach = math.ceil(radius_m / self.cell_m)
+        offsets = np.arange(-reach, reach + 1)
+        dx, dy = (a.ravel() for a in np.meshgrid(offsets, offsets))
+        cx, cy, _ = self._cells(qx, qy, qday)
+        if window is None:
+            first = np.full(n, self._lo[2])
+            last = np.full(n, self._lo[2] + self._shape[2] - 1)
+        else:
+            first = np.floor((qday + window[0]) / self.bucket_days).astype(np.int64)
+            last = np.floor((qday + window[1]) / self.bucket_days).astype(np.int64)
+        db = np.arange(int((last - first).max()) + 1)
+
+        # Candidate keys: query × neighbouring cell × bucket
+        ccx = (cx[:, None] + dx[None, :])[:, :, None]
+        ccy = (cy[:, None] + dy[None, :])[:, :, None]
+        cbt = (first[:, None] + db[None, :])[:, None, :]
+        keys = self._pack(ccx, ccy, cbt)
+        keys = np.where(cbt <= last[:, None, None], keys, -1).reshape(n, -1)
+
+        slot = np.searchsorted(self.keys, keys)
+        slot = np.minimum(slot, len(self.keys) - 1)
+        hit = (keys >= 0) & (self.keys[slot] == keys)
+        starts = np.where(hit, self.starts[slot], 0).ravel()
+        lengths = np.where(hit, self.ends[slot] - self.starts[slot], 0).ravel()
+
+        # Expand each matched key range into candidate (query, event) pairs
+        total = int(lengths.sum())
+        if not total:
+            return empty, empty
+        query = np.repeat(np.repeat(np.arange(n), keys.shape[1]), lengths)
+        run_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        event = np.repeat(starts, lengths) + np.arange(total) - run_start
+
+        d2 = (self.x[event] - qx[query]) ** 2 + (self.y[event] - qy[query]) ** 2
+        keep = d2 <= radius_m * radius_m
+        if window is not None:
+            dt = self.day[event] - qday[query]
+            keep &= (dt >= window[0]) & (dt < window[1])
+        return query[keep], self.order[event[keep]]
+
+
+def brute_force(ex, ey, eday, qx, qy, qday, radius_m, window=None) -> tuple[np.ndarray, np.ndarray]:
+    """Reference O(queries × events) join: the pairs ``SpaceTimeIndex.join`` must return."""
+    q_out, e_out = [], []
+    for i in range(len(qx)):
+        keep = (ex - qx[i]) ** 2 + (ey - qy[i]) ** 2 <= radius_m * radius_m
+        if window is not None:
+            dt = eday - qday[i]
+            keep &= (dt >= window[0]) & (dt < window[1])
+        hits = np.flatnonzero(keep)
+        q_out.append(np.full(len(hits), i))
+        e_out.append(hits)
+    return np.concatenate(q_out), np.concatenate(e_out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the space-time join against a brute-force scan")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--radius", type=float, default=200.0, help="metres")
+    parser.add_argument("--window", type=float, default=30.0, help="days after each query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # City-sized extent (~15 km × 28 km), one year, clustered like real incidents
+    centres = rng.uniform([0, 0], [15_000, 28_000], size=(200, 2))
+
+    def points(n):
+        c = centres[rng.integers(len(centres), size=n)]
+        xy = c + rng.normal(0, 600, size=(n, 2))
+        return xy[:, 0], xy[:, 1], rng.uniform(0, 365, n)
+
+    ex, ey, eday = points(args.events)
+    qx, qy, qday = points(args.queries)
+    window = (0.0, args.window)
+
+    t0 = time.perf_counter()
+    index = SpaceTimeIndex(ex, ey, eday, cell_m=args.radius, bucket_days=args.window)
+    build_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    q, e = index.join(qx, qy, qday, args.radius, window)
+    join_s = time.perf_counter() - t0
+    print(f"index: {args.events:,} events in {len(index.keys):,} occupied cell-buckets, built in {build_s:.2f}s")
+    print(f"join:  {args.queries:,} queries → {len(q):,} pairs in {join_s:.2f}s")
+
+    n_check = min(args.queries, 500)
+    t0 = time.perf_counter()
+    bq, be = brute_force(ex, ey, eday, qx[:n_check], qy[:n_check], qday[:n_check], args.radius, window)
+    brute_s = time.perf_counter() - t0
+    sel = q < n_check
+    ours = set(zip(q[sel].tolist(), e[sel].tolist()))
+    theirs = set(zip(bq.tolist(), be.tolist()))
+    print(f"brute: {n_check:,} queries in {brute_s:.2f}s "
+          f"(≈{brute_s * args.queries / n_check:.1f}s for all), "
+          f"{'identical' if ours == theirs else 'MISMATCH'} pairs")
+    if ours != theirs:
+        raise SystemExit(f"FAILED: {len(ours - theirs)} extra, {len(theirs - ours)} missing pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+step_profile.py — Per-step resource instrumentation for clean_data.py --profile.
+
+Steps mark their phases and row counts with two cheap hooks that are no-ops
+unless a profile is active:
+
+    phase("parse")              # ends the previous phase, starts this one
+    count_rows(read=len(rows))  # or written=...
+
+StepProfile wraps one step and records wall/CPU time, peak RSS, rows and
+bytes in/out, per-phase time and the files the step wrote. Optionally it
+dumps a cProfile .pstats file and a folded-stack file (one "a;b;c count"
+line per unique stack, the input format of flamegraph.pl / speedscope),
+sampled from the main thread every SAMPLE_INTERVAL seconds.
+
+Peak RSS and bytes in/out come from /proc on Linux (the peak is reset per
+step via clear_refs); elsewhere peak RSS falls back to the process-lifetime
+maximum and byte counts are omitted.
+"""
+
+import cProfile
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+_active: "StepProfile | None" = None
+
+
+def phase(name: str) -> None:
+    """Start phase ``name`` in the active step (closing the previous phase)."""
+    if _active is not None:
+        _active.phase(name)
+
+
+def count_rows(read: int = 0, written: int = 0) -> None:
+    """Add to the active step's rows read / written."""
+    if _active is not None:
+        _active.rows_read += read
+        _active.rows_written += written
+
+
+# ── Process counters ─────────────────────────────────────────────────────────
+
+def _proc_io() -> tuple[int, int] | None:
+    """(bytes read, bytes written) through syscalls, including page-cache hits."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(":") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(from_proc: bool) -> float:
+    if from_proc:
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _snapshot(dirs: list[Path]) -> dict[Path, tuple[int, int]]:
+    """(mtime, size) of every file under ``dirs``, including shard subdirectories."""
+    files = {}
+    for d in dirs:
+        if d.exists():
+            for p in d.rglob("*"):
+                if p.is_file():
+                    st = p.stat()
+                    files[p] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+# ── Stack sampler ────────────────────────────────────────────────────────────
+
+class StackSampler(threading.Thread):
+    """Samples the main thread's Python stack into folded-stack counts."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.target = threading.main_thread().ident
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path: Path) -> None:
+        with open(path, "w") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+# ── Step profile ─────────────────────────────────────────────────────────────
+
+class StepProfile:
+    """Context manager measuring one pipeline step; ``record()`` returns its report entry."""
+
+    def __init__(self, key: str, name: str, watch_dirs: list[Path], dump_dir: Path | None = None):
+        self.key, self.name = key, name
+        self.watch_dirs = watch_dirs
+        self.dump_dir = dump_dir
+        self.rows_read = 0
+        self.rows_written = 0
+        self.phases: dict[str, float] = {}
+        self.status = "ok"
+        self.error: str | None = None
+        self._phase: str | None = None
+        self._phase_t0 = 0.0
+
+    def phase(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._phase_t0
+        self._phase, self._phase_t0 = name, now
+
+    def __enter__(self):
+        global _active
+        self._before = _snapshot(self.watch_dirs)
+        self._io0 = _proc_io()
+        self._proc_peak = _reset_peak_rss()
+        self._profiler = self._sampler = None
+        if self.dump_dir is not None:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+            self._sampler = StackSampler()
+            self._sampler.start()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        _active = self
+        self._cpu0, self._t0 = time.process_time(), time.perf_counter()
+        self.phase("other")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        self.phase("")  # close the open phase
+        self.wall = time.perf_counter() - self._t0
+        self.cpu = time.process_time() - self._cpu0
+        _active = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.dump_dir / f"{self.key}.pstats")
+            self._sampler.stop()
+            self._sampler.write(self.dump_dir / f"{self.key}.folded")
+        self.peak_rss = _peak_rss_mb(self._proc_peak)
+        io1 = _proc_io()
+        self.bytes_io = (io1[0] - self._io0[0], io1[1] - self._io0[1]) if io1 and self._io0 else None
+        after = _snapshot(self.watch_dirs)
+        self.outputs = {p: size for p, (mtime, size) in after.items() if self._before.get(p, (None,))[0] != mtime}
+        if exc_type is SystemExit:
+            self.status, self.error = "exited", str(exc)
+        elif exc_type is not None:
+            self.status, self.error = "failed", f"{exc_type.__name__}: {exc}"
+        return False
+
+    def _relative(self, path: Path) -> str:
+        """``path`` relative to the watched directory holding it (e.g. "csb_points/2025-01.json")."""
+        for d in self.watch_dirs:
+            if path.is_relative_to(d):
+                return str(path.relative_to(d))
+        return path.name
+
+    def record(self) -> dict:
+        phases = {k: round(v, 4) for k, v in self.phases.items() if k and v > 0}
+        entry = {
+            "key": self.key,
+            "name": self.name,
+            "status": self.status,
+            "wallS": round(self.wall, 4),
+            "cpuS": round(self.cpu, 4),
+            "peakRssMb": round(self.peak_rss, 1),
+            "rowsRead": self.rows_read,
+            "rowsWritten": self.rows_written,
+            "bytesIn": self.bytes_io[0] if self.bytes_io else None,
+            "bytesOut": self.bytes_io[1] if self.bytes_io else None,
+            "phases": phases,
+            "outputs": {self._relative(p): size for p, size in sorted(self.outputs.items())},
+        }
+        if self.error:
+            entry["error"] = self.error
+        if self.dump_dir is not None:
+            entry["pstats"] = str(self.dump_dir / f"{self.key}.pstats")
+            entry["folded"] = str(self.dump_dir / f"{self.key}.folded")
+        return entry
@@ -0,0 +1,667 @@
+#!/usr/bin/env python3
+"""
+synth_raw.py — Generate synthetic raw inputs for offline load testing.
+
+Writes a stand-in for python/data/raw/ with the same file names and column
+layouts fetch_raw.py produces (the ones clean_data.py auto-detects), at any
+multiple of the real data volume, so the whole pipeline can run without
+reaching the city's servers.
+
+The data is statistically shaped like the real exports:
+  - 79 neighborhoods on a south→north grid (NHD 1 = Carondelet … 79 = North
+    Riverfront) with lognormal populations; a north-side index drives
+    vacancy, poverty, crime intensity and demographics.
+  - CSB and crime events have seasonal, weekday and hour-of-day profiles,
+    skewed category mixes, points that fall inside the neighborhood they
+    are tagged with, and a few percent missing coordinates.
+  - CSB resolution times are lognormal per category; crime felony/firearm
+    flags depend on the offense.
+  - GTFS routes are corridors with stops along them; every trip visits its
+    route's stops in order, so stop_times ≈ trips × stops per route.
+  - Vacancy, USDA, ACS and demographics values are correlated with the
+    north-side index the way the real data is.
+
+Usage:
+  cd python/
+  uv run python scripts/synth_raw.py                         # 1× into data/synthetic/raw/
+  uv run python scripts/synth_raw.py --scale 10 --seed 7
+  uv run python scripts/synth_raw.py --scale 0.1 --only csb,crime --out /tmp/raw
+  uv run python scripts/clean_data.py --raw-dir data/synthetic/raw --out-dir data/synthetic/out
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import shapefile  # pyshp
+except ImportError:
+    sys.exit("Missing dependency: uv sync")
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
+DEFAULT_OUT = PYTHON_DIR / "data" / "synthetic" / "raw"
+
+YEAR = int(os.environ.get("DATA_YEAR", "2025"))
+CSB_YEARS = 5  # csb.zip holds every year; crime bulk file covers the 4 prior years
+
+# Approximate row counts of the real exports (scale = 1)
+REAL_VOLUME = {
+    "csb": 1_000_000,  # all years in csb.zip
+    "crime": 250_000,  # bulk file + monthly files
+    "stops": 5_113,
+    "routes": 80,
+    "stop_times": 1_200_000,  # trips are sized to hit this
+    "shape_points": 250_000,
+    "parcels": 130_000,
+    "vacancies": 9_600,
+    "usda_tracts": 72_531,  # national atlas; ~106 are St. Louis city
+    "arpa": 5_000,
+}
+
+BBOX = (-90.32, 38.53, -90.18, 38.77)  # lng_min, lat_min, lng_max, lat_max
+STL_FIPS = "29510"
+N_TRACTS = 106
+WGS84_PRJ = (
+    'GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],'
+    'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]]'
+)
+MERCATOR_R = 20037508.34
+MISSING_COORD_FRAC = 0.03
+
+# NHD_NUM order (1 = far south, 79 = far north)
+NEIGHBORHOOD_NAMES = [
+    "Carondelet", "Patch", "Holly Hills", "Boulevard Heights", "Bevo Mill", "Princeton Heights",
+    "Southampton", "St. Louis Hills", "Lindenwood Park", "Ellendale", "Clifton Heights", "The Hill",
+    "Southwest Garden", "North Hampton", "Tower Grove South", "Dutchtown", "Mount Pleasant", "Marine Villa",
+    "Gravois Park", "Kosciusko", "Soulard", "Benton Park", "McKinley Heights", "Fox Park",
+    "Tower Grove East", "Compton Heights", "Shaw", "Botanical Heights", "Tiffany", "Benton Park West",
+    "The Gate District", "Lafayette Square", "Peabody Darst Webbe", "LaSalle Park", "Downtown",
+    "Downtown West", "Midtown", "Central West End", "Forest Park Southeast", "Kings Oak", "Cheltenham",
+    "Clayton-Tamm", "Franz Park", "Hi-Pointe", "Wydown Skinker", "Skinker DeBaliviere", "DeBaliviere Place",
+    "West End", "Visitation Park", "Wells Goodfellow", "Academy", "Kingsway West", "Fountain Park",
+    "Lewis Place", "Kingsway East", "Greater Ville", "The Ville", "Vandeventer", "JeffVanderLou",
+    "St. Louis Place", "Carr Square", "Columbus Square", "Old North St. Louis", "Near North Riverfront",
+    "Hyde Park", "College Hill", "Fairground Neighborhood", "O'Fallon", "Penrose", "Mark Twain I-70 Industrial",
+    "Mark Twain", "Walnut Park East", "North Pointe", "Baden", "Riverview", "Walnut Park West",
+    "Covenant Blu-Grand Center", "Hamilton Heights", "North Riverfront",
+]
+N_NEIGHBORHOODS = len(NEIGHBORHOOD_NAMES)
+
+# (PROBLEMCODE, relative volume, median days to close)
+CSB_CATEGORIES = [
+    ("REFUSE-COLLECTION-MISSED", 120, 2), ("BULK-ITEMS-PICKUP", 95, 5), ("WEEDS-VACANT-LOT", 60, 21),
+    ("VACANT-BLDG-NUISANCE", 55, 30), ("POTHOLE", 50, 6), ("ILLEGAL-DUMPING", 45, 9),
+    ("STREET-LIGHT-OUT", 40, 12), ("ABANDONED-VEHICLE", 35, 14), ("TREE-TRIM-REQUEST", 25, 45),
+    ("RAT-COMPLAINT", 22, 10), ("VACANT-BLDG-BOARDUP", 20, 25), ("SEWER-BACKUP", 18, 3),
+    ("TRAFFIC-SIGNAL-OUT", 15, 1), ("GRAFFITI-REMOVAL", 14, 8), ("SIDEWALK-REPAIR", 12, 90),
+    ("NOISE-COMPLAINT", 11, 4), ("DEAD-ANIMAL-PICKUP", 10, 1), ("ALLEY-CLEANING", 9, 15),
+    ("BUILDING-CODE-VIOLATION", 8, 40), ("VACANT-LOT-DUMPING", 7, 18), ("STREET-SWEEPING", 6, 7),
+    ("WATER-MAIN-LEAK", 5, 2), ("PARKING-VIOLATION", 5, 1), ("PARK-MAINTENANCE", 4, 20),
+    ("STRAY-ANIMAL", 4, 2),
+]
+CSB_VACANT_WEIGHT = 2.0  # vacancy-related complaints scale with the north-side index
+
+# (NIBRS, Description, relative volume, P(felony), P(firearm))
+CRIME_OFFENSES = [
+    ("13B", "ASSAULT - SIMPLE", 160, 0.05, 0.02), ("23H", "LARCENY - ALL OTHER", 140, 0.25, 0.0),
+    ("290", "DESTRUCTION/DAMAGE/VANDALISM OF PROPERTY", 120, 0.35, 0.01),
+    ("240", "MOTOR VEHICLE THEFT", 110, 0.95, 0.0), ("23F", "LARCENY - THEFT FROM MOTOR VEHICLE", 100, 0.3, 0.0),
+    ("13A", "ASSAULT - AGGRAVATED", 70, 1.0, 0.55), ("220", "BURGLARY/BREAKING & ENTERING", 55, 1.0, 0.03),
+    ("13C", "INTIMIDATION", 40, 0.2, 0.1), ("120", "ROBBERY", 30, 1.0, 0.6),
+    ("35A", "DRUG/NARCOTIC VIOLATIONS", 30, 0.5, 0.1), ("520", "WEAPON LAW VIOLATIONS", 28, 0.8, 0.95),
+    ("23C", "LARCENY - SHOPLIFTING", 25, 0.1, 0.0), ("26A", "FRAUD - FALSE PRETENSES/SWINDLE", 20, 0.6, 0.0),
+    ("90J", "TRESPASS OF REAL PROPERTY", 15, 0.0, 0.0), ("90D", "DRIVING UNDER THE INFLUENCE", 12, 0.05, 0.0),
+    ("250", "COUNTERFEITING/FORGERY", 6, 0.9, 0.0), ("11A", "RAPE", 4, 1.0, 0.05), ("09A", "HOMICIDE", 2, 1.0, 0.9),
+]
+
+# Relative volume by hour of day (0-23)
+CSB_HOURLY = np.array([1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 13, 12, 13, 13, 12, 10, 7, 5, 4, 3, 2, 2, 1], float)
+CRIME_HOURLY = np.array([9, 7, 6, 4, 3, 3, 3, 4, 5, 6, 6, 7, 9, 7, 7, 8, 8, 9, 9, 10, 10, 10, 10, 9], float)
+# Relative volume by weekday (Mon=0)
+CSB_WEEKDAY = np.array([1.25, 1.15, 1.1, 1.05, 1.0, 0.35, 0.3])
+CRIME_WEEKDAY = np.array([1.0, 0.95, 0.95, 0.97, 1.05, 1.1, 1.05])
+
+ARPA_PROJECTS = [
+    "COVID-19 Vaccine Outreach", "Public Health Response", "Emergency Rental Assistance", "Homeless Shelter Operations",
+    "Mortgage Relief Program", "Small Business Grants", "Workforce Development", "Youth Employment Program",
+    "Community Violence Intervention", "Police Overtime", "Fire Station Repairs", "Water Infrastructure Upgrades",
+    "Sewer Lateral Repair", "Road Resurfacing", "Broadband Expansion", "Park Improvements",
+    "Recreation Center Renovation", "Vacant Building Demolition", "Affordable Housing Development",
+    "Digital Inclusion", "Summer Youth Programs", "Hospital Staffing Support", "Administrative Costs",
+]
+
+
+def _scaled(key: str, scale: float) -> int:
+    return max(1, int(round(REAL_VOLUME[key] * scale)))
+
+
+# ── Geography ────────────────────────────────────────────────────────────────
+
+class City:
+    """Neighborhood grid plus the per-neighborhood traits every source is drawn from."""
+
+    def __init__(self, rng: np.random.Generator):
+        n = N_NEIGHBORHOODS
+        self.cols = int(np.ceil(np.sqrt(n * 0.6)))
+        self.rows = int(np.ceil(n / self.cols))
+        lng0, lat0, lng1, lat1 = BBOX
+        self.dx, self.dy = (lng1 - lng0) / self.cols, (lat1 - lat0) / self.rows
+        idx = np.arange(n)
+        self.x0 = lng0 + (idx % self.cols) * self.dx
+        self.y0 = lat0 + (idx // self.cols) * self.dy
+        self.cells = [(x, y, x + self.dx, y + self.dy) for x, y in zip(self.x0, self.y0)]
+
+        self.north = (idx // self.cols + 0.5) / self.rows  # 0 = south edge, 1 = north edge
+        central = np.exp(-(((idx % self.cols) - self.cols / 2) ** 2) / 6)  # denser near the central corridor
+        pop = rng.lognormal(np.log(3500), 0.6, n) * (0.6 + 0.8 * central)
+        self.population = np.clip(np.round(pop), 150, 20_000).astype(int)
+        # North-side disadvantage index in [0, 1] with neighborhood-level noise
+        self.need = np.clip(self.north ** 1.5 + rng.normal(0, 0.12, n), 0, 1)
+        self.crime_intensity = self.population * (0.5 + 2.5 * self.need) * rng.lognormal(0, 0.3, n)
+        self.csb_intensity = self.population * (0.8 + 0.8 * self.need) * rng.lognormal(0, 0.25, n)
+
+    def sample_points(self, rng: np.random.Generator, hoods: np.ndarray):
+        """(lng, lat) inside each given neighborhood's cell, clustered toward its center."""
+        u = rng.beta(2.0, 2.0, size=(len(hoods), 2))
+        return self.x0[hoods] + u[:, 0] * self.dx, self.y0[hoods] + u[:, 1] * self.dy
+
+    @staticmethod
+    def grid(n: int) -> list[tuple[float, float, float, float]]:
+        """Cells (lng0, lat0, lng1, lat1) of an n-cell grid over the same box (for census tracts)."""
+        cols = int(np.ceil(np.sqrt(n * 0.6)))
+        rows = int(np.ceil(n / cols))
+        lng0, lat0, lng1, lat1 = BBOX
+        dx, dy = (lng1 - lng0) / cols, (lat1 - lat0) / rows
+        return [(lng0 + c * dx, lat0 + r * dy, lng0 + (c + 1) * dx, lat0 + (r + 1) * dy)
+                for r in range(rows) for c in range(cols)][:n]
+
+    @staticmethod
+    def need_at(lat: np.ndarray) -> np.ndarray:
+        return np.clip((lat - BBOX[1]) / (BBOX[3] - BBOX[1]), 0, 1) ** 1.5
+
+
+def _sample_datetimes(rng: np.random.Generator, n: int, start: str, end: str, hourly: np.ndarray,
+                      weekday: np.ndarray, summer_amp: float) -> pd.DatetimeIndex:
+    """Timestamps with seasonal (summer peak), weekday and hour-of-day profiles."""
+    days = pd.date_range(start, end, freq="D")
+    doy = days.dayofyear.to_numpy()
+    w = (1 + summer_amp * np.sin(2 * np.pi * (doy - 105) / 365.25)) * weekday[days.dayofweek.to_numpy()]
+    day_idx = rng.choice(len(days), size=n, p=w / w.sum())
+    hours = rng.choice(24, size=n, p=hourly / hourly.sum())
+    secs = rng.integers(0, 3600, n)
+    return pd.DatetimeIndex(days.to_numpy()[day_idx] + (hours * 3600 + secs).astype("timedelta64[s]"))
+
+
+def _format_times(ts: pd.DatetimeIndex, layout: str) -> np.ndarray:
+    """Fast strftime for the two layouts the raw exports use ("csb" or "slmpd")."""
+    iso = pd.Series(np.datetime_as_string(ts.to_numpy(), unit="s"))  # YYYY-MM-DDTHH:MM:SS
+    if layout == "csb":  # 2025-01-31 14:05:09.000
+        return (iso.str.replace("T", " ", regex=False) + ".000").to_numpy()
+    # SLMPD: 01/31/2025 14:05
+    return (iso.str[5:7] + "/" + iso.str[8:10] + "/" + iso.str[:4] + " " + iso.str[11:16]).to_numpy()
+
+
+def _mercator(lng: np.ndarray, lat: np.ndarray):
+    x = lng * MERCATOR_R / 180.0
+    y = np.log(np.tan((90.0 + lat) * np.pi / 360.0)) * MERCATOR_R / np.pi
+    return x, y
+
+
+def _write_polygons(path: Path, cells, fields: list[tuple], records: list[list]) -> None:
+    w = shapefile.Writer(str(path), shapeType=shapefile.POLYGON)
+    for f in fields:
+        w.field(*f)
+    for (x0, y0, x1, y1), rec in zip(cells, records):
+        w.poly([[[x0, y0], [x0, y1], [x1, y1], [x1, y0], [x0, y0]]])
+        w.record(*rec)
+    w.close()
+    path.with_suffix(".prj").write_text(WGS84_PRJ)
+
+
+def _tract_geoids() -> list[str]:
+    return [f"{STL_FIPS}{101100 + i * 100:06d}" for i in range(N_TRACTS)]
+
+
+def _tract_need(rng: np.random.Generator) -> np.ndarray:
+    lat_mid = np.array([(c[1] + c[3]) / 2 for c in City.grid(N_TRACTS)])
+    return np.clip(City.need_at(lat_mid) + rng.normal(0, 0.1, N_TRACTS), 0, 1)
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+
+def write_neighborhoods(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    out = raw / "neighborhoods"
+    out.mkdir(parents=True, exist_ok=True)
+    _write_polygons(
+        out / "nbrhds_wards.shp", city.cells,
+        [("NHD_NUM", "N", 4, 0), ("NHD_NAME", "C", 50)],
+        [[i + 1, name] for i, name in enumerate(NEIGHBORHOOD_NAMES)],
+    )
+    return N_NEIGHBORHOODS
+
+
+def write_tracts(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    out = raw / "tiger_tracts"
+    out.mkdir(parents=True, exist_ok=True)
+    geoids = _tract_geoids()
+    _write_polygons(
+        out / "tl_2024_29_tract.shp", City.grid(N_TRACTS),
+        [("GEOID", "C", 11), ("NAMELSAD", "C", 40)],
+        [[g, f"Census Tract {int(g[5:]) / 100:g}"] for g in geoids],
+    )
+    return N_TRACTS
+
+
+def write_csb(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    out = raw / "csb"
+    out.mkdir(parents=True, exist_ok=True)
+    n = _scaled("csb", scale)
+    codes = np.array([c for c, _, _ in CSB_CATEGORIES])
+    base_w = np.array([w for _, w, _ in CSB_CATEGORIES], float)
+    median_days = np.array([d for _, _, d in CSB_CATEGORIES], float)
+    is_vacant = np.char.find(codes, "VACANT") >= 0
+
+    hoods = rng.choice(N_NEIGHBORHOODS, size=n, p=city.csb_intensity / city.csb_intensity.sum())
+    # Category mix depends on the neighborhood: vacancy complaints concentrate where need is high
+    cat = np.empty(n, dtype=int)
+    for lo, hi in ((0.0, 0.33), (0.33, 0.66), (0.66, 1.01)):
+        mask = (city.need[hoods] >= lo) & (city.need[hoods] < hi)
+        w = base_w * np.where(is_vacant, 1 + CSB_VACANT_WEIGHT * (lo + hi) / 2, 1.0)
+        cat[mask] = rng.choice(len(codes), size=int(mask.sum()), p=w / w.sum())
+
+    opened = _sample_datetimes(rng, n, f"{YEAR - CSB_YEARS + 1}-01-01", f"{YEAR}-12-31",
+                               CSB_HOURLY, CSB_WEEKDAY, summer_amp=0.2)
+    days_open = rng.lognormal(np.log(median_days[cat]), 0.9)
+    closed = opened + pd.to_timedelta(np.round(days_open * 86400), unit="s")
+    still_open = (closed > pd.Timestamp(f"{YEAR}-12-31 23:59:59")) | (rng.random(n) < 0.03)
+    status = np.where(still_open, np.where(rng.random(n) < 0.5, "OPEN", "IN PROGRESS"), "CLOSED")
+
+    lng, lat = city.sample_points(rng, hoods)
+    srx, sry = _mercator(lng, lat)
+    missing = rng.random(n) < MISSING_COORD_FRAC
+
+    df = pd.DataFrame({
+        "REQUESTID": np.arange(1, n + 1) + 1_000_000,
+        "DATETIMEINIT": _format_times(opened, "csb"),
+        "PROBLEMCODE": codes[cat],
+        "DESCRIPTION": np.char.replace(codes[cat], "-", " "),
+        "CALLERTYPE": rng.choice(np.array(["PHONE", "WEB", "APP", "STAFF"]), size=n, p=[0.45, 0.25, 0.2, 0.1]),
+        "NEIGHBORHOOD": hoods + 1,
+        "WARD": rng.integers(1, 15, n),
+        "SRX": np.where(missing, 0, srx.round(2)),
+        "SRY": np.where(missing, 0, sry.round(2)),
+        "STATUS": status,
+        "DATETIMECLOSED": np.where(still_open, "", _format_times(closed, "csb")),
+    })
+    years = opened.year.to_numpy()
+    for year in np.unique(years):
+        df[years == year].to_csv(out / f"csb_{year}.csv", index=False)
+    return n
+
+
+def write_crime(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    out = raw / "crime"
+    out.mkdir(parents=True, exist_ok=True)
+    n = _scaled("crime", scale)
+    nibrs = np.array([o[0] for o in CRIME_OFFENSES])
+    desc = np.array([o[1] for o in CRIME_OFFENSES])
+    w = np.array([o[2] for o in CRIME_OFFENSES], float)
+    p_fel = np.array([o[3] for o in CRIME_OFFENSES])
+    p_gun = np.array([o[4] for o in CRIME_OFFENSES])
+
+    hoods = rng.choice(N_NEIGHBORHOODS, size=n, p=city.crime_intensity / city.crime_intensity.sum())
+    off = rng.choice(len(CRIME_OFFENSES), size=n, p=w / w.sum())
+    # Firearm involvement rises with neighborhood need
+    gun = rng.random(n) < np.clip(p_gun[off] * (0.6 + 0.8 * city.need[hoods]), 0, 1)
+    fel = np.where(rng.random(n) < p_fel[off], "FELONY", np.where(rng.random(n) < 0.9, "MISDEMEANOR", "CITATION"))
+    when = _sample_datetimes(rng, n, f"{YEAR - 4}-01-01", f"{YEAR}-12-31", CRIME_HOURLY, CRIME_WEEKDAY, summer_amp=0.15)
+    lng, lat = city.sample_points(rng, hoods)
+    missing = rng.random(n) < MISSING_COORD_FRAC
+
+    df = pd.DataFrame({
+        "IncidentNum": [f"{y % 100:02d}-{i:06d}" for y, i in zip(when.year, range(n))],
+        "DateOccur": _format_times(when, "slmpd"),
+        "NIBRS": nibrs[off],
+        "Description": desc[off],
+        "FelMisCit": fel,
+        "FirearmUsed": np.where(gun, "Y", "N"),
+        "District": 1 + (hoods * 6) // N_NEIGHBORHOODS,
+        "Neighborhood": np.array(NEIGHBORHOOD_NAMES)[hoods],
+        "NbhdNum": hoods + 1,
+        "Latitude": np.where(missing, "", lat.round(6).astype(str)),
+        "Longitude": np.where(missing, "", lng.round(6).astype(str)),
+    })
+    # Bulk historical file + one file per month of the target year (SLMPD layout)
+    is_bulk = np.asarray(when.year < YEAR)
+    df[is_bulk].to_csv(out / f"{YEAR - 4}-{YEAR - 1}.csv", index=False)
+    months = when.month.to_numpy()
+    for month in range(1, 13):
+        part = df[~is_bulk & (months == month)]
+        if len(part):
+            part.to_csv(out / f"{pd.Timestamp(YEAR, month, 1):%B}{YEAR}.csv", index=False)
+    return n
+
+
+def write_gtfs(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    n_routes, n_stops = _scaled("routes", scale), _scaled("stops", scale)
+    n_shape_pts = _scaled("shape_points", scale)
+    lng0, lat0, lng1, lat1 = BBOX
+
+    # Each route is a straight corridor through the city; stops are spaced along it
+    extra = max(0, n_stops - 2 * n_routes)
+    per_route = rng.multinomial(extra, np.full(n_routes, 1 / n_routes)) + 2
+    offsets = np.concatenate([[0], np.cumsum(per_route)])
+    center = np.column_stack([rng.uniform(lng0, lng1, n_routes), rng.uniform(lat0, lat1, n_routes)])
+    angle = rng.uniform(0, np.pi, n_routes)
+    half_len = rng.uniform(0.03, 0.09, n_routes)
+    r_of = np.repeat(np.arange(n_routes), per_route)
+    pos = (np.arange(offsets[-1]) - offsets[r_of]) / (per_route[r_of] - 1) * 2 - 1
+    stop_lng = center[r_of, 0] + pos * half_len[r_of] * np.cos(angle[r_of]) + rng.normal(0, 0.0004, len(r_of))
+    stop_lat = center[r_of, 1] + pos * half_len[r_of] * np.sin(angle[r_of]) + rng.normal(0, 0.0004, len(r_of))
+    # Corridors that run past the city limits end at the edge, like county-line turnarounds
+    stop_lng = np.clip(stop_lng, lng0 + 0.002, lng1 - 0.002)
+    stop_lat = np.clip(stop_lat, lat0 + 0.002, lat1 - 0.002)
+    stop_ids = np.arange(1, offsets[-1] + 1) + 10_000
+    route_ids = np.arange(1, n_routes + 1)
+
+    # Shapes: one per route and direction, points densely along the corridor
+    pts = max(2, n_shape_pts // (2 * n_routes))
+    t = np.linspace(-1, 1, pts)
+    shape_x = center[:, :1] + t * (half_len * np.cos(angle))[:, None]  # (routes, pts)
+    shape_y = center[:, 1:] + t * (half_len * np.sin(angle))[:, None]
+    shape_x = np.stack([shape_x, shape_x[:, ::-1]], axis=1).ravel()  # (routes, 2 directions, pts)
+    shape_y = np.stack([shape_y, shape_y[:, ::-1]], axis=1).ravel()
+    shape_ids = np.array([f"{r}-{d}" for r in route_ids for d in (0, 1)])
+
+    # Trips: busier routes get more trips; departures peak at rush hours
+    n_trips = max(1, round(_scaled("stop_times", scale) / per_route.mean()))
+    route_w = rng.lognormal(0, 0.7, n_routes)
+    trip_route = np.sort(rng.choice(n_routes, size=n_trips, p=route_w / route_w.sum()))
+    trip_dir = rng.integers(0, 2, n_trips)
+    dep_w = np.array([0, 0, 0, 0, 1, 4, 9, 12, 10, 7, 6, 6, 6, 6, 7, 9, 12, 11, 8, 6, 5, 4, 3, 1], float)
+    dep = rng.choice(24, size=n_trips, p=dep_w / dep_w.sum()) * 3600 + rng.integers(0, 3600, n_trips)
+    trip_ids = np.arange(1, n_trips + 1)
+
+    # stop_times: every trip visits its route's stops in order (reversed for direction 1)
+    length = per_route[trip_route]
+    trip_of_row = np.repeat(np.arange(n_trips), length)
+    seq = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+    idx_in_route = np.where(trip_dir[trip_of_row] == 0, seq, length[trip_of_row] - 1 - seq)
+    secs = dep[trip_of_row] + seq * rng.integers(60, 150, n_trips)[trip_of_row]
+    clock = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in secs.tolist()]
+
+    files = {
+        "agency.txt": pd.DataFrame({
+            "agency_id": ["METRO"], "agency_name": ["Metro Transit"],
+            "agency_url": ["https://www.metrostlouis.org"], "agency_timezone": ["America/Chicago"],
+        }),
+        "stops.txt": pd.DataFrame({
+            "stop_id": stop_ids, "stop_code": stop_ids, "stop_name": [f"STOP {s}" for s in stop_ids],
+            "stop_lat": stop_lat.round(6), "stop_lon": stop_lng.round(6),
+        }),
+        "routes.txt": pd.DataFrame({
+            "route_id": route_ids, "agency_id": "METRO", "route_short_name": route_ids,
+            "route_long_name": [f"{NEIGHBORHOOD_NAMES[r % N_NEIGHBORHOODS]} Line" for r in range(n_routes)],
+            "route_type": np.where(np.arange(n_routes) < max(1, n_routes // 40), 2, 3),  # a few rail lines
+            "route_color": [f"{c:06X}" for c in rng.integers(0, 0xFFFFFF, n_routes)],
+        }),
+        "trips.txt": pd.DataFrame({
+            "route_id": route_ids[trip_route],
+            "service_id": rng.choice(np.array(["WK", "SA", "SU"]), size=n_trips, p=[0.7, 0.15, 0.15]),
+            "trip_id": trip_ids, "direction_id": trip_dir,
+            "shape_id": shape_ids[trip_route * 2 + trip_dir],
+        }),
+        "stop_times.txt": pd.DataFrame({
+            "trip_id": trip_ids[trip_of_row], "arrival_time": clock, "departure_time": clock,
+            "stop_id": stop_ids[offsets[trip_route[trip_of_row]] + idx_in_route], "stop_sequence": seq + 1,
+        }),
+        "shapes.txt": pd.DataFrame({
+            "shape_id": np.repeat(shape_ids, pts), "shape_pt_lat": shape_y.round(6),
+            "shape_pt_lon": shape_x.round(6), "shape_pt_sequence": np.tile(np.arange(1, pts + 1), len(shape_ids)),
+        }),
+    }
+    gtfs_zip = raw / "google_transit.zip"
+    with zipfile.ZipFile(gtfs_zip, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, df in files.items():
+            buf = io.StringIO()
+            df.to_csv(buf, index=False)
+            zf.writestr(name, buf.getvalue())
+    # fetch_raw.py leaves both the zip and its extracted copy
+    with zipfile.ZipFile(gtfs_zip) as zf:
+        zf.extractall(raw / "gtfs")
+    return len(files["stop_times.txt"])
+
+
+def write_usda(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    import openpyxl
+
+    n = max(N_TRACTS, _scaled("usda_tracts", scale))
+    need = np.concatenate([_tract_need(rng), rng.beta(2, 5, n - N_TRACTS)])
+    geoids = _tract_geoids() + [f"{1001020100 + i * 37:011d}" for i in range(n - N_TRACTS)]
+    pop = rng.lognormal(np.log(3800), 0.45, n).round().astype(int)
+    poverty = np.clip(rng.normal(8 + 45 * need, 6), 0, 90).round(1)
+    income = np.clip(rng.lognormal(np.log(95_000) - 1.1 * need, 0.25), 9_000, 250_000).round(-2).astype(int)
+    no_car = (pop * np.clip(rng.normal(0.04 + 0.3 * need, 0.04), 0, 0.7)).round().astype(int)
+    lila = (poverty > 20) & (rng.random(n) < 0.3 + 0.5 * need)
+    la = lila | (rng.random(n) < 0.2)
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Food Access Research Atlas")
+    ws.append(["CensusTract", "State", "County", "Urban", "POP2010", "OHU2010", "PovertyRate",
+               "MedianFamilyIncome", "LILATracts_1And10", "LA1and10", "lahunv1", "lahunv10", "TractSNAP"])
+    for i in range(n):
+        in_stl = i < N_TRACTS
+        ws.append([
+            int(geoids[i]), "Missouri" if in_stl else "Other", "St. Louis city" if in_stl else "Other County",
+            1, int(pop[i]), int(pop[i] * 0.42), float(poverty[i]), int(income[i]), int(lila[i]), int(la[i]),
+            int(no_car[i]), int(no_car[i] * 0.3), int(pop[i] * need[i] * 0.2),
+        ])
+    wb.save(raw / "food-access-research-atlas-data-download-2019.xlsx")
+    return n
+
+
+def write_parcels(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    out = raw / "parcels" / "PARCELS"
+    out.mkdir(parents=True, exist_ok=True)
+    n, n_vac = _scaled("parcels", scale), _scaled("vacancies", scale)
+
+    area_w = city.population ** 0.5 * (1 + 0.3 * city.need)
+    hoods = np.sort(rng.choice(N_NEIGHBORHOODS, size=n, p=area_w / area_w.sum()))
+    lng, lat = city.sample_points(rng, hoods)
+    # Vacancy likelihood tracks neighborhood need (north side ≫ south side)
+    vac_w = (0.05 + city.need[hoods] ** 2) * rng.lognormal(0, 0.3, n)
+    vacant = np.zeros(n, dtype=bool)
+    vacant[rng.choice(n, size=min(n_vac, n), replace=False, p=vac_w / vac_w.sum())] = True
+
+    owner_type = np.where(vacant, rng.choice(3, size=n, p=[0.45, 0.05, 0.50]), rng.choice(3, size=n, p=[0.01, 0.02, 0.97]))
+    owners = ["LAND REUTILIZATION AUTHORITY", "CITY OF ST. LOUIS", None]
+    sqft = np.clip(rng.lognormal(np.log(3800), 0.5, n), 800, 60_000).round().astype(int)
+    assessed = np.where(vacant, rng.lognormal(np.log(4_000), 1.0, n), rng.lognormal(np.log(22_000), 0.8, n))
+    tax_bal = np.where(vacant & (rng.random(n) < 0.6), rng.lognormal(np.log(2_500), 1.0, n), 0.0)
+    year_built = np.clip(rng.normal(1915, 25, n), 1850, 2024).astype(int)
+    vacant_lot = vacant & (rng.random(n) < 0.45)
+    zoning = np.array(["A", "B", "C", "F", "G", "J"])[rng.choice(6, size=n, p=[0.15, 0.5, 0.1, 0.1, 0.1, 0.05])]
+    side = np.sqrt(sqft) * 2.7e-6  # feet → degrees, roughly, at this latitude
+    handles = [f"1{i:010d}" for i in range(n)]
+
+    w = shapefile.Writer(str(out / "PARCELS.shp"), shapeType=shapefile.POLYGON)
+    for name, kind, length, dec in [
+        ("HANDLE", "C", 12, 0), ("SITEADDR", "C", 40, 0), ("OWNERNAME", "C", 40, 0), ("WARD", "N", 4, 0),
+        ("NBRHD", "N", 4, 0), ("ZIP", "N", 6, 0), ("SQFT", "N", 10, 0), ("Zoning", "C", 4, 0),
+        ("AsdTotal", "N", 12, 0), ("TaxBalance", "N", 12, 2), ("FirstYearB", "N", 6, 0),
+        ("NbrOfBldgs", "N", 4, 0), ("VacantLot", "N", 2, 0), ("ParcelId", "C", 16, 0),
+    ]:
+        w.field(name, kind, length, dec)
+    for i in range(n):
+        x, y, s = float(lng[i]), float(lat[i]), float(side[i])
+        h = int(hoods[i])
+        w.poly([[[x, y], [x, y + s], [x + s, y + s], [x + s, y], [x, y]]])
+        w.record(
+            handles[i], f"{100 + (i * 7) % 9000} {NEIGHBORHOOD_NAMES[h].upper()[:20]} ST",
+            owners[owner_type[i]] or f"OWNER {i % 50_000}", 1 + h * 14 // N_NEIGHBORHOODS, h + 1,
+            63104 + h % 40, int(sqft[i]), zoning[i], int(assessed[i]), round(float(tax_bal[i]), 2),
+            int(year_built[i]), 0 if vacant_lot[i] else 1, int(vacant_lot[i]), f"{10000 + h:05d}{i:07d}",
+        )
+    w.close()
+    (out / "PARCELS.prj").write_text(WGS84_PRJ)
+
+    # Vacancy API overview, keyed by HANDLE; violation counts are overdispersed
+    vac_idx = np.flatnonzero(vacant)
+    need = city.need[hoods[vac_idx]]
+    vmaj = rng.negative_binomial(1, 1 / (2.5 + 6 * need))
+    vmin = rng.poisson(1 + 4 * need)
+    csb = rng.poisson(0.5 + 3 * need)
+    unpd = np.where(rng.random(len(vac_idx)) < 0.4, rng.lognormal(np.log(400), 1.0, len(vac_idx)), 0.0)
+    months = rng.integers(1, 13, len(vac_idx))
+    overview = {
+        handles[i]: {"mo": int(m), "vmin": int(a), "vmaj": int(b), "csb": int(c), "unpd": round(float(u), 2)}
+        for i, m, a, b, c, u in zip(vac_idx, months, vmin, vmaj, csb, unpd)
+    }
+    vac_dir = raw / "vacancies"
+    vac_dir.mkdir(parents=True, exist_ok=True)
+    with open(vac_dir / "vacancy_overview.json", "w") as f:
+        json.dump(overview, f)
+    return n
+
+
+def write_acs(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    need = _tract_need(rng)
+    rent = np.clip(rng.normal(1150 - 450 * need, 120), 400, 2500).round()
+    value = np.clip(rng.lognormal(np.log(260_000) - 1.3 * need, 0.3), 25_000, 900_000).round(-2)
+    acs = [["NAME", "B25064_001E", "B25077_001E", "state", "county", "tract"]]
+    for i, geoid in enumerate(_tract_geoids()):
+        # Census suppresses a few estimates with a -666666666 sentinel
+        r = "-666666666" if rng.random() < 0.03 else str(int(rent[i]))
+        v = "-666666666" if rng.random() < 0.05 else str(int(value[i]))
+        acs.append([f"Census Tract {int(geoid[5:]) / 100:g}; St. Louis city; Missouri", r, v,
+                    geoid[:2], geoid[2:5], geoid[5:]])
+    with open(raw / "housing_acs.json", "w") as f:
+        json.dump(acs, f)
+    return N_TRACTS
+
+
+def write_demographics(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    def table(pop: int, need: float) -> str:
+        """Scraped page text: each label followed by its value on the next line."""
+        black = np.clip(rng.normal(0.1 + 0.85 * need, 0.08), 0.01, 0.98)
+        hispanic = np.clip(rng.normal(0.06 - 0.04 * need, 0.02), 0.0, 0.3)
+        asian = np.clip(rng.normal(0.04 - 0.03 * need, 0.015), 0.0, 0.2)
+        other = np.clip(rng.normal(0.04, 0.01), 0.0, 0.1)
+        white = max(0.0, 1 - black - asian - other)
+        units = int(pop * rng.uniform(0.5, 0.65))
+        vacant = int(units * np.clip(rng.normal(0.08 + 0.35 * need, 0.05), 0.02, 0.7))
+        pairs = [
+            ("Total Population", pop), ("White alone", white * pop), ("Black or African-American alone", black * pop),
+            ("Asian alone", asian * pop), ("Some Other Race alone", other * pop * 0.4),
+            ("Two or More Races", other * pop * 0.6), ("Hispanic or Latino", hispanic * pop),
+            ("Total Housing Units", units), ("Occupied Housing Units", units - vacant),
+            ("Vacant Housing Units", vacant),
+        ]
+        return "\n".join(f"{label}\n{int(round(v)):,}" for label, v in pairs)
+
+    demographics = {}
+    for i, name in enumerate(NEIGHBORHOOD_NAMES):
+        pop = int(city.population[i])
+        # The city lost ~10% of residents 2010→2020, mostly on the north side
+        pop_2010 = int(pop * rng.normal(1.05 + 0.2 * city.need[i], 0.05))
+        demographics[str(i + 1).zfill(2)] = {
+            "name": f"{name} Census Data",
+            "text": table(pop, city.need[i]),
+            "text_2010": table(pop_2010, city.need[i] * 0.95),
+        }
+    with open(raw / "demographics.json", "w") as f:
+        json.dump(demographics, f)
+    return N_NEIGHBORHOODS
+
+
+def write_arpa(raw: Path, city: City, rng: np.random.Generator, scale: float) -> int:
+    n = _scaled("arpa", scale)
+    proj_w = rng.lognormal(0, 1.0, len(ARPA_PROJECTS))
+    proj = rng.choice(len(ARPA_PROJECTS), size=n, p=proj_w / proj_w.sum())
+    dates = _sample_datetimes(rng, n, "2021-06-01", f"{min(YEAR, 2026)}-12-31",
+                              CSB_HOURLY, CSB_WEEKDAY, summer_amp=0.0)
+    vendors = rng.zipf(1.6, n) % 800  # a few vendors receive most payments
+    amounts = np.clip(rng.lognormal(np.log(6_000), 1.6, n), 25, 4_000_000).round(2)
+    records = [
+        {
+            "AMOUNT": float(a), "PROJECTID": int(p) + 100, "PROJECTTITLE": ARPA_PROJECTS[p],
+            "VENDOR": f"VENDOR {int(v):03d} LLC", "DATE": d.strftime("%B, %d %Y %H:%M:%S"),
+        }
+        for a, p, v, d in zip(amounts, proj, vendors, dates)
+    ]
+    with open(raw / "arpa.json", "w") as f:
+        json.dump(records, f)
+    return n
+
+
+# Source key → writer (keys match fetch_raw.py's --only names where they overlap)
+SOURCES = {
+    "neighborhoods": write_neighborhoods,
+    "tiger_tracts": write_tracts,
+    "csb": write_csb,
+    "crime": write_crime,
+    "gtfs": write_gtfs,
+    "usda": write_usda,
+    "vacancies": write_parcels,
+    "housing": write_acs,
+    "demographics": write_demographics,
+    "arpa": write_arpa,
+}
+
+
+def generate(raw: Path, scale: float = 1.0, seed: int = 0, only: list[str] | None = None,
+             verbose: bool = False) -> dict[str, int]:
+    """Write raw inputs under ``raw`` at ``scale`` × real volume; returns rows written per source.
+
+    Each source draws from its own RNG stream, so regenerating one source
+    with ``only`` reproduces exactly what a full run writes.
+    """
+    raw.mkdir(parents=True, exist_ok=True)
+    city = City(np.random.default_rng([seed, 0]))
+    manifest = {}
+    for i, (key, writer) in enumerate(SOURCES.items(), start=1):
+        if only and key not in only:
+            continue
+        t0 = time.perf_counter()
+        manifest[key] = writer(raw, city, np.random.default_rng([seed, i]), scale)
+        if verbose:
+            print(f"  → {key:<14} {manifest[key]:>12,} rows  ({time.perf_counter() - t0:.1f}s)")
+    return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic raw datasets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiple of the real data volume (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Raw directory to write (default: data/synthetic/raw)")
+    parser.add_argument("--only", type=str, help=f"Comma-separated sources. Choices: {', '.join(SOURCES)}")
+    args = parser.parse_args()
+
+    only = [s for s in args.only.split(",") if s] if args.only else None
+    unknown = [s for s in only or [] if s not in SOURCES]
+    if unknown:
+        sys.exit(f"Unknown source(s) '{', '.join(unknown)}'. Choices: {', '.join(SOURCES)}")
+
+    print("=" * 50)
+    print("  Generating synthetic raw datasets")
+    print(f"  Output: {args.out}")
+    print(f"  Scale: {args.scale:g}×   seed: {args.seed}   year: {YEAR}")
+    print("=" * 50)
+    t0 = time.perf_counter()
+    manifest = generate(args.out, args.scale, args.seed, only, verbose=True)
+    with open(args.out / "manifest.json", "w") as f:
+        json.dump({"scale": args.scale, "seed": args.seed, "year": YEAR, "rows": manifest}, f, indent=2)
+    print(f"\nDone in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
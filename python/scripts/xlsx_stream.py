@@ -0,0 +1,165 @@
+"""
+xlsx_stream.py — Stream rows out of one .xlsx worksheet without openpyxl.
+
+An .xlsx file is a zip of XML parts. ``iter_rows`` resolves the sheet's
+part from workbook.xml, loads the shared-string table, and streams the
+decompressed sheet XML in 1 MB chunks, cut at each </row>, so memory
+stays flat however many rows the sheet has. Only rows that are yielded
+are parsed as XML.
+
+``keep(value)`` is checked against one key cell of each row (the first
+column, or the column whose header contains ``key_header``) before any
+other cell is decoded, so a filter such as a FIPS prefix skips
+non-matching rows at XML-scan speed.
+
+Values are typed as openpyxl's values_only mode would give them: shared
+and inline strings as str, numbers as int when they have no '.' or
+exponent (float otherwise), booleans as bool, and error cells as their
+"#N/A"-style text. Number formats are not applied, so date cells come
+back as serial numbers. Sheets are assumed to use the default
+spreadsheetml namespace without a prefix, as Excel and openpyxl write
+them.
+"""
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator
+from xml.etree.ElementTree import fromstring, iterparse
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+XMLNS = b' xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+CHUNK = 1 << 20
+_TAG = re.compile(rb"<\w+")
+_T_ATTR = re.compile(rb'\bt="(\w+)"')
+
+
+def _sheet_part(zf: zipfile.ZipFile, sheet: str) -> str:
+    rels = {}
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, el in iterparse(f):
+            if el.tag == f"{PKG_REL_NS}Relationship":
+                rels[el.get("Id")] = el.get("Target")
+    with zf.open("xl/workbook.xml") as f:
+        for _, el in iterparse(f):
+            if el.tag == f"{NS}sheet" and el.get("name") == sheet:
+                target = rels[el.get(f"{REL_NS}id")]
+                return target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+    raise KeyError(f"Worksheet '{sheet}' not found")
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, el in iterparse(f):
+            if el.tag == f"{NS}si":
+                # Rich text splits one string across several <r><t> runs
+                strings.append("".join(t.text or "" for t in el.iter(f"{NS}t")))
+                el.clear()
+    return strings
+
+
+def _col_index(ref: str) -> int:
+    n = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _value(cell, strings: list[str]):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{NS}t"))
+    v = cell.find(f"{NS}v")
+    if v is None or v.text is None:
+        return None
+    return _typed(kind, v.text, strings)
+
+
+def _typed(kind: str, text: str, strings: list[str]):
+    if kind == "s":
+        return strings[int(text)]
+    if kind == "n":
+        return float(text) if ("." in text or "E" in text or "e" in text) else int(text)
+    if kind == "b":
+        return text == "1"
+    return text  # "str" formula results and "e" errors
+
+
+def _col_letters(i: int) -> str:
+    letters = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letters = chr(65 + r) + letters
+    return letters
+
+
+def _row_chunks(f) -> Iterator[bytes]:
+    """Raw ``<row ...>...</row>`` fragments of a sheet part, read 1 MB at a time."""
+    buf = b""
+    while chunk := f.read(CHUNK):
+        buf += chunk
+        parts = buf.split(b"</row>")
+        buf = parts.pop()
+        for part in parts:
+            yield part[part.rfind(b"<row"):] + b"</row>"
+
+
+def _parse(fragment: bytes):
+    # Fragments lose the root's default namespace declaration; put it back
+    tag_end = _TAG.match(fragment).end()
+    return fromstring(fragment[:tag_end] + XMLNS + fragment[tag_end:])
+
+
+def _key_value(m: re.Match, strings: list[str]):
+    """Value of a regex-matched key cell; plain <v> cells skip the XML parser."""
+    attrs, inner = m.group(1), m.group(2)
+    if not inner or not inner.startswith(b"<v>") or b"&" in inner:
+        return _value(_parse(m.group(0)), strings)
+    text = inner[3:inner.index(b"</v>")].decode()
+    kind = _T_ATTR.search(attrs)
+    return _typed(kind.group(1).decode() if kind else "n", text, strings)
+
+
+def iter_rows(path: Path, sheet: str, keep: Callable[[object], bool] | None = None,
+              key_header: str | None = None) -> Iterator[list]:
+    """Yield each row of ``sheet`` as a list of values, the header row first.
+
+    Data rows whose key cell fails ``keep`` are skipped without decoding
+    the rest of the row.
+    """
+    with zipfile.ZipFile(path) as zf:
+        strings = _shared_strings(zf)
+        with zf.open(_sheet_part(zf, sheet)) as f:
+            key_cell = None
+            for fragment in _row_chunks(f):
+                m = None
+                if key_cell is not None and keep is not None:
+                    m = key_cell.search(fragment)
+                    if m is not None and not keep(_key_value(m, strings)):
+                        continue
+                row = []
+                for pos, c in enumerate(_parse(fragment).iter(f"{NS}c")):
+                    i = _col_index(c.get("r")) if c.get("r") else pos
+                    if i >= len(row):
+                        row.extend([None] * (i + 1 - len(row)))
+                    row[i] = _value(c, strings)
+                if key_cell is None:
+                    names = [str(h) if h is not None else "" for h in row]
+                    key_col = next((i for i, h in enumerate(names) if key_header in h), 0) if key_header else 0
+                    letters = _col_letters(key_col).encode()
+                    # r="…" may sit anywhere among the cell's attributes
+                    key_cell = re.compile(rb'<c\b([^>]*?\br="' + letters + rb'\d+"[^>]*?)(?:/>|>(.*?)</c>)', re.S)
+                elif m is None and keep is not None:
+                    # No key cell found by the fast path (empty, or cells without r=): test the parsed row
+                    if not keep(row[key_col] if key_col < len(row) else None):
+                        continue
+                yield row
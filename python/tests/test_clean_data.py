@@ -0,0 +1,60 @@
+import pandas as pd
+
+from clean_data import _crime_schema, _drop_duplicate_incidents, _normalize_crime
+from raw_lake import read_header, read_raw_csv, schema_columns
+
+MONTHLY = """IncidentNum,DateOccur,NIBRS,Description,FelMisCit,Neighborhood,NbhdNum,Latitude,Longitude
+25-000001,04/30/2025 11:45,35A,DRUG/NARCOTIC VIOLATIONS,MISDEMEANOR,Lafayette Square,32,38.61,-90.25
+25-000002,04/04/2025 00:44,240,MOTOR VEHICLE THEFT,FELONY,Downtown,35,38.61,-90.19
+25-000002,04/04/2025 00:44,290,DESTRUCTION/DAMAGE/VANDALISM OF PROPERTY,FELONY,Downtown,35,38.61,-90.19
+25-000003,04/05/2025 10:00,13B,ASSAULT - SIMPLE,MISDEMEANOR,Downtown,35,38.61,-90.19
+25-000003,04/05/2025 10:00,13B,ASSAULT - SIMPLE,MISDEMEANOR,Downtown,35,38.61,-90.19
+,04/06/2025 09:00,13B,ASSAULT - SIMPLE,MISDEMEANOR,Downtown,35,38.61,-90.19
+"""
+
+# Bulk layout: other column names, no Description, unhyphenated numbers, zero-padded codes
+BULK = """Complaint,Date_Occur,Crime,Neighborhood,NHD_NUM,Lat,Lon
+25000001,2025-04-30 11:45:00,035A,Lafayette Square,32,38.61,-90.25
+25000002,2025-04-04 00:44:00,0240,Downtown,35,38.61,-90.19
+25000002,2025-04-05 00:44:00,0290,Downtown,35,38.61,-90.19
+25000003,2025-04-05 10:00:00,013B,Downtown,35,38.61,-90.19
+,2025-04-06 09:00:00,013B,Downtown,35,38.61,-90.19
+25000009,2025-04-07 12:00:00,0120,Downtown,35,38.61,-90.19
+"""
+
+
+def _read(path):
+    header = read_header(path)
+    schema = _crime_schema(header)
+    df = _normalize_crime(read_raw_csv(path, schema_columns(header, schema)), schema)
+    return df.assign(src=path.name)
+
+
+def test_duplicates_across_files_with_different_headers(tmp_path):
+    (tmp_path / "April2025.csv").write_text(MONTHLY)
+    (tmp_path / "bulk.csv").write_text(BULK)
+    monthly, bulk = _read(tmp_path / "April2025.csv"), _read(tmp_path / "bulk.csv")
+    # Offense text differs between the layouts, so it cannot be part of the identity
+    assert monthly["offense"].iloc[0] != bulk["offense"].iloc[0]
+
+    out = _drop_duplicate_incidents(pd.concat([monthly, bulk], ignore_index=True))
+
+    kept_bulk = out[out["src"] == "bulk.csv"]
+    # Same complaint, code and day: dropped. Different day (25000002/0290), no number, new number: kept.
+    assert kept_bulk["ts"].dt.strftime("%m-%d").tolist() == ["04-05", "04-06", "04-07"]
+    # Everything from the first file survives, including repeats inside it and the blank complaint number
+    assert (out["src"] == "April2025.csv").sum() == len(monthly)
+    assert len(out) == len(monthly) + 3
+
+
+def test_first_file_wins(tmp_path):
+    (tmp_path / "April2025.csv").write_text(MONTHLY)
+    (tmp_path / "bulk.csv").write_text(BULK)
+    monthly, bulk = _read(tmp_path / "April2025.csv"), _read(tmp_path / "bulk.csv")
+
+    out = _drop_duplicate_incidents(pd.concat([bulk, monthly], ignore_index=True))
+    assert (out["src"] == "bulk.csv").sum() == len(bulk)
+    # Dropped: 25-000001, 25-000002's 240 on 04/04 and both 25-000003 repeats on 04/05
+    kept_monthly = out[out["src"] == "April2025.csv"]
+    assert kept_monthly["offense"].tolist() == ["DESTRUCTION/DAMAGE/VANDALISM OF PROPERTY", "ASSAULT - SIMPLE"]
+    assert kept_monthly["incident_key"].tolist()[1] == 0
@@ -0,0 +1,35 @@
+import json
+
+from columnar import decode, encode
+
+VACANCIES = [
+    {"id": 1, "owner": "LRA", "zoning": "A", "score": 0.5, "tags": ["fire"], "lat": 38.6},
+    {"id": 2, "owner": "PRIVATE", "zoning": None, "score": None, "tags": [], "lat": 38.7},
+    {"id": 3, "owner": "LRA", "zoning": "B", "score": 1, "tags": ["fire", "open"], "lat": None},
+]
+
+
+def _through_json(doc: dict) -> dict:
+    # The frontend reads the document after a JSON round trip
+    return json.loads(json.dumps(doc, separators=(",", ":")))
+
+
+def test_records_round_trip_with_dictionaries():
+    doc = encode(VACANCIES, dictionary=("owner", "zoning", "missing"))
+    assert doc["columns"] == list(VACANCIES[0])
+    assert doc["data"]["owner"] == [0, 1, 0]
+    assert doc["dictionaries"] == {"owner": ["LRA", "PRIVATE"], "zoning": ["A", None, "B"]}
+    assert decode(_through_json(doc)) == VACANCIES
+
+
+def test_mapping_round_trip():
+    stops = {"101": {"trips": 12, "routes": ["1", "4"]}, "7": {"trips": 0, "routes": []}}
+    doc = encode(stops, key="stop_id")
+    assert doc["key"] == "stop_id"
+    assert doc["data"]["stop_id"] == ["101", "7"]
+    assert decode(_through_json(doc)) == stops
+
+
+def test_empty_inputs():
+    assert decode(encode([])) == []
+    assert decode(encode({}, key="stop_id")) == {}
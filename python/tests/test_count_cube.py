@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import count_cube
+
+DIMS = {"neighborhood": ["01", "02", "03"], "month": ["2025-01", "2025-02"], "category": ["a", "b", "c", "d"]}
+SHAPE = tuple(len(v) for v in DIMS.values())
+
+
+@pytest.mark.parametrize(("fill", "layout"), [(0.9, "dense"), (0.1, "sparse")])
+@pytest.mark.parametrize("peak", [200, 60_000, 5_000_000])
+def test_round_trip(tmp_path, fill, layout, peak):
+    rng = np.random.default_rng(peak)
+    cube = rng.integers(1, peak, size=SHAPE) * (rng.random(SHAPE) < fill)
+    cube.flat[0] = peak
+    path = tmp_path / "cube.json"
+
+    size = count_cube.write(path, DIMS, cube, year=2025)
+    header, back = count_cube.read(path)
+
+    assert header["layout"] == layout
+    assert header["year"] == 2025
+    assert header["total"] == cube.sum()
+    assert header["nonZero"] == np.count_nonzero(cube)
+    assert [d["labels"] for d in header["dims"]] == list(DIMS.values())
+    assert size == path.with_suffix(".bin").stat().st_size
+    np.testing.assert_array_equal(back, cube)
+
+
+def test_empty_cube_round_trips(tmp_path):
+    path = tmp_path / "cube.json"
+    count_cube.write(path, DIMS, np.zeros(SHAPE, dtype=np.int64))
+    header, back = count_cube.read(path)
+    assert header["total"] == 0
+    np.testing.assert_array_equal(back, np.zeros(SHAPE))
+
+
+def test_build_drops_missing_codes():
+    hood, hood_labels = count_cube.factorize(["02", "01", None, "02"])
+    how = count_cube.hour_of_week(pd.Series(pd.to_datetime(["2025-01-06 00:30", "2025-01-12 23:00", None, None])))
+    assert hood_labels == ["01", "02"]
+    assert how.tolist() == [0, 167, -1, -1]
+
+    cube, dropped = count_cube.build([hood, how], (len(hood_labels), 168))
+    assert dropped == 2
+    assert cube[1, 0] == 1 and cube[0, 167] == 1 and cube.sum() == 2
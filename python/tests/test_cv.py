@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cv import cross_validate
+from panel_fe import ENTITY_COL, TARGET, TIME_COL
+
+FEATURES = ["x1", "x2", "month_num"]
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rng = np.random.default_rng(0)
+    months = [f"{2021 + m // 12}-{m % 12 + 1:02d}" for m in range(30)]
+    df = pd.DataFrame([(f"{e:02d}", m) for e in range(1, 21) for m in months], columns=[ENTITY_COL, TIME_COL])
+    df["month_num"] = df[TIME_COL].str[5:].astype(int)
+    df["x1"] = rng.normal(size=len(df))
+    df["x2"] = rng.normal(size=len(df)) + df[ENTITY_COL].astype(int) / 10
+    df[TARGET] = 1 + 2 * df["x1"] - df["x2"] + 0.1 * df["month_num"] + rng.normal(size=len(df))
+    return df.sample(frac=1, random_state=1).reset_index(drop=True)  # row order must not matter
+
+
+def _lstsq_metrics(train: pd.DataFrame, test: pd.DataFrame) -> dict:
+    def design(d):
+        return np.column_stack([np.ones(len(d)), d[FEATURES].to_numpy(dtype=float)])
+
+    beta = np.linalg.lstsq(design(train), train[TARGET].to_numpy(), rcond=None)[0]
+    resid = test[TARGET].to_numpy() - design(test) @ beta
+    y = test[TARGET].to_numpy()
+    return {
+        "n_train": len(train), "n_test": len(test),
+        "rmse": np.sqrt((resid ** 2).mean()), "mae": np.abs(resid).mean(),
+        "r2": 1 - (resid @ resid) / ((y - y.mean()) ** 2).sum(),
+    }
+
+
+def test_folds_match_direct_lstsq(panel):
+    table = cross_validate(panel, FEATURES, TARGET, min_train=12, horizon=2, step=5, n_blocks=4, workers=1)
+    months = sorted(panel[TIME_COL].unique())
+    entities = sorted(panel[ENTITY_COL].unique())
+
+    rolling = table[table["kind"] == "rolling"].reset_index(drop=True)
+    assert len(rolling) == 4
+    for i, row in rolling.iterrows():
+        origin = 11 + 5 * i
+        train = panel[panel[TIME_COL] <= months[origin]]
+        test = panel[panel[TIME_COL].isin(months[origin + 1:origin + 3])]
+        assert row[list(_lstsq_metrics(train, test))].to_dict() == pytest.approx(_lstsq_metrics(train, test))
+        assert not row["ridge"]
+
+    spatial = table[table["kind"] == "spatial"].reset_index(drop=True)
+    for row, block in zip(spatial.itertuples(), np.array_split(np.array(entities), 4)):
+        held = panel[ENTITY_COL].isin(block)
+        expected = _lstsq_metrics(panel[~held], panel[held])
+        assert {k: getattr(row, k) for k in expected} == pytest.approx(expected)
+
+
+def test_singular_fold_is_flagged(panel):
+    # One training month: month_num is collinear with the intercept
+    table = cross_validate(panel, FEATURES, TARGET, min_train=1, horizon=1, step=1, n_blocks=0, workers=1)
+    assert table["ridge"].iloc[0]
+    assert not table["ridge"].iloc[1:].any()
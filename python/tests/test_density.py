@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import density
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16])
+def test_round_trip_within_half_a_step(tmp_path, dtype):
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(38.55, 38.75, 5_000)
+    lng = rng.uniform(-90.32, -90.18, 5_000)
+    everything = np.arange(len(lat))
+    stack, grid = density.build(lat, lng, [everything, everything[::7], everything[:0]])
+    path = tmp_path / "surface.json"
+
+    density.write(path, stack, grid, [{"key": k} for k in ("all", "some", "none")], dtype=dtype)
+    header, back = density.read(path)
+
+    top = np.iinfo(dtype).max
+    for layer, surface, original in zip(header["layers"], back, stack):
+        assert layer["max"] == original.max()  # not rounded
+        # Half a quantisation step, plus float32 rounding in the rescale
+        step = original.max() / top
+        np.testing.assert_allclose(surface, original, rtol=0, atol=0.5 * step + 4 * np.finfo(np.float32).eps * original.max())
+    assert not back[2].any()
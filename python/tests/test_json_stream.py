@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from json_stream import feature_collection, write_json
+
+DOCS = [
+    {},
+    [],
+    {"a": 1, "b": [1.5, -0.0, 1e-7, 3e300, None, True, False], "c": {"d": {"e": []}}},
+    {"unicode": "Café – “quotes” ☃ \U0001f600", "esc": "tab\tnew\nline\\\"", 1: "int key", 2.5: "x",
+     None: "null", True: "t"},
+    [{"lat": 38.627003, "lng": -90.199402, "tags": ["a", "b"]}] * 50,
+    {"nan": float("nan"), "inf": [float("inf"), float("-inf")]},
+]
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_bytes_match_json_dump(tmp_path, doc):
+    path = tmp_path / "out.json"
+    size = write_json(path, doc)
+    expected = json.dumps(doc, separators=(",", ":")).encode()
+    assert path.read_bytes() == expected
+    assert size == len(expected)
+
+
+def test_generators_stream_as_arrays(tmp_path):
+    features = [{"type": "Feature", "properties": {"i": i}, "geometry": None} for i in range(10)]
+    path = tmp_path / "fc.json"
+    write_json(path, {"meta": {"n": 10}, "fc": feature_collection(f for f in features), "rows": (r for r in [])})
+    expected = {"meta": {"n": 10}, "fc": {"type": "FeatureCollection", "features": features}, "rows": []}
+    assert path.read_bytes() == json.dumps(expected, separators=(",", ":")).encode()
+
+
+def test_precision_rounds_only_named_keys(tmp_path):
+    path = tmp_path / "p.json"
+    write_json(path, {"coords": [[1.23456789, 2.3456789]], "other": 1.23456789}, precision={"coords": 3})
+    assert json.loads(path.read_text()) == {"coords": [[1.235, 2.346]], "other": 1.23456789}
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("[1]")
+
+    def rows():
+        yield 1
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        write_json(path, rows())
+    assert path.read_text() == "[1]"
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel_fe import ENTITY_COL, TARGET, TIME_COL, fit_panel_fe, within_transform
+
+FEATURES = ["x1", "x2"]
+
+
+def _panel(n_entities: int = 12, n_periods: int = 9, drop: int = 0, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    entity, period = np.meshgrid(np.arange(n_entities), np.arange(n_periods), indexing="ij")
+    df = pd.DataFrame({ENTITY_COL: entity.ravel().astype(str), TIME_COL: period.ravel()})
+    alpha = rng.normal(0, 5, n_entities)[entity.ravel()]
+    gamma = rng.normal(0, 3, n_periods)[period.ravel()]
+    df["x1"] = rng.normal(size=len(df)) + 0.5 * alpha
+    df["x2"] = rng.normal(size=len(df)) - 0.2 * gamma
+    df["constant_in_entity"] = alpha
+    df[TARGET] = 1.5 * df["x1"] - 0.7 * df["x2"] + alpha + gamma + rng.normal(0, 0.5, len(df))
+    if drop:
+        df = df.drop(index=rng.choice(len(df), drop, replace=False))
+    return df.reset_index(drop=True)
+
+
+def _codes(df):
+    return pd.factorize(df[ENTITY_COL], sort=True)[0], pd.factorize(df[TIME_COL], sort=True)[0]
+
+
+def test_balanced_two_way_matches_double_demeaning():
+    df = _panel()
+    cols = [TARGET] + FEATURES
+    # y_it - ȳ_i - ȳ_t + ȳ on a balanced panel
+    by_entity = df.groupby(ENTITY_COL)[cols].transform("mean")
+    by_period = df.groupby(TIME_COL)[cols].transform("mean")
+    manual = (df[cols] - by_entity - by_period + df[cols].mean()).to_numpy()
+
+    entity, period = _codes(df)
+    np.testing.assert_allclose(within_transform(df[cols].to_numpy(), entity, period), manual, atol=1e-9)
+
+    beta = np.linalg.lstsq(manual[:, 1:], manual[:, 0], rcond=None)[0]
+    result = fit_panel_fe(df, FEATURES, effects="two-way", replicates=20)
+    for name, b in zip(FEATURES, beta):
+        assert result["coefficients"][name]["coef"] == pytest.approx(b, rel=1e-8)
+
+
+@pytest.mark.parametrize("effects", ["two-way", "entity", "time"])
+def test_unbalanced_matches_dummy_regression(effects):
+    df = _panel(drop=20)
+    entity, period = _codes(df)
+    dummies = []
+    if effects in ("two-way", "entity"):
+        dummies.append(np.eye(entity.max() + 1)[entity])
+    if effects in ("two-way", "time"):
+        block = np.eye(period.max() + 1)[period]
+        dummies.append(block[:, 1:] if dummies else block)
+    X = np.column_stack([df[FEATURES].to_numpy(), *dummies])
+    beta = np.linalg.lstsq(X, df[TARGET].to_numpy(), rcond=None)[0][:len(FEATURES)]
+
+    result = fit_panel_fe(df, FEATURES, effects=effects, replicates=20)
+    assert result["nObs"] == len(df)
+    for name, b in zip(FEATURES, beta):
+        assert result["coefficients"][name]["coef"] == pytest.approx(b, rel=1e-6)
+
+
+def test_absorbed_regressor_is_reported_and_dropped():
+    df = _panel()
+    result = fit_panel_fe(df, FEATURES + ["constant_in_entity"], effects="two-way", replicates=20)
+    assert result["absorbed"] == ["constant_in_entity"]
+    assert list(result["coefficients"]) == FEATURES
+
+    with pytest.raises(SystemExit, match="--effects time"):
+        fit_panel_fe(df, ["constant_in_entity"], effects="two-way", replicates=20)
+
+
+def test_bootstrap_is_seeded():
+    df = _panel()
+    a = fit_panel_fe(df, FEATURES, replicates=50, seed=7)
+    b = fit_panel_fe(df, FEATURES, replicates=50, seed=7)
+    assert a["coefficients"] == b["coefficients"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from ols import ALL_FEATURES, TARGET, export_model, load_split
+from predict import load_model, predict_baseline, predict_scenarios
+
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    train, test = load_split("crosssectional_train"), load_split("crosssectional_test")
+    ols = sm.OLS(train[TARGET], sm.add_constant(train[ALL_FEATURES])).fit()
+    path = tmp_path_factory.mktemp("model") / "ols_model.json"
+    export_model(ols, train, test, path)
+    return ols, load_model(path)
+
+
+def _statsmodels_predict(ols, rows: np.ndarray) -> np.ndarray:
+    return ols.predict(sm.add_constant(pd.DataFrame(rows, columns=ALL_FEATURES), has_constant="add")).to_numpy()
+
+
+def test_baseline_matches_statsmodels(fitted):
+    ols, model = fitted
+    baseline = model["neighborhoods"]["baseline"]
+    np.testing.assert_allclose(predict_baseline(model), _statsmodels_predict(ols, baseline), rtol=1e-10)
+
+
+def test_scenarios_match_statsmodels(fitted):
+    ols, model = fitted
+    baseline = model["neighborhoods"]["baseline"]
+    rng = np.random.default_rng(0)
+    city = rng.integers(-50, 51, size=(4, len(model["interventions"]))).astype(float)
+    per_hood = rng.integers(-10, 11, size=(3, len(baseline), len(model["interventions"]))).astype(float)
+
+    for deltas in (city, per_hood):
+        got = predict_scenarios(model, deltas, floor=None)
+        for s in range(len(deltas)):
+            rows = baseline.copy()
+            rows[:, model["interventionIndex"]] += deltas[s]
+            np.testing.assert_allclose(got[s], _statsmodels_predict(ols, rows), rtol=1e-10)
+
+
+def test_floor_clips_predictions(fitted):
+    _, model = fitted
+    deltas = np.zeros((1, len(model["interventions"])))
+    deltas[0, 0] = -1e9 * np.sign(model["coefficients"][model["interventionIndex"][0]])
+    assert (predict_scenarios(model, deltas) == 0).all()
+    with pytest.raises(ValueError):
+        predict_scenarios(model, np.zeros(3))
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from quantile_sketch import TDigest
+
+QUANTILES = (0.01, 0.1, 0.5, 0.9, 0.99, 0.999)
+
+
+def rank_error(values: np.ndarray, estimate: float, q: float) -> float:
+    """Distance from ``q`` to the ranks ``estimate`` occupies (an interval when values tie)."""
+    below, at_or_below = (values < estimate).mean(), (values <= estimate).mean()
+    return max(0.0, below - q, q - at_or_below)
+
+
+def max_rank_error(q: float) -> float:
+    # Looser in the middle, where t-digest trades accuracy for fewer centroids
+    return 0.005 if 0.05 < q < 0.95 else 0.001
+
+
+@pytest.fixture(scope="module")
+def values():
+    return np.random.default_rng(0).lognormal(2.0, 1.2, 200_000)
+
+
+def test_rank_error_single(values):
+    digest = TDigest.from_values(values)
+    for q in QUANTILES:
+        assert rank_error(values, digest.quantile(q), q) < max_rank_error(q), q
+    assert len(digest.means) <= digest.compression
+    assert digest.count == len(values)
+    assert digest.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert (digest.quantile(0), digest.quantile(1)) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("how", ["merge", "merge_all"])
+def test_rank_error_merged(values, how):
+    parts = [TDigest.from_dict(TDigest.from_values(p).to_dict()) for p in np.array_split(values, 7)]
+    if how == "merge":
+        digest = TDigest()
+        for part in parts:
+            digest.merge(part)
+    else:
+        digest = TDigest.merge_all(parts)
+    for q in QUANTILES:
+        assert rank_error(values, digest.quantile(q), q) < max_rank_error(q), q
+    assert digest.count == len(values)
+    assert digest.mean == pytest.approx(values.mean(), rel=1e-12)
+
+
+def test_rank_error_one_at_a_time():
+    values = np.random.default_rng(1).exponential(9.0, 20_000)
+    digest = TDigest()
+    for v in values:
+        digest.add(float(v))
+    for q in QUANTILES:
+        assert rank_error(values, digest.quantile(q), q) < max_rank_error(q), q
+
+
+def test_tied_integer_values():
+    values = np.floor(np.random.default_rng(2).exponential(9.0, 100_000))
+    digest = TDigest.from_values(values)
+    for q in QUANTILES:
+        # Interpolating between centroids lands between two tied runs, off by up to half a run's mass
+        assert rank_error(values, digest.quantile(q), q) < 0.02, q
+
+
+def test_small_and_empty():
+    assert math.isnan(TDigest().quantile(0.5))
+    assert math.isnan(TDigest().mean)
+    assert TDigest.from_values([4.0]).summary() == {"n": 1, "mean": 4.0, "p50": 4.0, "p90": 4.0, "p99": 4.0}
@@ -0,0 +1,74 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+import raw_lake
+from clean_data import _csb_schema, _normalize_csb
+
+# The bulk export's layout
+BULK = """DATETIMEINIT,PROBLEMCODE,STATUS,NEIGHBORHOOD,LATITUDE,LONGITUDE,DATETIMECLOSED
+2024-12-30 08:00:00,POTHOLE,CLOSED,17,38.60,-90.25,2025-01-02 09:00:00
+2025-01-05 10:30:00,TRASH,OPEN,35,38.62,-90.19,
+"""
+
+# A monthly export: reordered, renamed, US dates and an extra column that must not be read
+MONTHLY = """Longitude,Notes,Neighborhood Name,Date Requested,Problem Category,Status,Latitude,Close Date
+-90.21,"free text, with a comma",44,01/07/2025 14:15,GRAFFITI,CLOSED,38.64,01/09/2025 16:00
+-90.30,,,02/01/2025,TRASH,OPEN,38.58,
+"""
+
+COLUMNS = ["ts", "closed_ts", "category", "status", "hood", "lat", "lng"]
+
+
+def _sync(lake, raw, files):
+    return raw_lake.sync(lake, raw, files, _csb_schema, _normalize_csb)
+
+
+def test_each_file_is_read_through_its_own_header(tmp_path):
+    raw, lake = tmp_path / "raw", tmp_path / "lake"
+    raw.mkdir()
+    (raw / "bulk.csv").write_text(BULK)
+    (raw / "monthly.csv").write_text(MONTHLY)
+    files = [raw / "bulk.csv", raw / "monthly.csv"]
+
+    assert _csb_schema(raw_lake.read_header(files[1])) == {
+        "date": "Date Requested", "category": "Problem Category", "status": "Status",
+        "hood": "Neighborhood Name", "lat": "Latitude", "lng": "Longitude",
+        "srx": None, "sry": None, "closed": "Close Date",
+    }
+    assert _sync(lake, raw, files)["rows"] == 4
+
+    df = raw_lake.scan(lake, COLUMNS, files, raw)
+    assert df["src"].astype(str).tolist() == ["bulk.csv", "bulk.csv", "monthly.csv", "monthly.csv"]
+    assert df["ts"].tolist() == [pd.Timestamp(t) for t in
+                                 ("2024-12-30 08:00", "2025-01-05 10:30", "2025-01-07 14:15", "2025-02-01")]
+    assert df["closed_ts"].iloc[2] == pd.Timestamp("2025-01-09 16:00")
+    assert df["closed_ts"].iloc[[1, 3]].isna().all()
+    assert df["category"].astype(str).tolist() == ["POTHOLE", "TRASH", "GRAFFITI", "TRASH"]
+    assert df["status"].astype(str).tolist() == ["CLOSED", "OPEN", "CLOSED", "OPEN"]
+    assert df["hood"].astype(str).tolist() == ["17", "35", "44", ""]
+    assert df["lat"].tolist() == [38.60, 38.62, 38.64, 38.58]
+    assert df["lng"].tolist() == [-90.25, -90.19, -90.21, -90.30]
+
+    # A date range only returns rows from the matching partitions
+    january = raw_lake.scan(lake, ["ts", "category"], files, raw, start=date(2025, 1, 1), end=date(2025, 2, 1))
+    assert january["category"].astype(str).tolist() == ["TRASH", "GRAFFITI"]
+
+
+def test_changed_header_is_remapped_on_resync(tmp_path):
+    raw, lake = tmp_path / "raw", tmp_path / "lake"
+    raw.mkdir()
+    path = raw / "monthly.csv"
+    path.write_text(BULK)
+    _sync(lake, raw, [path])
+
+    # Same file name, new layout: re-ingested through the new header's mapping
+    path.write_text(MONTHLY)
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000_000))
+    stats = _sync(lake, raw, [path])
+    assert (stats["ingested"], stats["rows"]) == (1, 2)
+
+    df = raw_lake.scan(lake, COLUMNS, [path], raw)
+    assert df["category"].astype(str).tolist() == ["GRAFFITI", "TRASH"]
+    assert df["lng"].tolist() == [-90.21, -90.30]
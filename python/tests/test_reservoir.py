@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from reservoir import StratifiedReservoir
+
+CAPACITY = 500
+
+
+@pytest.fixture(scope="module")
+def stream():
+    rng = np.random.default_rng(0)
+    # Skewed strata: a few huge, many tiny
+    strata = rng.zipf(1.6, 20_000) % 40
+    return strata, np.arange(len(strata)) * 3
+
+
+def _sample(strata, items, seed=0, batch=1 << 16, how="many"):
+    sampler = StratifiedReservoir(CAPACITY, seed=seed, batch=batch)
+    if how == "many":
+        sampler.offer_many(strata, items)
+    else:
+        for s, i in zip(strata.tolist(), items.tolist()):
+            sampler.offer(s, i)
+    return sampler.sample()
+
+
+def test_fixed_seed_is_deterministic(stream):
+    a_items, a_weights = _sample(*stream, seed=42)
+    b_items, b_weights = _sample(*stream, seed=42)
+    np.testing.assert_array_equal(a_items, b_items)
+    assert a_weights == b_weights
+
+    c_items, _ = _sample(*stream, seed=43)
+    assert not np.array_equal(a_items, c_items)
+
+
+@pytest.mark.parametrize(("batch", "how"), [(1 << 16, "one"), (1000, "many"), (1000, "one"), (7, "many")])
+def test_batching_does_not_change_the_sample(stream, batch, how):
+    expected, expected_weights = _sample(*stream, seed=42)
+    items, weights = _sample(*stream, seed=42, batch=batch, how=how)
+    np.testing.assert_array_equal(items, expected)
+    assert weights == pytest.approx(expected_weights)
+
+
+def test_quota_and_weights(stream):
+    strata, items = stream
+    kept, weights = _sample(strata, items)
+    assert len(kept) <= CAPACITY
+    assert np.all(np.diff(kept) > 0)  # arrival order
+
+    seen = dict(zip(*np.unique(strata, return_counts=True)))
+    kept_strata = strata[kept // 3]
+    kept_per = dict(zip(*np.unique(kept_strata, return_counts=True)))
+    quota = max(kept_per.values())
+    assert sum(min(n, quota + 1) for n in seen.values()) > CAPACITY  # the largest level that fits
+    for s, n in seen.items():
+        assert kept_per[s] == min(n, quota)
+        assert weights[s] == pytest.approx(n / kept_per[s])
+
+
+def test_under_capacity_keeps_everything():
+    strata = np.array([3, 1, 3, 2])
+    items, weights = _sample(strata, np.arange(4))
+    np.testing.assert_array_equal(items, np.arange(4))
+    assert weights == {1: 1.0, 2: 1.0, 3: 1.0}
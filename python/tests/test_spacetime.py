@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import spacetime
+from spacetime import SpaceTimeIndex, brute_force
+
+
+def _points(rng, n):
+    centres = rng.uniform(0, 5_000, size=(20, 2))
+    xy = centres[rng.integers(len(centres), size=n)] + rng.normal(0, 300, size=(n, 2))
+    return xy[:, 0], xy[:, 1], rng.uniform(0, 120, n)
+
+
+def _pairs(q, e) -> set:
+    return set(zip(q.tolist(), e.tolist()))
+
+
+@pytest.mark.parametrize(("cell_m", "bucket_days", "radius", "window"), [
+    (200, 30, 200, (0, 30)),
+    (200, 30, 200, (-30, 0)),
+    (50, 7, 200, (-10, 45)),  # radius spans several cells, window several buckets
+    (500, 30, 120, None),
+])
+def test_join_matches_brute_force(cell_m, bucket_days, radius, window):
+    rng = np.random.default_rng(0)
+    ex, ey, eday = _points(rng, 5_000)
+    qx, qy, qday = _points(rng, 400)
+    index = SpaceTimeIndex(ex, ey, eday, cell_m=cell_m, bucket_days=bucket_days)
+
+    q, e = index.join(qx, qy, qday, radius, window)
+    bq, be = brute_force(ex, ey, eday, qx, qy, qday, radius, window)
+    assert len(bq) > 0
+    assert _pairs(q, e) == _pairs(bq, be)
+    assert len(q) == len(bq)  # no pair twice
+    assert np.all(np.diff(q) >= 0)
+    np.testing.assert_array_equal(index.count(qx, qy, qday, radius, window), np.bincount(bq, minlength=len(qx)))
+
+
+def test_query_chunks_and_out_of_extent(monkeypatch):
+    monkeypatch.setattr(spacetime, "QUERY_CHUNK", 7)
+    rng = np.random.default_rng(1)
+    ex, ey, eday = _points(rng, 1_000)
+    qx, qy, qday = _points(rng, 50)
+    # The last query lies outside the indexed extent in space and time
+    qx, qy, qday = np.r_[qx, -10_000.0], np.r_[qy, 0.0], np.r_[qday, -500.0]
+    index = SpaceTimeIndex(ex, ey, eday, cell_m=100, bucket_days=10)
+
+    q, e = index.join(qx, qy, qday, 150, (0, 20))
+    bq, be = brute_force(ex, ey, eday, qx, qy, qday, 150, (0, 20))
+    assert _pairs(q, e) == _pairs(bq, be)
+    assert len(qx) - 1 not in set(q.tolist())
+
+
+def test_empty_inputs():
+    index = SpaceTimeIndex([], [], [], cell_m=100, bucket_days=10)
+    q, e = index.join([1.0], [1.0], [1.0], 100, (0, 10))
+    assert len(q) == len(e) == 0
+    full = SpaceTimeIndex([0.0], [0.0], [0.0], cell_m=100, bucket_days=10)
+    assert len(full.join([], [], [], 100)[0]) == 0
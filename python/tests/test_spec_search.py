@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from ols import TARGET
+from spec_search import build_problem, exhaustive_specs, run_search
+
+COLUMNS = ["a", "b", "c", "d", "e"]
+
+
+def _frame(rng, n: int) -> pd.DataFrame:
+    df = pd.DataFrame(rng.normal(size=(n, len(COLUMNS))) * [1, 10, 1e3, 0.01, 1], columns=COLUMNS)
+    df[TARGET] = 2 + df["a"] - 0.3 * df["b"] + 1e-3 * df["c"] + rng.normal(size=n)
+    return df
+
+
+@pytest.fixture
+def split():
+    rng = np.random.default_rng(0)
+    return _frame(rng, 200), _frame(rng, 80)
+
+
+def test_every_spec_matches_statsmodels(split):
+    train, test = split
+    specs = exhaustive_specs(n_required=1, n_pool=len(COLUMNS) - 1)
+    results = run_search(specs, build_problem(train, test, COLUMNS), workers=1)
+    assert len(results) == 2 ** (len(COLUMNS) - 1)
+
+    for spec, train_r2, test_r2, test_mae in results:
+        cols = [COLUMNS[i - 1] for i in spec[1:]]
+        model = sm.OLS(train[TARGET], sm.add_constant(train[cols])).fit()
+        pred = model.predict(sm.add_constant(test[cols], has_constant="add"))
+        assert train_r2 == pytest.approx(model.rsquared, abs=1e-9)
+        assert test_r2 == pytest.approx(r2_score(test[TARGET], pred), abs=1e-9)
+        assert test_mae == pytest.approx(mean_absolute_error(test[TARGET], pred), rel=1e-9)
+
+
+def test_collinear_spec_is_nan(split):
+    train, test = split
+    train, test = train.assign(e=2 * train["a"]), test.assign(e=2 * test["a"])
+    results = dict((r[0], r[1:]) for r in run_search(
+        [(0, 1), (0, 1, 2), (0, 1, 5), (0, 2, 5)], build_problem(train, test, COLUMNS), workers=1,
+    ))
+    assert np.isnan(results[(0, 1, 5)]).all()
+    assert not np.isnan(results[(0, 1, 2)]).any()
+    assert not np.isnan(results[(0, 2, 5)]).any()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from ols import ALL_FEATURES, TARGET, export_model
+from predict import load_model
+from uncertainty import predictive_bands
+
+N_TRAIN, N_HOODS = 400, 60
+TRUE_SIGMA = 2.0
+
+
+def _frame(rng, n: int, beta: np.ndarray) -> pd.DataFrame:
+    df = pd.DataFrame(rng.normal(size=(n, len(ALL_FEATURES))), columns=ALL_FEATURES)
+    df[TARGET] = 3.0 + df[ALL_FEATURES].to_numpy() @ beta + rng.normal(0, TRUE_SIGMA, n)
+    df["neighborhood_id"] = [f"{i:03d}" for i in range(n)]
+    df["neighborhood_name"] = df["neighborhood_id"]
+    return df
+
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    beta = rng.normal(size=len(ALL_FEATURES))
+    train, test = _frame(rng, N_TRAIN, beta), _frame(rng, N_HOODS, beta)
+    ols = sm.OLS(train[TARGET], sm.add_constant(train[ALL_FEATURES])).fit()
+    path = tmp_path_factory.mktemp("model") / "ols_model.json"
+    export_model(ols, train.iloc[:0], test, path)  # neighborhoods = the test rows
+    return ols, load_model(path), beta
+
+
+@pytest.mark.parametrize("noise", [True, False])
+def test_bands_match_closed_form_interval(fitted, noise):
+    ols, model, _ = fitted
+    deltas = np.array([[0.0] * len(model["interventions"]), [1.5, -2.0, 0.5]])
+    result = predictive_bands(model, deltas, n_draws=40_000, bands=(5.0, 50.0, 95.0), noise=noise, seed=1, floor=None)
+
+    for s, d in enumerate(deltas):
+        rows = model["neighborhoods"]["baseline"].copy()
+        rows[:, model["interventionIndex"]] += d
+        pred = ols.get_prediction(sm.add_constant(pd.DataFrame(rows, columns=ALL_FEATURES), has_constant="add"))
+        lo, hi = pred.conf_int(obs=noise, alpha=0.10).T
+        half = (hi - lo) / 2
+        # The MC draws are normal; the closed form uses t with ~390 df, 0.3% wider
+        np.testing.assert_allclose(result["bands"][s, :, 0], lo, atol=0.03 * half.max())
+        np.testing.assert_allclose(result["bands"][s, :, 2], hi, atol=0.03 * half.max())
+        np.testing.assert_allclose(result["bands"][s, :, 1], pred.predicted_mean, atol=0.02 * half.max())
+
+
+def test_predictive_band_coverage(fitted):
+    _, model, beta = fitted
+    result = predictive_bands(model, np.zeros((1, len(model["interventions"]))), n_draws=20_000,
+                              bands=(5.0, 95.0), seed=2, floor=None)
+    lo, hi = result["bands"][0].T
+    # Fresh outcomes from the true process at each neighborhood's features
+    rng = np.random.default_rng(3)
+    truth = 3.0 + model["neighborhoods"]["baseline"] @ beta
+    outcomes = truth + rng.normal(0, TRUE_SIGMA, size=(5_000, N_HOODS))
+    coverage = ((outcomes >= lo) & (outcomes <= hi)).mean()
+    assert coverage == pytest.approx(0.90, abs=0.03)
+
+
+def test_seed_reproducible_across_chunk_sizes(fitted):
+    _, model, _ = fitted
+    deltas = np.random.default_rng(4).integers(-5, 6, size=(7, len(model["interventions"]))).astype(float)
+    whole = predictive_bands(model, deltas, n_draws=500, seed=9)
+    n_hoods = len(model["neighborhoods"]["ids"])
+    for max_block in (500 * n_hoods, 3 * 500 * n_hoods):  # 1 and 3 scenarios per chunk
+        chunked = predictive_bands(model, deltas, n_draws=500, seed=9, max_block=max_block)
+        # Same draws; only BLAS rounding differs with the block shape
+        np.testing.assert_allclose(chunked["bands"], whole["bands"], rtol=1e-12)
+        np.testing.assert_allclose(chunked["mean"], whole["mean"], rtol=1e-12)
+
+    other = predictive_bands(model, deltas, n_draws=500, seed=10)
+    assert not np.array_equal(other["bands"], whole["bands"])
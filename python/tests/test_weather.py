@@ -0,0 +1,57 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import clean_data
+
+YEAR = 2023
+HOLES = {"2023-02-10", "2023-02-11", "2023-07-04"}  # days the archive never returns
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    calls = []
+
+    def fetch(start, end):
+        calls.append((start, end))
+        day, last, out = date.fromisoformat(start), date.fromisoformat(end), {}
+        while day <= last:
+            if day.isoformat() not in HOLES:
+                out[day.isoformat()] = {"high": 80.0, "low": 60.0, "precip": 0}
+            day += timedelta(days=1)
+        return out
+
+    monkeypatch.setattr(clean_data, "WEATHER_DIR", tmp_path)
+    monkeypatch.setattr(clean_data, "fetch_weather", fetch)
+    monkeypatch.setattr(clean_data, "requests", object())
+    return calls
+
+
+def test_closed_year_with_holes_is_not_refetched(archive, tmp_path):
+    first = clean_data.load_weather([YEAR])
+    assert archive == [("2023-01-01", "2023-12-31")]
+    assert len(first) == 365 - len(HOLES)
+
+    cached = json.loads((tmp_path / f"weather_{YEAR}.json").read_text())
+    assert cached["closed"]
+    assert cached["missing"] == sorted(HOLES)
+
+    assert clean_data.load_weather([YEAR]) == first
+    assert len(archive) == 1
+
+
+def test_failed_fetch_leaves_year_open(archive, tmp_path, monkeypatch):
+    fetch = clean_data.fetch_weather
+
+    def down(start, end):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(clean_data, "fetch_weather", down)
+    assert clean_data.load_weather([YEAR]) == {}
+    assert not (tmp_path / f"weather_{YEAR}.json").exists()
+
+    # The next run with the archive back up requests the year again
+    monkeypatch.setattr(clean_data, "fetch_weather", fetch)
+    assert len(clean_data.load_weather([YEAR])) == 365 - len(HOLES)
+    assert archive == [("2023-01-01", "2023-12-31")]
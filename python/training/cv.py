@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+cv.py — Rolling-origin and spatial-block cross-validation on panel_full.csv.
+
+Rolling-origin folds train on every month up to an origin and test on the
+next --horizon months. Spatial-block folds hold out a contiguous block of
+neighborhoods (by NHD number, which runs geographically across the city)
+over the full period.
+
+Nothing is refit from scratch. Each month's contribution to the normal
+equations (X'X, X'y) is computed once and accumulated with np.cumsum, so a
+rolling origin reads its normal equations straight from the running sum;
+a spatial block is the full-panel sum minus the block's own contribution.
+Every fold solves its p × p system with a Cholesky factorization, so the
+cost per fold is independent of the training-set size. A fold whose X'X
+is singular (e.g. month_num is constant until a second month is in the
+window) is solved with a small ridge instead; it is flagged in the
+``ridge`` column and reported, since its error is not plain OLS. Folds
+run in a process pool.
+
+Usage:
+  cd python/
+  uv run python training/cv.py
+  uv run python training/cv.py --min-train 24 --horizon 3 --blocks 8 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ols import TRAINING_DIR, load_split  # noqa: E402
+from panel_fe import ENTITY_COL, PANEL_FEATURES, TARGET, TIME_COL  # noqa: E402
+
+RIDGE_EPS = 1e-9  # relative diagonal jitter when a fold's X'X is singular
+
+_STATE: dict = {}
+
+
+def _init_worker(X, y, month, entity, gram_cum, xy_cum, gram_e, xy_e) -> None:
+    _STATE.update(X=X, y=y, month=month, entity=entity, gram_cum=gram_cum, xy_cum=xy_cum,
+                  gram_e=gram_e, xy_e=xy_e, gram_all=gram_cum[-1], xy_all=xy_cum[-1])
+
+
+def _solve_normal(gram: np.ndarray, xy: np.ndarray) -> tuple[np.ndarray, bool]:
+    """(beta, whether the ridge fallback was needed) for gram · beta = xy."""
+    ridge = False
+    try:
+        L = np.linalg.cholesky(gram)
+    except np.linalg.LinAlgError:
+        ridge = True
+        L = np.linalg.cholesky(gram + RIDGE_EPS * np.trace(gram) * np.eye(len(gram)))
+    return np.linalg.solve(L.T, np.linalg.solve(L, xy)), ridge
+
+
+def _metrics(y: np.ndarray, pred: np.ndarray) -> dict:
+    resid = y - pred
+    sst = ((y - y.mean()) ** 2).sum()
+    return {
+        "rmse": float(np.sqrt((resid ** 2).mean())),
+        "mae": float(np.abs(resid).mean()),
+        "r2": float(1 - (resid @ resid) / sst) if sst > 0 else float("nan"),
+    }
+
+
+def _run_fold(fold: dict) -> dict:
+    X, y = _STATE["X"], _STATE["y"]
+    if fold["kind"] == "rolling":
+        origin, horizon = fold["origin"], fold["horizon"]
+        # Running sum of the per-month updates up to and including the origin
+        gram, xy = _STATE["gram_cum"][origin], _STATE["xy_cum"][origin]
+        test = (_STATE["month"] > origin) & (_STATE["month"] <= origin + horizon)
+        n_train = int((_STATE["month"] <= origin).sum())
+    else:
+        block = np.asarray(fold["entities"])
+        # Downdate: full-panel normal equations minus the held-out block
+        gram = _STATE["gram_all"] - _STATE["gram_e"][block].sum(axis=0)
+        xy = _STATE["xy_all"] - _STATE["xy_e"][block].sum(axis=0)
+        test = np.isin(_STATE["entity"], block)
+        n_train = int((~test).sum())
+    beta, ridge = _solve_normal(gram, xy)
+    return {**fold, "n_train": n_train, "n_test": int(test.sum()), "ridge": ridge, **_metrics(y[test], X[test] @ beta)}
+
+
+def _group_normal_equations(X: np.ndarray, y: np.ndarray, codes: np.ndarray, n_groups: int):
+    """Per-group X'X and X'y, shape (n_groups, p, p) and (n_groups, p)."""
+    p = X.shape[1]
+    gram = np.zeros((n_groups, p, p))
+    xy = np.zeros((n_groups, p))
+    np.add.at(gram, codes, X[:, :, None] * X[:, None, :])
+    np.add.at(xy, codes, X * y[:, None])
+    return gram, xy
+
+
+def build_folds(months: list[str], entities: list[str], min_train: int, horizon: int, step: int, n_blocks: int):
+    folds = []
+    for origin in range(min_train - 1, len(months) - horizon, step):
+        test_span = months[origin + 1] if horizon == 1 else f"{months[origin + 1]}..{months[origin + horizon]}"
+        folds.append({
+            "kind": "rolling",
+            "origin": origin,
+            "horizon": horizon,
+            "label": f"≤{months[origin]} → {test_span}",
+        })
+    if n_blocks > 1:
+        for b, block in enumerate(np.array_split(np.arange(len(entities)), n_blocks)):
+            folds.append({
+                "kind": "spatial",
+                "entities": block.tolist(),
+                "label": f"block {b + 1}: NHD {entities[block[0]]}–{entities[block[-1]]}",
+            })
+    return folds
+
+
+def cross_validate(df: pd.DataFrame, features: list[str], target: str, min_train: int, horizon: int,
+                   step: int, n_blocks: int, workers: int) -> pd.DataFrame:
+    df = df.dropna(subset=features + [target])
+    month_codes, months = pd.factorize(df[TIME_COL], sort=True)
+    entity_codes, entities = pd.factorize(df[ENTITY_COL], sort=True)
+    X = np.column_stack([np.ones(len(df)), df[features].to_numpy(dtype=float)])
+    y = df[target].to_numpy(dtype=float)
+
+    gram_m, xy_m = _group_normal_equations(X, y, month_codes, len(months))
+    gram_e, xy_e = _group_normal_equations(X, y, entity_codes, len(entities))
+    folds = build_folds(list(months), list(entities), min_train, horizon, step, n_blocks)
+    if not folds:
+        sys.exit(f"No folds: {len(months)} months is too short for --min-train {min_train} --horizon {horizon}")
+
+    init = (X, y, month_codes, entity_codes, np.cumsum(gram_m, axis=0), np.cumsum(xy_m, axis=0), gram_e, xy_e)
+    if workers <= 1:
+        _init_worker(*init)
+        results = [_run_fold(f) for f in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+            results = list(pool.map(_run_fold, folds))
+
+    table = pd.DataFrame(results)
+    return table[["kind", "label", "n_train", "n_test", "ridge", "rmse", "mae", "r2"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin + spatial-block CV on the training panel")
+    parser.add_argument("--data", type=str, default="panel_full", help="Training CSV stem (default: panel_full)")
+    parser.add_argument("--target", type=str, default=TARGET)
+    parser.add_argument("--features", type=str, help=f"Comma-separated regressors (default: {','.join(PANEL_FEATURES)})")
+    parser.add_argument("--min-train", type=int, default=12, help="Months in the first rolling-origin window")
+    parser.add_argument("--horizon", type=int, default=1, help="Months forecast per rolling origin")
+    parser.add_argument("--step", type=int, default=1, help="Months between rolling origins")
+    parser.add_argument("--blocks", type=int, default=5, help="Spatial-block folds (0 to skip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", type=Path, default=TRAINING_DIR / "cv_results.csv")
+    args = parser.parse_args()
+
+    features = [f for f in args.features.split(",") if f] if args.features else PANEL_FEATURES
+    df = load_split(args.data)
+    missing = [c for c in features + [args.target] if c not in df.columns]
+    if missing:
+        sys.exit(f"Unknown column(s): {', '.join(missing)}")
+
+    t0 = time.perf_counter()
+    table = cross_validate(df, features, args.target, args.min_train, args.horizon, args.step, args.blocks, args.workers)
+    elapsed = time.perf_counter() - t0
+    table.to_csv(args.out, index=False)
+
+    with pd.option_context("display.width", 200):
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print()
+    for kind, group in table.groupby("kind", sort=False):
+        print(f"{kind:<8} {len(group):>3} folds   mean RMSE {group['rmse'].mean():.4f}   "
+              f"MAE {group['mae'].mean():.4f}   R² {group['r2'].mean():.4f}")
+    if table["ridge"].any():
+        print(f"\nWARNING: {int(table['ridge'].sum())} fold(s) had a singular X'X and were solved with a "
+              f"{RIDGE_EPS:g} ridge (see the ridge column); their errors are not plain OLS")
+    print(f"\n{len(table)} folds in {elapsed:.3f}s ({args.workers} worker(s)); wrote {args.out.name}")
+
+
+if __name__ == "__main__":
+    main()
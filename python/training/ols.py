@@ -1,12 +1,12 @@
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import statsmodels.api as sm
 from sklearn.metrics import r2_score, mean_absolute_error
 import json
 
-# ── Load data ──────────────────────────────────────────────────────────────
-train = pd.read_csv("crosssectional_train.csv")
-test = pd.read_csv("crosssectional_test.csv")
+TRAINING_DIR = Path(__file__).resolve().parent
 
 # ── Define features and target ─────────────────────────────────────────────
 TARGET = "crime_rate_per_1000pop"
@@ -30,11 +30,68 @@ CONTROL_FEATURES = [
 
 ALL_FEATURES = INTERVENTION_FEATURES + CONTROL_FEATURES
 
-# ── Fit OLS with statsmodels (gives p-values + confidence intervals) ────────
-X_train = sm.add_constant(train[ALL_FEATURES])
-X_test = sm.add_constant(test[ALL_FEATURES])
-y_train = train[TARGET]
-y_test = test[TARGET]
+MODEL_PATH = TRAINING_DIR / "ols_model.json"
+
+
+def load_split(name: str) -> pd.DataFrame:
+    """Load a training CSV from this directory (e.g. "crosssectional_train")."""
+    return pd.read_csv(TRAINING_DIR / f"{name}.csv", dtype={"neighborhood_id": str})
+
+
+def export_model(model, train: pd.DataFrame, test: pd.DataFrame, path=MODEL_PATH) -> dict:
+    """Write the fitted OLS as a compact JSON artifact for the what-if simulator.
+
+    Feature order is fixed by ``features``; ``coefficients`` and ``cov``
+    follow it, with the intercept stored separately (and first in ``cov``).
+    ``neighborhoods`` holds every neighborhood's baseline feature row so
+    predict.py can score scenarios without the CSVs.
+    """
+    X_test = sm.add_constant(test[ALL_FEATURES], has_constant="add")
+    y_pred = model.predict(X_test)
+    both = pd.concat([train, test]).sort_values("neighborhood_id")
+    artifact = {
+        "model": "OLS",
+        "target": TARGET,
+        "features": ALL_FEATURES,
+        "interventions": INTERVENTION_FEATURES,
+        "intercept": float(model.params["const"]),
+        "coefficients": [float(model.params[f]) for f in ALL_FEATURES],
+        "cov": model.cov_params().loc[["const"] + ALL_FEATURES, ["const"] + ALL_FEATURES].to_numpy().tolist(),
+        "residStd": float(np.sqrt(model.scale)),
+        "dfResid": float(model.df_resid),
+        "nObs": int(model.nobs),
+        "metrics": {
+            "trainR2": float(model.rsquared),
+            "testR2": float(r2_score(test[TARGET], y_pred)),
+            "testMAE": float(mean_absolute_error(test[TARGET], y_pred)),
+        },
+        "neighborhoods": {
+            "ids": both["neighborhood_id"].tolist(),
+            "names": both["neighborhood_name"].tolist(),
+            "baseline": both[ALL_FEATURES].to_numpy(dtype=float).tolist(),
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    return artifact
+
+
+if __name__ == "__main__":
+    # ── Load data ──────────────────────────────────────────────────────────
+    train = load_split("crosssectional_train")
+    test = load_split("crosssectional_test")
+
+    # ── Fit OLS with statsmodels (gives p-values + confidence intervals) ────
+    X_train = sm.add_constant(train[ALL_FEATURES])
+    X_test = sm.add_constant(test[ALL_FEATURES])
+    y_train = train[TARGET]
+    y_test = test[TARGET]
+
+    model = sm.OLS(y_train, X_train).fit()
+    print(model.summary())
 
-model = sm.OLS(y_train, X_train).fit()
-print(model.summary())
+    # ── Export machine-readable artifact for the simulator ──────────────────
+    artifact = export_model(model, train, test)
+    m = artifact["metrics"]
+    print(f"\nTest R²: {m['testR2']:.4f}  MAE: {m['testMAE']:.3f}")
+    print(f"Wrote {MODEL_PATH.name} ({MODEL_PATH.stat().st_size // 1024}KB)")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+panel_fe.py — Fixed-effects panel regression with cluster bootstrap CIs.
+
+Implements the "Panel fixed-effects regression (neighborhood FE + time FE)"
+recommended in model2_codebook.json on panel_full.csv.
+
+The fixed effects are removed with a within-transformation (alternating
+group demeaning via np.bincount) instead of dense dummy matrices. Standard
+errors are cluster-robust by neighborhood, and a neighborhood-cluster
+bootstrap runs in a process pool: each replicate reweights the sampled
+neighborhoods and re-solves on the re-demeaned data.
+
+Regressors that don't vary within a neighborhood (or within a month) are
+absorbed by the fixed effects; they are reported and dropped. The
+checked-in panel repeats every neighborhood feature across months, so the
+default is month FE only (--effects time); --effects two-way needs
+regressors that vary within both neighborhoods and months.
+
+Usage:
+  cd python/
+  uv run python training/panel_fe.py
+  uv run python training/panel_fe.py --replicates 5000
+  uv run python training/panel_fe.py --effects two-way --features <time-varying columns>
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ols import TRAINING_DIR, load_split  # noqa: E402
+
+ENTITY_COL = "neighborhood_id"
+TIME_COL = "month"
+TARGET = "est_monthly_crime_count"
+
+# Key regressors + controls from model2_codebook.json → modeling_notes.panel_regression
+PANEL_FEATURES = [
+    "active_vacancy_count",
+    "transit_stop_count",
+    "csb_complaint_count",
+    "census_vacancy_rate",
+    "population",
+    "pct_black",
+    "pct_hispanic",
+    "month_num",
+]
+
+EFFECTS = {
+    "two-way": (True, True),
+    "entity": (True, False),
+    "time": (False, True),
+}
+
+DEMEAN_TOL = 1e-10
+DEMEAN_MAX_ITER = 1000
+ABSORBED_TOL = 1e-8  # share of a column's variance left after demeaning
+
+
+# ── Within-transformation ────────────────────────────────────────────────────
+
+def within_transform(
+    values: np.ndarray,
+    entity: np.ndarray,
+    period: np.ndarray,
+    entity_effects: bool = True,
+    time_effects: bool = True,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """Sweep entity and/or time means out of every column of ``values``.
+
+    ``entity`` and ``period`` are 0-based integer codes. With both effects
+    this alternates the two demeaning steps until the update is below
+    DEMEAN_TOL, which is exact after one pass on a balanced panel.
+    ``weights`` (one per row) gives weighted group means, used by the
+    cluster bootstrap.
+    """
+    out = np.array(values, dtype=float, copy=True)
+    if out.ndim == 1:
+        out = out[:, None]
+    w = np.ones(len(out)) if weights is None else np.asarray(weights, dtype=float)
+    groups = []
+    if entity_effects:
+        groups.append(entity)
+    if time_effects:
+        groups.append(period)
+    if not groups:
+        return out
+
+    wsum = [np.bincount(g, weights=w) for g in groups]
+    scale = np.abs(out).max(axis=0) + 1.0
+    for _ in range(DEMEAN_MAX_ITER):
+        delta = 0.0
+        for g, ws in zip(groups, wsum):
+            safe = np.where(ws > 0, ws, 1.0)
+            for j in range(out.shape[1]):
+                means = np.bincount(g, weights=w * out[:, j], minlength=len(ws)) / safe
+                step = means[g]
+                out[:, j] -= step
+                delta = max(delta, float(np.abs(step[w > 0]).max(initial=0.0) / scale[j]))
+        if len(groups) == 1 or delta < DEMEAN_TOL:
+            break
+    return out
+
+
+def _solve(X: np.ndarray, y: np.ndarray, w: np.ndarray | None = None) -> np.ndarray:
+    if w is None:
+        return np.linalg.solve(X.T @ X, X.T @ y)
+    Xw = X * w[:, None]
+    return np.linalg.solve(Xw.T @ X, Xw.T @ y)
+
+
+def cluster_robust_cov(X: np.ndarray, resid: np.ndarray, clusters: np.ndarray, df_absorbed: int = 0) -> np.ndarray:
+    """Liang–Zeger sandwich with the CR1 small-sample correction.
+
+    ``df_absorbed`` counts fixed-effect parameters swept out by the
+    within-transformation that aren't nested in the clusters, so the
+    (N-1)/(N-K) factor uses the full K.
+    """
+    n, k = X.shape
+    n_clusters = int(clusters.max()) + 1
+    bread = np.linalg.inv(X.T @ X)
+    scores = np.zeros((n_clusters, k))
+    np.add.at(scores, clusters, X * resid[:, None])
+    meat = scores.T @ scores
+    g = np.count_nonzero(np.bincount(clusters, minlength=n_clusters))
+    correction = g / (g - 1) * (n - 1) / (n - k - df_absorbed)
+    return correction * bread @ meat @ bread
+
+
+# ── Cluster bootstrap ───────────────────────────────────────────────────────
+
+_STATE: dict = {}
+
+
+def _init_worker(y, X, entity, period, entity_effects, time_effects) -> None:
+    _STATE.update(y=y, X=X, entity=entity, period=period, entity_effects=entity_effects, time_effects=time_effects)
+
+
+def _bootstrap_batch(args: tuple[np.random.SeedSequence, int]) -> np.ndarray:
+    """Run ``n`` replicates: resample neighborhoods with replacement and re-solve.
+
+    Drawing cluster g c times is equivalent to weighting its rows by c with
+    one fixed effect per copy, so each replicate is a weighted within-
+    transformation of the original arrays rather than a stacked copy.
+    """
+    seed, n = args
+    y, X, entity, period = _STATE["y"], _STATE["X"], _STATE["entity"], _STATE["period"]
+    n_clusters = int(entity.max()) + 1
+    rng = np.random.default_rng(seed)
+    data = np.column_stack([y, X])
+    out = np.empty((n, X.shape[1]))
+    for r in range(n):
+        counts = np.bincount(rng.integers(0, n_clusters, n_clusters), minlength=n_clusters)
+        w = counts[entity].astype(float)
+        dm = within_transform(data, entity, period, _STATE["entity_effects"], _STATE["time_effects"], weights=w)
+        try:
+            out[r] = _solve(dm[:, 1:], dm[:, 0], w)
+        except np.linalg.LinAlgError:
+            out[r] = np.nan
+    return out
+
+
+def cluster_bootstrap(y, X, entity, period, entity_effects, time_effects, replicates, seed, workers) -> np.ndarray:
+    """Neighborhood-cluster bootstrap draws of the FE coefficients, shape (replicates, k)."""
+    n_batches = max(1, min(replicates, workers * 8))
+    sizes = [replicates // n_batches + (i < replicates % n_batches) for i in range(n_batches)]
+    batches = list(zip(np.random.SeedSequence(seed).spawn(n_batches), sizes))
+    init = (y, X, entity, period, entity_effects, time_effects)
+    if workers <= 1:
+        _init_worker(*init)
+        draws = [_bootstrap_batch(b) for b in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+            draws = list(pool.map(_bootstrap_batch, batches))
+    return np.vstack(draws)
+
+
+# ── Fit ─────────────────────────────────────────────────────────────────────
+
+def fit_panel_fe(
+    df: pd.DataFrame,
+    features: list[str],
+    target: str = TARGET,
+    effects: str = "time",
+    replicates: int = 2000,
+    seed: int = 2021,
+    workers: int = 1,
+    alpha: float = 0.05,
+) -> dict:
+    """Fit the FE model and return a JSON-serializable coefficient report."""
+    entity_effects, time_effects = EFFECTS[effects]
+    df = df.dropna(subset=features + [target])
+    entity_codes, entity_ids = pd.factorize(df[ENTITY_COL], sort=True)
+    period_codes, periods = pd.factorize(df[TIME_COL], sort=True)
+
+    y = df[target].to_numpy(dtype=float)
+    X = df[features].to_numpy(dtype=float)
+
+    data = within_transform(np.column_stack([y, X]), entity_codes, period_codes, entity_effects, time_effects)
+    y_dm, X_dm = data[:, 0], data[:, 1:]
+
+    raw_ss = ((X - X.mean(axis=0)) ** 2).sum(axis=0)
+    kept_ss = (X_dm ** 2).sum(axis=0)
+    absorbed_mask = kept_ss <= ABSORBED_TOL * np.where(raw_ss > 0, raw_ss, 1.0)
+    absorbed = [f for f, a in zip(features, absorbed_mask) if a]
+    kept = [f for f, a in zip(features, absorbed_mask) if not a]
+    if not kept:
+        hint = " (use --effects time, or regressors that vary within neighborhoods)" if entity_effects else ""
+        sys.exit(f"Every regressor is absorbed by the {effects} fixed effects: {', '.join(absorbed)}{hint}")
+    X, X_dm = X[:, ~absorbed_mask], X_dm[:, ~absorbed_mask]
+
+    beta = _solve(X_dm, y_dm)
+    resid = y_dm - X_dm @ beta
+    # Entity effects are nested in the neighborhood clusters and don't count
+    # toward K; time effects do (one fewer when entity effects are present).
+    df_absorbed = (len(periods) - (1 if entity_effects else 0)) if time_effects else 0
+    cov = cluster_robust_cov(X_dm, resid, entity_codes, df_absorbed)
+    se = np.sqrt(np.diag(cov))
+    r2_within = 1.0 - (resid @ resid) / (y_dm @ y_dm) if y_dm @ y_dm > 0 else float("nan")
+
+    t0 = time.perf_counter()
+    draws = cluster_bootstrap(y, X, entity_codes, period_codes, entity_effects, time_effects, replicates, seed, workers)
+    boot_seconds = time.perf_counter() - t0
+    draws = draws[~np.isnan(draws).any(axis=1)]
+    lo, hi = np.percentile(draws, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+
+    return {
+        "model": f"Panel fixed effects ({effects})",
+        "target": target,
+        "effects": {"entity": entity_effects, "time": time_effects},
+        "nObs": int(len(y)),
+        "nEntities": int(len(entity_ids)),
+        "nPeriods": int(len(periods)),
+        "r2Within": round(float(r2_within), 6),
+        "absorbed": absorbed,
+        "coefficients": {
+            name: {
+                "coef": float(beta[i]),
+                "seCluster": float(se[i]),
+                "ciCluster": [float(beta[i] - z * se[i]), float(beta[i] + z * se[i])],
+                "seBootstrap": float(draws[:, i].std(ddof=1)) if len(draws) > 1 else None,
+                "ciBootstrap": [float(lo[i]), float(hi[i])],
+            }
+            for i, name in enumerate(kept)
+        },
+        "covCluster": cov.tolist(),
+        "bootstrap": {
+            "replicates": int(len(draws)),
+            "requested": replicates,
+            "seed": seed,
+            "ciLevel": 1 - alpha,
+            "seconds": round(boot_seconds, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel fixed-effects regression with cluster bootstrap CIs")
+    parser.add_argument("--data", type=str, default="panel_full", help="Training CSV stem (default: panel_full)")
+    parser.add_argument("--target", type=str, default=TARGET)
+    parser.add_argument("--features", type=str, help=f"Comma-separated regressors (default: {','.join(PANEL_FEATURES)})")
+    parser.add_argument("--effects", choices=list(EFFECTS), default="time",
+                        help="Fixed effects to sweep out (default: time; the panel's neighborhood features "
+                             "are constant across months, so entity effects absorb them)")
+    parser.add_argument("--replicates", type=int, default=2000, help="Cluster bootstrap replicates")
+    parser.add_argument("--seed", type=int, default=2021)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", type=Path, default=TRAINING_DIR / "panel_fe_coefficients.json")
+    args = parser.parse_args()
+
+    features = [f for f in args.features.split(",") if f] if args.features else PANEL_FEATURES
+    df = load_split(args.data)
+    missing = [c for c in features + [args.target] if c not in df.columns]
+    if missing:
+        sys.exit(f"Unknown column(s): {', '.join(missing)}")
+
+    t0 = time.perf_counter()
+    result = fit_panel_fe(df, features, args.target, args.effects, args.replicates, args.seed, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"{result['model']}: {result['nObs']:,} obs, {result['nEntities']} neighborhoods × {result['nPeriods']} months")
+    if result["absorbed"]:
+        print(f"Absorbed by fixed effects: {', '.join(result['absorbed'])}")
+    print(f"Within R²: {result['r2Within']:.4f}")
+    print(f"\n{'feature':<28} {'coef':>12} {'se(clu)':>12} {'95% bootstrap CI':>28}")
+    for name, c in result["coefficients"].items():
+        lo, hi = c["ciBootstrap"]
+        print(f"{name:<28} {c['coef']:>12.5f} {c['seCluster']:>12.5f}   [{lo:>11.5f}, {hi:>11.5f}]")
+    boot = result["bootstrap"]
+    print(f"\n{boot['replicates']:,} bootstrap replicates in {boot['seconds']:.2f}s ({args.workers} worker(s)); "
+          f"total {elapsed:.2f}s")
+    print(f"Wrote {args.out.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+predict.py — Batch what-if predictions from the exported OLS artifact.
+
+Loads ols_model.json (written by ols.py) and scores many intervention
+scenarios against every neighborhood in one vectorized numpy call, without
+refitting or reading the training CSVs.
+
+A scenario is a vector of changes to the intervention features
+(active_vacancy_count, transit_stop_count, csb_vacant_bldg_complaints),
+either city-wide (applied to every neighborhood) or per neighborhood.
+
+Usage:
+  cd python/
+  uv run python training/ols.py                  # fit + write ols_model.json
+  uv run python training/predict.py --vacancy -20 --stops 2
+  uv run python training/predict.py --benchmark  # 100k scenarios × 79 neighborhoods
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ols import MODEL_PATH  # noqa: E402
+
+BENCHMARK_SCENARIOS = 100_000
+BENCHMARK_MIN_RATE = 100_000  # scenarios/second
+
+
+def load_model(path: Path = MODEL_PATH) -> dict:
+    """Load the artifact and convert its arrays to numpy."""
+    if not path.exists():
+        sys.exit(f"Missing {path.name} — run `uv run python training/ols.py` first.")
+    with open(path, "r") as f:
+        model = json.load(f)
+    model["coefficients"] = np.asarray(model["coefficients"], dtype=float)
+    model["cov"] = np.asarray(model["cov"], dtype=float)
+    model["neighborhoods"]["baseline"] = np.asarray(model["neighborhoods"]["baseline"], dtype=float)
+    model["interventionIndex"] = np.array([model["features"].index(f) for f in model["interventions"]])
+    return model
+
+
+def predict_baseline(model: dict, features: np.ndarray | None = None) -> np.ndarray:
+    """Predicted target for each row of ``features`` (default: every neighborhood's baseline)."""
+    if features is None:
+        features = model["neighborhoods"]["baseline"]
+    return model["intercept"] + features @ model["coefficients"]
+
+
+def predict_scenarios(model: dict, deltas: np.ndarray, floor: float | None = 0.0) -> np.ndarray:
+    """Predict the target for every scenario × neighborhood.
+
+    ``deltas`` holds changes to the intervention features, in
+    ``model["interventions"]`` order, with shape:
+      (n_scenarios, n_interventions)                    — same change in every neighborhood
+      (n_scenarios, n_neighborhoods, n_interventions)   — per-neighborhood changes
+
+    The model is linear, so this is the baseline prediction plus
+    deltas · beta_interventions, broadcast to (n_scenarios, n_neighborhoods).
+    Predictions are clipped at ``floor`` (rates can't go negative); pass
+    None to disable.
+    """
+    deltas = np.asarray(deltas, dtype=float)
+    beta = model["coefficients"][model["interventionIndex"]]
+    base = predict_baseline(model)
+    if deltas.ndim == 2:
+        out = base[None, :] + (deltas @ beta)[:, None]
+    elif deltas.ndim == 3:
+        out = base[None, :] + deltas @ beta
+    else:
+        raise ValueError(f"deltas must be 2-D or 3-D, got shape {deltas.shape}")
+    if floor is not None:
+        np.maximum(out, floor, out=out)
+    return out
+
+
+def benchmark(model: dict, n: int = BENCHMARK_SCENARIOS, repeats: int = 5) -> float:
+    """Time city-wide and per-neighborhood batches; returns the slower rate in scenarios/s."""
+    rng = np.random.default_rng(0)
+    n_hoods = len(model["neighborhoods"]["ids"])
+    n_int = len(model["interventions"])
+    city = rng.integers(-50, 51, size=(n, n_int)).astype(float)
+    per_hood = rng.integers(-10, 11, size=(n // 10, n_hoods, n_int)).astype(float)
+
+    rates = {}
+    for label, deltas in (("city-wide", city), ("per-neighborhood", per_hood)):
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            predict_scenarios(model, deltas)
+            best = min(best, time.perf_counter() - t0)
+        rates[label] = len(deltas) / best
+        print(f"  {label:<18} {len(deltas):>9,} scenarios × {n_hoods} neighborhoods in {best * 1000:8.2f} ms "
+              f"({rates[label]:,.0f} scenarios/s)")
+    return min(rates.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if predictions from ols_model.json")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH)
+    parser.add_argument("--vacancy", type=float, default=0, help="Change in active_vacancy_count")
+    parser.add_argument("--stops", type=float, default=0, help="Change in transit_stop_count")
+    parser.add_argument("--complaints", type=float, default=0, help="Change in csb_vacant_bldg_complaints")
+    parser.add_argument("--benchmark", action="store_true", help=f"Fail unless ≥{BENCHMARK_MIN_RATE:,} scenarios/s")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+
+    if args.benchmark:
+        print(f"Benchmarking predict_scenarios (target ≥{BENCHMARK_MIN_RATE:,} scenarios/s):")
+        rate = benchmark(model)
+        if rate < BENCHMARK_MIN_RATE:
+            sys.exit(f"FAIL: {rate:,.0f} scenarios/s is below {BENCHMARK_MIN_RATE:,}")
+        print("OK")
+        return
+
+    delta_by_name = {
+        "active_vacancy_count": args.vacancy,
+        "transit_stop_count": args.stops,
+        "csb_vacant_bldg_complaints": args.complaints,
+    }
+    deltas = np.array([[delta_by_name.get(f, 0.0) for f in model["interventions"]]])
+    base = predict_baseline(model)
+    pred = predict_scenarios(model, deltas)[0]
+    hoods = model["neighborhoods"]
+    changes = ", ".join(f"{f} {d:+g}" for f, d in zip(model["interventions"], deltas[0]))
+    print(f"{model['target']} — scenario: {changes}")
+    print(f"{'id':<4} {'neighborhood':<32} {'baseline':>10} {'scenario':>10} {'change':>9}")
+    for i in np.argsort(pred - base):
+        print(f"{hoods['ids'][i]:<4} {hoods['names'][i]:<32} {base[i]:>10.2f} {pred[i]:>10.2f} {pred[i] - base[i]:>+9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+spec_search.py — Exhaustive OLS specification search for the crime model.
+
+Fits every control set (or a user-supplied list of specs) on
+crosssectional_train.csv and ranks them by test-set R² and MAE on
+crosssectional_test.csv.
+
+Instead of one statsmodels fit per spec, the Gram matrix X'X and X'y are
+computed once. Specs are walked in lexicographic order so consecutive specs
+share a column prefix; the inverse Cholesky factor of that prefix is kept and only
+the new columns are appended (one rank-one row update each). Contiguous chunks
+of the spec list run in a process pool.
+
+Usage:
+  cd python/
+  uv run python training/spec_search.py                     # all subsets of CANDIDATE_CONTROLS
+  uv run python training/spec_search.py --specs specs.txt   # one comma-separated spec per line
+  uv run python training/spec_search.py --pool pct_black,population --top 10
+"""
+
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ols import CONTROL_FEATURES, INTERVENTION_FEATURES, TARGET, TRAINING_DIR, load_split  # noqa: E402
+
+# Non-target, time-invariant regressors from model2_codebook.json
+CANDIDATE_CONTROLS = [
+    "population", "pct_black", "pct_white", "pct_hispanic",
+    "total_housing_units", "census_vacancy_rate", "census_vacant_units",
+    "avg_condition_rating", "condemned_count", "total_violation_count", "violations_per_vacancy",
+    "transit_trip_count", "transit_route_count", "transit_trips_per_1000pop",
+    "csb_complaint_count", "csb_avg_resolution_days", "complaints_per_1000pop",
+]
+
+SINGULAR_TOL = 1e-10  # relative pivot below which a column is treated as collinear
+
+# Per-worker state, set once by _init_worker so specs can be shipped as index tuples
+_STATE: dict = {}
+
+
+def _init_worker(gram, gram_y, yy, sst, x_test, y_test) -> None:
+    _STATE.update(gram=gram, gram_y=gram_y, yy=yy, sst=sst, x_test=x_test, y_test=y_test)
+
+
+def _evaluate_chunk(specs: list[tuple[int, ...]]) -> list[tuple]:
+    """Solve a lexicographically sorted run of specs, reusing shared Cholesky prefixes.
+
+    Returns (spec, train_r2, test_r2, test_mae) per spec; R² is NaN for
+    specs whose columns are collinear on the training set.
+    """
+    gram, gram_y, yy, sst = _STATE["gram"], _STATE["gram_y"], _STATE["yy"], _STATE["sst"]
+    x_test, y_test = _STATE["x_test"], _STATE["y_test"]
+    sst_test = float(((y_test - y_test.mean()) ** 2).sum())
+
+    p = gram.shape[0]
+    # Inverse Cholesky factor: appending a column adds one row, so no
+    # triangular solves are needed — l = Linv·g and beta = Linvᵀ·z.
+    Linv = np.zeros((p, p))
+    z = np.zeros(p)
+    stack = np.zeros(p, dtype=np.intp)  # columns currently factored, in order
+    depth = 0
+    singular_at = None  # depth of the first collinear column on the stack
+
+    results = []
+    for spec in specs:
+        # Pop back to the longest prefix shared with the previous spec
+        keep = 0
+        while keep < depth and keep < len(spec) and stack[keep] == spec[keep]:
+            keep += 1
+        depth = keep
+        if singular_at is not None and singular_at >= keep:
+            singular_at = None
+
+        for col in spec[keep:]:
+            k = depth
+            stack[k] = col
+            depth += 1
+            if singular_at is not None:
+                continue
+            l = Linv[:k, :k] @ gram[stack[:k], col]
+            d2 = gram[col, col] - l @ l
+            if d2 <= SINGULAR_TOL * max(gram[col, col], 1.0):
+                singular_at = k
+                continue
+            d = math.sqrt(d2)
+            Linv[k, :k] = -(l @ Linv[:k, :k]) / d
+            Linv[k, k] = 1.0 / d
+            z[k] = (gram_y[col] - l @ z[:k]) / d
+
+        if singular_at is not None:
+            results.append((spec, np.nan, np.nan, np.nan))
+            continue
+
+        k = depth
+        beta = z[:k] @ Linv[:k, :k]
+        train_r2 = 1.0 - (yy - z[:k] @ z[:k]) / sst
+        resid = y_test - x_test[:, stack[:k]] @ beta
+        test_r2 = 1.0 - (resid @ resid) / sst_test if sst_test > 0 else np.nan
+        results.append((spec, train_r2, test_r2, float(np.abs(resid).mean())))
+    return results
+
+
+def build_problem(train: pd.DataFrame, test: pd.DataFrame, columns: list[str]):
+    """Standardize on train stats and precompute X'X, X'y for [const] + columns.
+
+    R² and MAE are invariant to the rescaling; it only keeps the Cholesky
+    pivots well-conditioned when raw scales differ by orders of magnitude.
+    """
+    x_tr = train[columns].to_numpy(dtype=float)
+    mean = x_tr.mean(axis=0)
+    std = x_tr.std(axis=0)
+    std[std == 0] = 1.0  # constant-on-train columns collapse to zero and are caught as singular
+    x_tr = np.column_stack([np.ones(len(x_tr)), (x_tr - mean) / std])
+    x_te = np.column_stack([np.ones(len(test)), (test[columns].to_numpy(dtype=float) - mean) / std])
+
+    y_tr = train[TARGET].to_numpy(dtype=float)
+    y_te = test[TARGET].to_numpy(dtype=float)
+    gram = x_tr.T @ x_tr
+    gram_y = x_tr.T @ y_tr
+    yy = float(y_tr @ y_tr)
+    sst = float(((y_tr - y_tr.mean()) ** 2).sum())
+    return gram, gram_y, yy, sst, x_te, y_te
+
+
+def exhaustive_specs(n_required: int, n_pool: int):
+    """Every subset of the pool, as sorted index tuples in lexicographic order.
+
+    Index 0 is the intercept and 1..n_required are forced features, so every
+    spec shares that prefix.
+    """
+    base = tuple(range(n_required + 1))
+    pool = range(n_required + 1, n_required + 1 + n_pool)
+    specs = [base + combo for r in range(n_pool + 1) for combo in itertools.combinations(pool, r)]
+    specs.sort()
+    return specs
+
+
+def read_specs(path: Path, columns: list[str], n_required: int) -> list[tuple[int, ...]]:
+    """Read one comma-separated feature list per line; forced features are always added."""
+    col_idx = {c: i + 1 for i, c in enumerate(columns)}
+    base = set(range(n_required + 1))
+    specs = set()
+    for line_no, line in enumerate(path.read_text().splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        names = [n.strip() for n in line.split(",") if n.strip()]
+        unknown = [n for n in names if n not in col_idx]
+        if unknown:
+            sys.exit(f"{path.name}:{line_no}: unknown feature(s) {', '.join(unknown)}")
+        specs.add(tuple(sorted(base | {col_idx[n] for n in names})))
+    return sorted(specs)
+
+
+def run_search(specs, problem, workers: int) -> list[tuple]:
+    if workers <= 1 or len(specs) < 2_000:
+        _init_worker(*problem)
+        return _evaluate_chunk(specs)
+    # Several chunks per worker for load balance; each chunk rebuilds its first prefix once
+    n_chunks = workers * 8
+    size = math.ceil(len(specs) / n_chunks)
+    chunks = [specs[i:i + size] for i in range(0, len(specs), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=problem) as pool:
+        return [r for chunk in pool.map(_evaluate_chunk, chunks) for r in chunk]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exhaustive OLS specification search")
+    parser.add_argument("--specs", type=Path, help="File with one comma-separated feature list per line")
+    parser.add_argument("--pool", type=str, help="Comma-separated candidate controls (default: CANDIDATE_CONTROLS)")
+    parser.add_argument(
+        "--require", type=str, default=",".join(INTERVENTION_FEATURES),
+        help="Comma-separated features included in every spec (default: intervention features)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    parser.add_argument("--out", type=Path, default=TRAINING_DIR / "spec_search_results.csv", help="Ranked results CSV")
+    args = parser.parse_args()
+
+    train = load_split("crosssectional_train")
+    test = load_split("crosssectional_test")
+
+    required = [c for c in args.require.split(",") if c]
+    if args.pool:
+        pool = [c for c in args.pool.split(",") if c]
+    else:
+        pool = list(dict.fromkeys(CANDIDATE_CONTROLS + CONTROL_FEATURES))
+    pool = [c for c in pool if c not in required]
+    missing = [c for c in required + pool if c not in train.columns]
+    if missing:
+        sys.exit(f"Unknown column(s): {', '.join(missing)}")
+
+    columns = required + pool
+    if args.specs:
+        # Spec files may name any numeric regressor, not just the pool
+        extra = []
+        for line in args.specs.read_text().splitlines():
+            if line.strip().startswith("#"):
+                continue
+            extra += [n.strip() for n in line.split(",") if n.strip() and n.strip() not in columns]
+        columns += [c for c in dict.fromkeys(extra) if c in train.columns]
+        specs = read_specs(args.specs, columns, len(required))
+    else:
+        specs = exhaustive_specs(len(required), len(pool))
+
+    print(f"Searching {len(specs):,} specs over {len(columns)} features on {len(train)} train / {len(test)} test rows")
+    t0 = time.perf_counter()
+    problem = build_problem(train, test, columns)
+    results = run_search(specs, problem, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    names = ["const"] + columns
+    ranked = pd.DataFrame(
+        [
+            {
+                "n_features": len(spec) - 1,
+                "train_r2": train_r2,
+                "test_r2": test_r2,
+                "test_mae": test_mae,
+                "features": ",".join(names[i] for i in spec[1:]),
+            }
+            for spec, train_r2, test_r2, test_mae in results
+        ]
+    )
+    n_singular = int(ranked["test_r2"].isna().sum())
+    ranked = ranked.dropna(subset=["test_r2"]).sort_values(["test_r2", "test_mae"], ascending=[False, True])
+    ranked.to_csv(args.out, index=False)
+
+    print(f"Solved {len(results):,} specs in {elapsed:.2f}s ({len(results) / elapsed:,.0f} specs/s, "
+          f"{args.workers} worker(s), {n_singular:,} collinear skipped)")
+    print(f"Wrote {args.out.name}\n")
+    with pd.option_context("display.max_colwidth", 120, "display.width", 200):
+        print(ranked.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+uncertainty.py — Monte Carlo uncertainty bands for simulated interventions.
+
+Turns the point estimates from predict.py into per-neighborhood percentile
+bands. Coefficient vectors are drawn in one batch from N(beta, cov) using
+the covariance in ols_model.json, optionally with residual noise
+N(0, residStd²) for a full posterior-predictive band, and pushed through
+every scenario × neighborhood at once.
+
+All draws for a scenario are needed to take percentiles, so scenarios are
+processed in chunks sized to keep the (draws × scenarios × neighborhoods)
+block under MAX_BLOCK_ELEMENTS. The seed is split with SeedSequence.spawn:
+coefficients come from one child, drawn once, and each scenario's residual
+noise from its own child, so a seed gives the same bands whatever the
+chunk size.
+
+Usage:
+  cd python/
+  uv run python training/uncertainty.py --vacancy -20
+  uv run python training/uncertainty.py --stops 5 --draws 20000 --bands 10,50,90 --no-noise
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from predict import MODEL_PATH, load_model  # noqa: E402
+
+DEFAULT_DRAWS = 10_000
+DEFAULT_BANDS = (5.0, 50.0, 95.0)
+MAX_BLOCK_ELEMENTS = 20_000_000  # ~160 MB of float64 per chunk
+
+
+def draw_coefficients(model: dict, n_draws: int, rng: np.random.Generator) -> np.ndarray:
+    """Draw (n_draws, 1 + n_features) coefficient vectors [intercept, betas...] from N(beta, cov)."""
+    mean = np.concatenate([[model["intercept"]], model["coefficients"]])
+    cov = model["cov"]
+    # Cholesky can fail on a numerically semi-definite cov; eigh clips tiny negatives
+    try:
+        factor = np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        factor = vecs * np.sqrt(np.clip(vals, 0, None))
+    return mean + rng.standard_normal((n_draws, len(mean))) @ factor.T
+
+
+def predictive_bands(
+    model: dict,
+    deltas: np.ndarray,
+    n_draws: int = DEFAULT_DRAWS,
+    bands: tuple[float, ...] = DEFAULT_BANDS,
+    noise: bool = True,
+    seed: int = 0,
+    floor: float | None = 0.0,
+    max_block: int = MAX_BLOCK_ELEMENTS,
+) -> dict:
+    """Percentile bands of the predicted target for every scenario × neighborhood.
+
+    ``deltas`` has the same shapes as predict.predict_scenarios:
+    (n_scenarios, n_interventions) or (n_scenarios, n_neighborhoods,
+    n_interventions). Returns ``{"bands": (n_scenarios, n_neighborhoods,
+    n_bands), "mean": (n_scenarios, n_neighborhoods), "percentiles": bands}``.
+    """
+    deltas = np.asarray(deltas, dtype=float)
+    if deltas.ndim not in (2, 3):
+        raise ValueError(f"deltas must be 2-D or 3-D, got shape {deltas.shape}")
+    coef_seed, noise_seed = np.random.SeedSequence(seed).spawn(2)
+    theta = draw_coefficients(model, n_draws, np.random.default_rng(coef_seed))  # (D, 1 + K)
+
+    # Baseline prediction per draw × neighborhood, computed once: (D, H)
+    baseline = model["neighborhoods"]["baseline"]
+    base = theta[:, :1] + theta[:, 1:] @ baseline.T
+    beta_int = theta[:, 1 + model["interventionIndex"]]  # (D, I)
+
+    n_scen, n_hoods = len(deltas), baseline.shape[0]
+    chunk = max(1, max_block // (n_draws * n_hoods))
+    out = np.empty((n_scen, n_hoods, len(bands)))
+    mean = np.empty((n_scen, n_hoods))
+    sigma = model["residStd"] if noise else 0.0
+    scenario_seeds = noise_seed.spawn(n_scen) if sigma else []
+
+    for start in range(0, n_scen, chunk):
+        d = deltas[start:start + chunk]
+        if d.ndim == 2:
+            effect = (beta_int @ d.T)[:, :, None]  # (D, S, 1)
+        else:
+            effect = np.einsum("di,shi->dsh", beta_int, d)  # (D, S, H)
+        block = base[:, None, :] + effect
+        if sigma:
+            block = block + np.stack([
+                np.random.default_rng(ss).normal(0.0, sigma, size=(n_draws, n_hoods))
+                for ss in scenario_seeds[start:start + len(d)]
+            ], axis=1)
+        if floor is not None:
+            np.maximum(block, floor, out=block)
+        out[start:start + len(d)] = np.moveaxis(np.percentile(block, bands, axis=0), 0, -1)
+        mean[start:start + len(d)] = block.mean(axis=0)
+
+    return {"bands": out, "mean": mean, "percentiles": list(bands)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo uncertainty bands for a what-if scenario")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH)
+    parser.add_argument("--vacancy", type=float, default=0, help="Change in active_vacancy_count")
+    parser.add_argument("--stops", type=float, default=0, help="Change in transit_stop_count")
+    parser.add_argument("--complaints", type=float, default=0, help="Change in csb_vacant_bldg_complaints")
+    parser.add_argument("--draws", type=int, default=DEFAULT_DRAWS)
+    parser.add_argument("--bands", type=str, default=",".join(f"{b:g}" for b in DEFAULT_BANDS),
+                        help="Comma-separated percentiles")
+    parser.add_argument("--no-noise", action="store_true", help="Coefficient uncertainty only (no residual noise)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    bands = tuple(float(b) for b in args.bands.split(","))
+    delta_by_name = {
+        "active_vacancy_count": args.vacancy,
+        "transit_stop_count": args.stops,
+        "csb_vacant_bldg_complaints": args.complaints,
+    }
+    deltas = np.array([[delta_by_name.get(f, 0.0) for f in model["interventions"]]])
+
+    result = predictive_bands(model, deltas, args.draws, bands, noise=not args.no_noise, seed=args.seed)
+    hoods = model["neighborhoods"]
+    changes = ", ".join(f"{f} {d:+g}" for f, d in zip(model["interventions"], deltas[0]))
+    kind = "confidence" if args.no_noise else "predictive"
+    print(f"{model['target']} — scenario: {changes} ({args.draws:,} draws, {kind} bands)")
+    header = "".join(f"{'p' + format(b, 'g'):>10}" for b in bands)
+    print(f"{'id':<4} {'neighborhood':<32} {'mean':>10}{header}")
+    for i in range(len(hoods["ids"])):
+        cols = "".join(f"{v:>10.2f}" for v in result["bands"][0, i])
+        print(f"{hoods['ids'][i]:<4} {hoods['names'][i]:<32} {result['mean'][0, i]:>10.2f}{cols}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,23 @@ import type {
 } from '@/lib/explorer-types'
 import { initialExplorerState } from '@/lib/explorer-types'
 import { computeAffectedScores } from '@/lib/affected-scoring'
+import type { HeatmapIndex, HeatmapPoint } from '@/lib/types'
+
+// Aggregate files name their heatmap shard index; the heatmap and time
+// slider draw the stratified all-months sample it lists.
+function withHeatmapSample<T extends { heatmapIndex: string }>(data: T) {
+  return fetch(`/data/${data.heatmapIndex}`)
+    .then((r) => {
+      if (!r.ok) throw new Error('not found')
+      return r.json() as Promise<HeatmapIndex>
+    })
+    .then((index) => fetch(`/data/${index.sample.file}`))
+    .then((r) => {
+      if (!r.ok) throw new Error('not found')
+      return r.json() as Promise<HeatmapPoint[]>
+    })
+    .then((heatmapPoints) => ({ ...data, heatmapPoints }))
+}
 
 // ── Reducer ────────────────────────────────────────────────
 
@@ -183,10 +200,12 @@ export function ExplorerProvider({ children }: { children: ReactNode }) {
     switch (layer) {
       case 'complaints':
         Promise.all([
-          fetch('/data/csb_latest.json').then((r) => {
-            if (!r.ok) throw new Error('not found')
-            return r.json()
-          }),
+          fetch('/data/csb_latest.json')
+            .then((r) => {
+              if (!r.ok) throw new Error('not found')
+              return r.json()
+            })
+            .then(withHeatmapSample),
           fetch('/data/trends.json').then((r) => {
             if (!r.ok) throw new Error('not found')
             return r.json()
@@ -248,6 +267,7 @@ export function ExplorerProvider({ children }: { children: ReactNode }) {
             if (!r.ok) throw new Error('not found')
             return r.json()
           })
+          .then(withHeatmapSample)
           .then((crimeData) => {
             setData((prev) => ({ ...prev, crimeData }))
           })
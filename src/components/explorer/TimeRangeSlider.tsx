@@ -23,8 +23,8 @@ export function TimeRangeSlider() {
   const allPoints = useMemo(() => {
     if (!visible) return []
     return [
-      ...(showComplaints && data.csbData ? data.csbData.heatmapPoints : []),
-      ...(showCrime && data.crimeData ? data.crimeData.heatmapPoints : []),
+      ...(showComplaints ? (data.csbData?.heatmapPoints ?? []) : []),
+      ...(showCrime ? (data.crimeData?.heatmapPoints ?? []) : []),
     ]
   }, [visible, showComplaints, showCrime, data.csbData, data.crimeData])
 
@@ -17,7 +17,7 @@ export function ComplaintsLayer() {
   // Filter heatmap points by category and time range
   const filteredPoints = useMemo(() => {
     if (!data.csbData) return []
-    let points = data.csbData.heatmapPoints
+    let points = data.csbData.heatmapPoints ?? []
     if (category !== 'all') {
       points = points.filter((p) => p[2] === category)
     }
@@ -17,7 +17,7 @@ export function CrimeLayer() {
   // Filter heatmap points by category and time range
   const filteredPoints = useMemo(() => {
     if (!data.crimeData) return []
-    let points = data.crimeData.heatmapPoints
+    let points = data.crimeData.heatmapPoints ?? []
     if (category !== 'all') {
       points = points.filter((p) => p[2] === category)
     }
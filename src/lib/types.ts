@@ -1,5 +1,26 @@
 // ── 311 Complaints ──────────────────────────────────────────
 
+export type HeatmapPoint = [number, number, string, string?, string?] // [lat, lng, category, date?, neighborhood?]
+
+/** `<dataset>_points/index.json`: monthly point shards plus a stratified all-months sample. */
+export interface HeatmapIndex {
+  aggregates: string
+  fields: string[]
+  sample: {
+    file: string
+    rows: number
+    bytes: number
+    weights: Record<string, Record<string, number>> // month → neighborhood → rows per sampled row
+  }
+  shards: Array<{
+    month: string
+    file: string
+    rows: number
+    bytes: number
+    bbox: [number, number, number, number] // [minLng, minLat, maxLng, maxLat]
+  }>
+}
+
 export interface NeighborhoodStats {
   name: string
   total: number
@@ -17,7 +38,8 @@ export interface CSBData {
   monthly: Record<string, Record<string, number>>
   hourly: Record<string, number>
   weekday: Record<string, number>
-  heatmapPoints: Array<[number, number, string, string?, string?]> // [lat, lng, category, date?, neighborhood?]
+  heatmapIndex: string // shard manifest under /data/, see HeatmapIndex
+  heatmapPoints?: HeatmapPoint[] // the manifest's sample, attached by the explorer
 }
 
 export interface TrendsData {
@@ -163,7 +185,8 @@ export interface CrimeData {
   hourly: Record<string, number>
   weekday: Record<string, number>
   monthly: Record<string, Record<string, number>>
-  heatmapPoints: Array<[number, number, string, string?, string?]> // [lat, lng, category, date?, neighborhood?]
+  heatmapIndex: string // shard manifest under /data/, see HeatmapIndex
+  heatmapPoints?: HeatmapPoint[] // the manifest's sample, attached by the explorer
 }
 
 // ── ARPA Funds ─────────────────────────────────────────────